@@ -7,8 +7,10 @@
 
 import json
 import logging
-from typing import Dict, Optional, Any
-from services.voucher_service import get_voucher_service, VoucherStatus
+import time
+from typing import Dict, List, Optional, Any
+from services.voucher_service import get_voucher_service, VoucherStatus, PageCallback
+from services.voucher_inventory import get_voucher_inventory
 from utils.data_utils import DataUtils
 
 logger = logging.getLogger(__name__)
@@ -18,12 +20,16 @@ class VoucherAPI:
     
     def __init__(self):
         self.voucher_service = get_voucher_service()
+        # 🆕 券库存缓存：查询类接口都从缓存读取，本地过滤和统计
+        self.inventory = get_voucher_inventory()
         self.data_utils = DataUtils()
     
     def get_user_vouchers(self, cinema_id: str, token: str, 
                          only_valid: bool = False,
                          status_filter: Optional[str] = None,
-                         name_filter: Optional[str] = None) -> Dict[str, Any]:
+                         name_filter: Optional[str] = None,
+                         on_page: Optional[PageCallback] = None,
+                         force_refresh: bool = False) -> Dict[str, Any]:
         """
         获取用户券列表
         
@@ -33,14 +39,23 @@ class VoucherAPI:
             only_valid: 是否只返回有效券
             status_filter: 状态过滤
             name_filter: 名称过滤
+            on_page: 分页回调，按页码顺序逐页调用（未应用额外过滤，命中缓存时不调用）
+            force_refresh: 忽略券库存缓存，重新获取
             
         Returns:
             API响应格式的券数据
         """
         try:
-            # 获取所有券
-            vouchers, page_info = self.voucher_service.get_all_vouchers(
-                cinema_id, token, only_valid=only_valid
+            # 分页回调只推送符合 only_valid 的券
+            page_callback = on_page
+            if on_page and only_valid:
+                def page_callback(page_index, page_vouchers, page_info):
+                    now = int(time.time())
+                    on_page(page_index, [voucher for voucher in page_vouchers if voucher.is_valid(now)], page_info)
+
+            # 🔧 从券库存缓存获取所有券，本地过滤
+            vouchers, page_info = self.inventory.get_vouchers(
+                cinema_id, token, force_refresh=force_refresh, on_page=page_callback
             )
 
             # 安全地检查券数据
@@ -53,14 +68,32 @@ class VoucherAPI:
                     'data': None
                 }
 
-            # 应用额外过滤
-            if status_filter or name_filter:
-                vouchers = self.voucher_service.filter_vouchers(
-                    vouchers, status_filter, name_filter
-                )
-
-            # 获取统计信息
-            statistics = self.voucher_service.get_voucher_statistics(vouchers)
+            failed_pages = page_info.get('failed_pages') or []
+            if failed_pages:
+                # 🔧 部分页获取失败：结果未进入缓存和索引，直接过滤本次获取到的券
+                now = int(time.time())
+                if only_valid:
+                    vouchers = sorted((voucher for voucher in vouchers if voucher.is_valid(now)),
+                                      key=lambda voucher: voucher.expire_time)
+                vouchers = self.voucher_service.filter_vouchers(vouchers, status_filter, name_filter)
+                statistics = self.voucher_service.get_voucher_statistics(vouchers)
+                expiring_soon_count = sum(1 for voucher in vouchers
+                                          if voucher.is_valid(now) and voucher.expire_time <= now + 7 * 24 * 3600)
+            else:
+                # 🔧 过滤通过券内存索引完成（状态分桶 + 券名n-gram索引）
+                # 只要有效券时按过期时间有序表返回，快过期的券排在前面
+                if only_valid or status_filter or name_filter:
+                    vouchers = self.inventory.search(
+                        cinema_id, token, text=name_filter or '', status=status_filter,
+                        valid_only=only_valid, fields=('voucher_name',), sort_by_expiry=only_valid
+                    )
+
+                # 获取统计信息（未过滤时复用缓存中的统计）
+                if only_valid or status_filter or name_filter:
+                    statistics = self.voucher_service.get_voucher_statistics(vouchers)
+                else:
+                    statistics = self.inventory.get_statistics(cinema_id, token)
+                expiring_soon_count = len(self.inventory.expiring_within(cinema_id, token, 7))
 
             # 安全地转换为字典格式
             vouchers_data = []
@@ -78,11 +111,14 @@ class VoucherAPI:
             return {
                 'success': True,
                 'code': 200,
-                'message': '获取券列表成功',
+                'message': f"获取券列表部分成功（第{'、'.join(map(str, failed_pages))}页获取失败）" if failed_pages else '获取券列表成功',
                 'data': {
                     'vouchers': vouchers_data,
                     'statistics': statistics,
                     'page_info': page_info,
+                    'partial': bool(failed_pages),
+                    'failed_pages': failed_pages,
+                    'expiring_soon_count': expiring_soon_count,
                     'filters_applied': {
                         'only_valid': only_valid,
                         'status_filter': status_filter,
@@ -100,18 +136,23 @@ class VoucherAPI:
                 'data': None
             }
     
-    def get_valid_vouchers_only(self, cinema_id: str, token: str) -> Dict[str, Any]:
+    def get_valid_vouchers_only(self, cinema_id: str, token: str,
+                                on_page: Optional[PageCallback] = None,
+                                force_refresh: bool = False) -> Dict[str, Any]:
         """
         只获取有效券列表（快捷方法）
 
         Args:
             cinema_id: 影院ID
             token: 用户token
+            on_page: 分页回调，按页码顺序逐页调用
+            force_refresh: 忽略券库存缓存，重新获取
 
         Returns:
             有效券列表
         """
-        return self.get_user_vouchers(cinema_id, token, only_valid=True)
+        return self.get_user_vouchers(cinema_id, token, only_valid=True, on_page=on_page,
+                                      force_refresh=force_refresh)
 
     def get_order_available_vouchers(self, cinema_id: str, token: str) -> Dict[str, Any]:
         """
@@ -236,8 +277,7 @@ class VoucherAPI:
             券统计信息
         """
         try:
-            vouchers, _ = self.voucher_service.get_all_vouchers(cinema_id, token)
-            statistics = self.voucher_service.get_voucher_statistics(vouchers)
+            statistics = self.inventory.get_statistics(cinema_id, token)
             
             return {
                 'success': True,
@@ -269,17 +309,10 @@ class VoucherAPI:
             搜索结果
         """
         try:
-            vouchers, page_info = self.voucher_service.get_all_vouchers(cinema_id, token)
+            vouchers, page_info = self.inventory.get_vouchers(cinema_id, token)
             
-            # 搜索匹配的券
-            search_results = []
-            search_term_lower = search_term.lower()
-            
-            for voucher in vouchers:
-                if (search_term_lower in voucher.voucher_code.lower() or
-                    search_term_lower in voucher.voucher_name.lower() or
-                    search_term_lower in voucher.voucher_code_mask.lower()):
-                    search_results.append(voucher)
+            # 🔧 通过券内存索引搜索（券号、券名、券号掩码）
+            search_results = self.inventory.search(cinema_id, token, text=search_term)
             
             # 转换为字典格式
             results_data = [voucher.to_dict() for voucher in search_results]
@@ -321,37 +354,60 @@ class VoucherAPI:
         return self.get_user_vouchers(cinema_id, token, status_filter=status)
     
     def export_vouchers_data(self, cinema_id: str, token: str, 
-                           export_format: str = 'json') -> Dict[str, Any]:
+                           export_format: str = 'json', compress: bool = False) -> Dict[str, Any]:
         """
         导出券数据
         
         Args:
             cinema_id: 影院ID
             token: 用户token
-            export_format: 导出格式 (json, csv)
+            export_format: 导出格式 (json, csv, jsonl)；csv/jsonl 边分页获取边写入
+            compress: 是否gzip压缩（csv, jsonl）
             
         Returns:
             导出结果
         """
         try:
-            vouchers, page_info = self.voucher_service.get_all_vouchers(cinema_id, token)
-            statistics = self.voucher_service.get_voucher_statistics(vouchers)
-            
-            export_data = {
-                'export_time': self.data_utils.get_current_timestamp(),
-                'cinema_id': cinema_id,
-                'total_vouchers': len(vouchers),
-                'statistics': statistics,
-                'vouchers': [voucher.to_dict() for voucher in vouchers]
-            }
-            
-            if export_format.lower() == 'json':
-                # 保存为JSON文件
-                filename = f"vouchers_export_{cinema_id}_{self.data_utils.get_current_timestamp()}.json"
-                filepath = f"data/exports/{filename}"
-                
-                # 确保目录存在
-                import os
+            import os
+            from services.voucher_exporter import default_export_path, export_vouchers
+
+            export_format = export_format.lower()
+
+            # 🔧 CSV/JSONL 流式导出：每页到达后立即写入，不在内存中保留完整列表
+            if export_format in ('csv', 'jsonl'):
+                filepath = default_export_path(export_format, compress, name=f"vouchers_export_{cinema_id}")
+                result = export_vouchers([{'cinema_id': cinema_id, 'token': token}], filepath,
+                                         export_format, compress)
+                return self._export_response(result)
+
+            if export_format == 'json':
+                # JSON文档包含统计信息，使用券库存缓存中的完整列表
+                vouchers, page_info = self.inventory.get_vouchers(cinema_id, token)
+                if not page_info:
+                    return {
+                        'success': False,
+                        'code': 500,
+                        'message': '导出失败: 券列表获取失败',
+                        'data': None
+                    }
+
+                # 部分页获取失败时结果未缓存，统计直接基于本次获取到的券
+                failed_pages = page_info.get('failed_pages') or []
+                if failed_pages:
+                    statistics = self.voucher_service.get_voucher_statistics(vouchers)
+                else:
+                    statistics = self.inventory.get_statistics(cinema_id, token)
+
+                export_data = {
+                    'export_time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                    'cinema_id': cinema_id,
+                    'total_vouchers': len(vouchers),
+                    'failed_pages': failed_pages,
+                    'statistics': statistics,
+                    'vouchers': [voucher.to_dict() for voucher in vouchers]
+                }
+
+                filepath = default_export_path('json', name=f"vouchers_export_{cinema_id}")
                 os.makedirs(os.path.dirname(filepath), exist_ok=True)
                 
                 with open(filepath, 'w', encoding='utf-8') as f:
@@ -360,9 +416,10 @@ class VoucherAPI:
                 return {
                     'success': True,
                     'code': 200,
-                    'message': '导出成功',
+                    'message': f"部分导出成功（第{'、'.join(map(str, failed_pages))}页获取失败）" if failed_pages else '导出成功',
                     'data': {
-                        'filename': filename,
+                        'partial': bool(failed_pages),
+                        'filename': os.path.basename(filepath),
                         'filepath': filepath,
                         'format': 'json',
                         'total_vouchers': len(vouchers),
@@ -370,36 +427,6 @@ class VoucherAPI:
                     }
                 }
             
-            elif export_format.lower() == 'csv':
-                # 保存为CSV文件
-                import csv
-                filename = f"vouchers_export_{cinema_id}_{self.data_utils.get_current_timestamp()}.csv"
-                filepath = f"data/exports/{filename}"
-                
-                # 确保目录存在
-                import os
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                
-                with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
-                    if vouchers:
-                        writer = csv.DictWriter(f, fieldnames=vouchers[0].to_dict().keys())
-                        writer.writeheader()
-                        for voucher in vouchers:
-                            writer.writerow(voucher.to_dict())
-                
-                return {
-                    'success': True,
-                    'code': 200,
-                    'message': '导出成功',
-                    'data': {
-                        'filename': filename,
-                        'filepath': filepath,
-                        'format': 'csv',
-                        'total_vouchers': len(vouchers),
-                        'file_size': os.path.getsize(filepath)
-                    }
-                }
-            
             else:
                 return {
                     'success': False,
@@ -417,6 +444,59 @@ class VoucherAPI:
                 'data': None
             }
 
+    def export_multi_account_vouchers(self, accounts: List[Dict[str, str]], export_format: str = 'csv',
+                                      compress: bool = False) -> Dict[str, Any]:
+        """
+        🆕 多账号券数据导出到同一个文件（流式写入）
+
+        Args:
+            accounts: [{'account': 账号标识, 'cinema_id': 影院ID, 'token': 用户token}, ...]
+            export_format: 导出格式 (csv, jsonl)
+            compress: 是否gzip压缩
+
+        Returns:
+            导出结果，data 中含各账号导出数量
+        """
+        try:
+            from services.voucher_exporter import export_vouchers
+            return self._export_response(export_vouchers(accounts, export_format=export_format, compress=compress))
+        except Exception as e:
+            logger.error(f"多账号导出券数据失败: {e}")
+            return {
+                'success': False,
+                'code': 500,
+                'message': f'导出失败: {str(e)}',
+                'data': None
+            }
+
+    @staticmethod
+    def _export_response(result: Dict[str, Any]) -> Dict[str, Any]:
+        """流式导出结果 -> API响应格式"""
+        import os
+
+        if not result['success']:
+            return {
+                'success': False,
+                'code': 500,
+                'message': f"导出失败: {result['error']}",
+                'data': None
+            }
+
+        return {
+            'success': True,
+            'code': 200,
+            'message': '部分导出成功（有账号的券列表获取不完整）' if result['partial'] else '导出成功',
+            'data': {
+                'partial': result['partial'],
+                'filename': os.path.basename(result['filepath']),
+                'filepath': result['filepath'],
+                'format': result['format'],
+                'total_vouchers': result['total_vouchers'],
+                'file_size': result['file_size'],
+                'accounts': result['accounts']
+            }
+        }
+
 # 全局API实例
 voucher_api = VoucherAPI()
 
@@ -429,9 +509,10 @@ def get_user_vouchers(cinema_id: str, token: str, **kwargs) -> Dict[str, Any]:
     """获取用户券列表的便捷函数"""
     return voucher_api.get_user_vouchers(cinema_id, token, **kwargs)
 
-def get_valid_vouchers(cinema_id: str, token: str) -> Dict[str, Any]:
+def get_valid_vouchers(cinema_id: str, token: str, on_page: Optional[PageCallback] = None,
+                       force_refresh: bool = False) -> Dict[str, Any]:
     """获取有效券列表的便捷函数"""
-    return voucher_api.get_valid_vouchers_only(cinema_id, token)
+    return voucher_api.get_valid_vouchers_only(cinema_id, token, on_page=on_page, force_refresh=force_refresh)
 
 def get_order_available_vouchers(cinema_id: str, token: str) -> Dict[str, Any]:
     """获取订单可用券列表的便捷函数（沃美新API）"""
@@ -458,15 +539,8 @@ def validate_voucher_for_order(cinema_id: str, token: str, voucher_code: str) ->
         验证结果
     """
     try:
-        # 获取所有券
-        vouchers, _ = voucher_api.voucher_service.get_all_vouchers(cinema_id, token)
-
-        # 查找指定券号
-        target_voucher = None
-        for voucher in vouchers:
-            if voucher.voucher_code == voucher_code:
-                target_voucher = voucher
-                break
+        # 🔧 通过券内存索引按券号查找
+        target_voucher = voucher_api.inventory.find_voucher(cinema_id, token, voucher_code)
 
         if not target_voucher:
             return {
@@ -121,6 +121,29 @@ class WomeiConfig:
 
         return headers
 
+    @classmethod
+    def build_order_headers(cls, token: str) -> Dict[str, str]:
+        """构建创建订单(order/ticket)请求头 - form-urlencoded格式"""
+        if not token:
+            raise ValueError("Token是必需的，请从accounts.json文件加载")
+
+        return {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 MicroMessenger/7.0.20.1781(0x6700143B) NetType/WIFI MiniProgramEnv/Windows WindowsWechat/WMPF WindowsWechat(0x63090c33)XWEB/13839',
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'x-channel-id': '40000',
+            'tenant-short': 'wmyc',
+            'client-version': '4.0',
+            'xweb_xhr': '1',
+            'x-requested-with': 'wxapp',
+            'token': token,
+            'sec-fetch-site': 'cross-site',
+            'sec-fetch-mode': 'cors',
+            'sec-fetch-dest': 'empty',
+            'referer': 'https://servicewechat.com/wx4bb9342b9d97d53c/33/page-frame.html',
+            'accept-language': 'zh-CN,zh;q=0.9',
+            'priority': 'u=1, i'
+        }
+
 class WomeiAPIAdapter:
     """沃美影院API适配器"""
 
@@ -215,22 +238,7 @@ class WomeiAPIAdapter:
         url = f"https://ct.womovie.cn/ticket/wmyc/cinema/{cinema_id}/order/ticket/"
 
         # 🔧 修复：使用正确的请求头
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36 MicroMessenger/7.0.20.1781(0x6700143B) NetType/WIFI MiniProgramEnv/Windows WindowsWechat/WMPF WindowsWechat(0x63090c33)XWEB/13839',
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'x-channel-id': '40000',
-            'tenant-short': 'wmyc',
-            'client-version': '4.0',
-            'xweb_xhr': '1',
-            'x-requested-with': 'wxapp',
-            'token': self.token,
-            'sec-fetch-site': 'cross-site',
-            'sec-fetch-mode': 'cors',
-            'sec-fetch-dest': 'empty',
-            'referer': 'https://servicewechat.com/wx4bb9342b9d97d53c/33/page-frame.html',
-            'accept-language': 'zh-CN,zh;q=0.9',
-            'priority': 'u=1, i'
-        }
+        headers = WomeiConfig.build_order_headers(self.token)
 
         # 🔧 修复：使用form-urlencoded格式的数据
         data = {
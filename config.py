@@ -68,6 +68,30 @@ class Config:
         """是否禁用SSL验证（仅用于测试）"""
         return os.getenv('DISABLE_SSL_VERIFY', 'false').lower() == 'true'
     
+    @property
+    def SEAT_DEBUG_CAPTURE(self) -> float:
+        """座位调试数据采样比例（0=关闭，1=每次加载都采集）"""
+        try:
+            return float(os.getenv('SEAT_DEBUG_CAPTURE', '0'))
+        except ValueError:
+            return 0.0
+
+    @property
+    def ORDER_TRACE(self) -> bool:
+        """是否记录订单流程链路耗时（Ctrl+Shift+T 导出为Chrome trace）"""
+        return os.getenv('ORDER_TRACE', 'true').lower() == 'true'
+
+    # 座位图配置
+    @property
+    def SEAT_AUTO_REFRESH(self) -> bool:
+        """座位图是否默认开启可售座位实时刷新"""
+        return os.getenv('SEAT_AUTO_REFRESH', 'false').lower() == 'true'
+
+    @property
+    def SEAT_MAP_RENDERER(self) -> str:
+        """座位图渲染方式: auto(按座位数自动选择), widget(按钮), painted(自绘)"""
+        return os.getenv('SEAT_MAP_RENDERER', 'auto').lower()
+
     # 数据库配置（如果需要）
     @property
     def DB_HOST(self) -> str:
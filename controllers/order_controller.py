@@ -230,7 +230,7 @@ class OrderController(QObject):
         except Exception as e:
             print(f"[订单控制器] 获取取票码错误: {e}")
     
-    def cancel_order(self, order_id: str) -> bool:
+    def cancel_order(self, order_id: str, cinemaid: Optional[str] = None) -> bool:
         """取消订单"""
         try:
             # 这里可以添加取消订单的API调用
@@ -238,10 +238,12 @@ class OrderController(QObject):
             
             if not self.current_account:
                 return False
+
+            # 影院ID：优先使用参数，其次当前订单、当前账号
+            cinemaid = (cinemaid or (self.current_order or {}).get('cinemaid') or
+                        self.current_account.get('cinemaid', ''))
             
-            result = cancel_all_unpaid_orders({
-                'account': self.current_account
-            })
+            result = cancel_all_unpaid_orders(self.current_account, cinemaid)
             
             if result and result.get('resultCode') == '0':
                 print(f"[订单控制器] 订单取消成功: {order_id}")
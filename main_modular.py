@@ -20,6 +20,7 @@ except ImportError as e:
     from api.cinema_api_client_simple import get_api_client, APIException
 from patterns.order_observer import get_order_subject, setup_order_observers, OrderStatus
 from patterns.payment_strategy import get_payment_context, PaymentContext
+from performance.tracer import get_tracer, traced
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot, QTimer
 # 导入插件系统
 from ui.interfaces.plugin_interface import (
@@ -729,6 +730,7 @@ class ModularCinemaMainWindow(QMainWindow):
         self.tab_manager_widget.session_selected.connect(self._on_session_selected)
         self.tab_manager_widget.seat_load_requested.connect(self._on_seat_load_requested)  # 🆕 座位图加载请求
         self.tab_manager_widget.token_expired.connect(self._on_token_expired)  # 🔧 Token失效信号
+        self.tab_manager_widget.best_coupon_requested.connect(self._on_best_coupon_requested)  # 🆕 一键最优券
         
         # 座位选择信号
         self.seat_input.textChanged.connect(self._on_seat_input_changed)
@@ -741,6 +743,16 @@ class ModularCinemaMainWindow(QMainWindow):
 
         # 主窗口信号
         self.login_success.connect(self._on_main_login_success)
+
+        # 🆕 运行时切换座位调试数据采集
+        from PyQt5.QtWidgets import QShortcut
+        from PyQt5.QtGui import QKeySequence
+        self.debug_capture_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.debug_capture_shortcut.activated.connect(self._toggle_debug_capture)
+
+        # 🆕 导出订单流程链路耗时
+        self.trace_export_shortcut = QShortcut(QKeySequence("Ctrl+Shift+T"), self)
+        self.trace_export_shortcut.activated.connect(self._export_order_trace)
     
     def _connect_global_events(self):
         """连接全局事件"""
@@ -1423,13 +1435,14 @@ class ModularCinemaMainWindow(QMainWindow):
             })
             
             # 更新订单表格
-            if hasattr(self.tab_manager_widget, 'order_table') and orders:
+            if hasattr(self.tab_manager_widget, 'order_model') and orders:
                 self._update_order_table(orders)
                 
             
         except Exception as e:
             pass
     
+    @traced('pay', kind='network')
     def on_one_click_pay(self):
         """🆕 一键支付处理 - 重构完整支付逻辑"""
         try:
@@ -1737,6 +1750,7 @@ class ModularCinemaMainWindow(QMainWindow):
 
     # 🚫 已移除会员卡密码获取功能，专注于券码支付
 
+    @traced('payment_init', kind='network', key_arg='order_id')
     def _initialize_order_payment_method(self, order_id: str, cinema_id: str, token: str) -> dict:
         """
         订单支付方式预初始化（核心修复方法）
@@ -1968,10 +1982,7 @@ class ModularCinemaMainWindow(QMainWindow):
     def _cancel_unpaid_orders(self, account, cinemaid):
         """取消未支付订单"""
         try:
-            result = cancel_all_unpaid_orders({
-                'account': account,
-                'cinemaid': cinemaid
-            })
+            result = cancel_all_unpaid_orders(account, cinemaid)
             
             if result and result.get('resultCode') == '0':
                 pass
@@ -2123,8 +2134,6 @@ class ModularCinemaMainWindow(QMainWindow):
     def _create_womei_order_direct(self, selected_seats, session_info):
         """沃美系统专用：直接创建订单（抛弃华联系统逻辑）"""
         try:
-            pass
-
             # 🔧 沃美系统：从session_info获取必要数据
             cinema_data = session_info.get('cinema_data', {})
             account_data = session_info.get('account', {})
@@ -2134,33 +2143,33 @@ class ModularCinemaMainWindow(QMainWindow):
             schedule_id = session_data.get('schedule_id', '')
             token = account_data.get('token', '')
 
-            print(f"  - cinema_id: {cinema_id}")
-            print(f"  - schedule_id: {schedule_id}")
-            # 安全的Token显示
-            if token:
-                print(f"  - token: {token[:10]}*** (已配置)")
-            else:
-                print(f"  - token: 未配置")
-            print(f"  - 座位数: {len(selected_seats)}")
-
             if not cinema_id or not schedule_id or not token:
+                print(f"[沃美订单] ❌ 参数不完整: cinema_id={cinema_id}, schedule_id={schedule_id}, "
+                      f"token={'已配置' if token else '未配置'}")
                 return False
 
-            # 🔧 沃美系统：构建真实的座位参数
-            seatlable = self._build_womei_seatlable_from_selected_seats(selected_seats)
+            # 🆕 快速通道：选座时已预构建请求并预热连接，这里只做一次发送，日志推迟到响应之后
+            from services.order_submit_service import get_order_submit_service
+            submit_service = get_order_submit_service()
+            prepared = submit_service.prepare(token, cinema_id, schedule_id, selected_seats)
 
-            if not seatlable:
+            if not prepared:
                 print(f"[沃美订单] ❌ 座位参数构建失败")
                 return False
 
-            # 🔧 沃美系统：调用专用API
-            from services.womei_film_service import get_womei_film_service
-            film_service = get_womei_film_service(token)
+            with get_tracer().span('create_order', kind='network') as span:
+                result = submit_service.submit(prepared)
+                if span is not None and not result.get('success'):
+                    span.outcome = 'failed'
 
-            result = film_service.create_order(cinema_id, seatlable, schedule_id)
+            if result.get('success'):
+                get_tracer().bind_key(result.get('order_id'))
+            else:
+                get_tracer().finish_trace(outcome='create_failed')
 
             # 🔍 格式化打印订单接口返回信息
             self._print_order_api_response(result, "沃美订单直接创建API")
+            print(f"[沃美订单] ⏱️ 锁座耗时统计(ms): {submit_service.get_latency_stats()}")
 
             # 🔧 沃美系统：处理返回结果
             if result and result.get('success'):
@@ -2177,45 +2186,31 @@ class ModularCinemaMainWindow(QMainWindow):
             traceback.print_exc()
             return False
 
-    def _build_womei_seatlable_from_selected_seats(self, selected_seats):
-        """沃美系统专用：从选中座位构建座位参数"""
+    def _prepare_womei_order_submit(self, selected_seats):
+        """🆕 选座变化时预构建创建订单请求并预热连接"""
         try:
-            pass
-
-            seat_parts = []
-            for i, seat in enumerate(selected_seats):
-                # 从original_data获取真实的座位图API数据
-                original_data = seat.get('original_data', {})
-
-                # 优先使用original_data中的真实数据
-                real_seat_no = original_data.get('seat_no', '')
-                real_area_no = original_data.get('area_no', '')
-                real_row = original_data.get('row', '')
-                real_col = original_data.get('col', '')
-
-                # 验证数据完整性
-                if not real_seat_no or '#' not in real_seat_no:
-                    return ""
-
-                if not real_area_no:
-                    return ""
-
-                # 🔧 修复：使用真实的座位图API数据构建参数
-                # 沃美格式：area_no:row:col:seat_no
-                seat_str = f"{real_area_no}:{real_row}:{real_col}:{real_seat_no}"
-                seat_parts.append(seat_str)
-
-                print(f"[沃美座位] 座位{i+1}构建: {seat_str}")
+            panel = getattr(self, 'current_seat_panel', None)
+            session_info = getattr(panel, 'session_info', None) or {}
+            if not selected_seats or not session_info:
+                return
 
-            seatlable_str = "|".join(seat_parts)
+            from services.order_submit_service import get_order_submit_service
+            get_order_submit_service().prepare(
+                session_info.get('account', {}).get('token', ''),
+                session_info.get('cinema_data', {}).get('cinema_id', ''),
+                session_info.get('session_data', {}).get('schedule_id', ''),
+                selected_seats
+            )
+        except Exception as e:
+            print(f"[沃美订单] ⚠️ 预构建订单请求失败: {e}")
 
-            return seatlable_str
+    def _build_womei_seatlable_from_selected_seats(self, selected_seats):
+        """沃美系统专用：从选中座位构建座位参数"""
+        from services.order_submit_service import build_seatlable
 
-        except Exception as e:
-            print(f"[沃美座位] ❌ 构建失败: {e}")
-            import traceback
-            traceback.print_exc()
-            return ""
+        seatlable_str = build_seatlable(selected_seats)
+        print(f"[沃美座位] 座位参数: {seatlable_str or '构建失败'}")
+        return seatlable_str
 
     def _enhance_seat_info_for_display(self, selected_seats):
         """
@@ -2352,10 +2347,6 @@ class ModularCinemaMainWindow(QMainWindow):
             order_id = result.get('order_id', f"WOMEI{int(__import__('time').time())}")
             order_info = result.get('order_info', {})
 
-            # 🆕 查询并打印详细的订单信息
-            if order_id and order_id != f"WOMEI{int(__import__('time').time())}":
-                self._query_and_print_order_detail(order_id, session_info)
-
             # 从session_info获取显示数据
             cinema_data = session_info.get('cinema_data', {})
             session_data = session_info.get('session_data', {})
@@ -2398,20 +2389,9 @@ class ModularCinemaMainWindow(QMainWindow):
             account_data = session_info.get('account', {})
             token = account_data.get('token', '')
 
-
-            if token and cinema_id:
-                init_result = self._initialize_order_payment_method(order_id, cinema_id, token)
-                if init_result.get('success', False):
-                    pass
-                else:
-                    print(f"[沃美订单初始化] ⚠️ 订单支付方式初始化失败: {init_result.get('error', '未知错误')}")
-                    # 注意：初始化失败不阻断订单创建流程，仅记录日志
-            else:
-                pass
-
-            # 🆕 获取可用券列表 - 修复参数传递
-
-            self._load_available_coupons(order_id, cinema_id)
+            # 🆕 订单详情、支付方式初始化、可用券查询在后台并发执行，界面逐步填充
+            self._start_post_order_pipeline(order_id, cinema_id, token, session_info,
+                                            query_detail=bool(result.get('order_id')))
 
             # 发布全局事件
             if hasattr(self, 'event_bus'):
@@ -2425,23 +2405,63 @@ class ModularCinemaMainWindow(QMainWindow):
             traceback.print_exc()
             return False
 
-    def _save_enhanced_seat_debug_data(self, cinema_id: str, hall_id: str, schedule_id: str, seat_result: dict, session_info: dict):
-        """保存增强的座位调试数据，包含完整的会话信息"""
-        try:
-            import os
-            import json
-            from datetime import datetime
+    def _start_post_order_pipeline(self, order_id: str, cinema_id: str, token: str, session_info: dict,
+                                   query_detail: bool = True):
+        """🆕 订单创建成功后的后续请求按任务图执行
+
+        订单详情、支付方式初始化、可用券查询互不依赖，并发执行；
+        券列表在支付方式初始化完成后才显示，避免初始化前用券导致4004
+        """
+        from performance.task_graph import TaskGraph
+
+        graph = TaskGraph(name=f"post_order_{order_id}")
+
+        if query_detail:
+            graph.add_task('order_detail', self._query_and_print_order_detail, order_id, session_info)
+
+        coupon_deps = ['vouchers']
+        if token and cinema_id:
+            graph.add_task('payment_init', self._initialize_order_payment_method, order_id, cinema_id, token,
+                           on_ui=self._on_order_payment_init_finished)
+            coupon_deps.append('payment_init')
+
+        graph.add_task('vouchers', self._fetch_available_coupons, order_id, cinema_id)
+        graph.add_task('show_coupons', None, deps=coupon_deps,
+                       on_ui=lambda results: self._on_post_order_coupons_ready(order_id, results.get('vouchers')))
+        graph.graph_finished.connect(
+            lambda timings: print(f"[沃美订单] ⏱️ 订单后续请求完成，耗时(ms): {timings}"))
+
+        # 保持引用，避免任务图在执行过程中被回收
+        self._post_order_graph = graph
+        graph.start()
+
+    def _on_order_payment_init_finished(self, init_result: dict):
+        """🆕 支付方式初始化完成（主线程）"""
+        if not init_result.get('success', False):
+            # 注意：初始化失败不阻断订单创建流程，仅记录日志
+            print(f"[沃美订单初始化] ⚠️ 订单支付方式初始化失败: {init_result.get('error', '未知错误')}")
+
+    def _on_post_order_coupons_ready(self, order_id: str, coupon_result):
+        """🆕 可用券查询完成（主线程），订单已切换时丢弃旧结果"""
+        current_order_id = (self.current_order or {}).get('order_id')
+        if current_order_id != order_id:
+            print(f"[优惠券] 订单已切换({order_id} -> {current_order_id})，忽略旧的券列表结果")
+            return
+
+        self._apply_available_coupons_result(coupon_result)
 
-            # 确保data目录存在
-            os.makedirs('data', exist_ok=True)
+    def _save_enhanced_seat_debug_data(self, cinema_id: str, hall_id: str, schedule_id: str, seat_result: dict, session_info: dict):
+        """采集增强的座位调试数据，包含完整的会话信息（按采样比例在后台线程压缩写入）"""
+        from datetime import datetime
+        from utils.debug_capture import get_debug_capture
 
+        def build_debug_data():
             # 从session_info获取详细的会话信息
             cinema_data = session_info.get('cinema_data', {})
             session_data = session_info.get('session_data', {})
             account_data = session_info.get('account', {})
 
-            # 构建增强的调试数据
-            enhanced_debug_data = {
+            return {
                 "session_info": {
                     "cinema_name": cinema_data.get('cinema_name', cinema_data.get('cinemaShortName', '沃美影院')),
                     "movie_name": session_data.get('movie_name', session_data.get('filmName', '未知影片')),
@@ -2464,42 +2484,35 @@ class ModularCinemaMainWindow(QMainWindow):
                     "token_status": "已配置" if account_data.get('token') else "未配置"
                 },
                 "debug_notes": {
-                    "purpose": "增强的座位图调试数据（包含完整会话信息，每次覆盖保存）",
+                    "purpose": "增强的座位图调试数据（包含完整会话信息）",
                     "area_no_usage": "区域ID应该使用area_no字段，不是固定的1",
                     "seat_no_format": "seat_no应该是类似11051771#09#06的格式",
                     "coordinate_mapping": "row/col是逻辑位置，x/y是物理位置",
                     "status_meaning": "0=可选，1=已售，2=锁定，6=不可选择",
-                    "file_location": "data/座位调试数据.json（固定文件名，每次覆盖）",
-                    "enhanced_features": [
-                        "包含完整的影院、影片、场次信息",
-                        "包含账号信息（脱敏处理）",
-                        "包含会话上下文数据",
-                        "便于调试座位参数构建问题"
-                    ]
+                    "file_location": "data/debug_captures/seat_session_*.json.gz（循环保留最新的文件）"
                 }
             }
 
-            # 🔧 修改：固定文件名，每次覆盖
-            filename = "data/座位调试数据.json"
+        get_debug_capture().capture('seat_session', build_debug_data)
 
-            # 保存到文件
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(enhanced_debug_data, f, ensure_ascii=False, indent=2)
+    def _toggle_debug_capture(self):
+        """运行时切换座位调试数据采集（Ctrl+Shift+D）"""
+        from utils.debug_capture import get_debug_capture
+        enabled = get_debug_capture().toggle()
+        MessageManager.show_info(self, "调试数据采集", f"座位调试数据采集已{'开启' if enabled else '关闭'}")
 
-            print(f"[主窗口] 📁 座位调试数据已覆盖保存: {filename}")
-            print(f"[主窗口] 📊 当前会话数据:")
-            print(f"  - 影院: {enhanced_debug_data['session_info']['cinema_name']}")
-            print(f"  - 影片: {enhanced_debug_data['session_info']['movie_name']}")
-            print(f"  - 场次: {enhanced_debug_data['session_info']['show_date']} {enhanced_debug_data['session_info']['show_time']}")
-            print(f"  - 影厅: {enhanced_debug_data['session_info']['hall_name']}")
-            print(f"  - 账号: {enhanced_debug_data['session_info']['account_phone']}")
-            print(f"  - 文件大小: {os.path.getsize(filename)} bytes")
-            print(f"  - 保存方式: 覆盖保存（固定文件名）")
+    def _export_order_trace(self):
+        """导出最近的订单流程链路为Chrome trace JSON（Ctrl+Shift+T）"""
+        try:
+            tracer = get_tracer()
+            if not tracer.traces:
+                MessageManager.show_info(self, "链路追踪", "暂无订单流程链路记录")
+                return
 
+            path = tracer.export_chrome_trace()
+            MessageManager.show_info(self, "链路追踪", f"已导出 {len(tracer.traces)} 条链路:\n{path}")
         except Exception as e:
-            print(f"[主窗口] ❌ 保存增强座位调试数据失败: {e}")
-            import traceback
-            traceback.print_exc()
+            MessageManager.show_error(self, "链路追踪", f"导出失败: {e}")
 
     def _build_womei_seatlable(self, seat_info_list, session_info):
         """构建沃美系统的座位参数格式 - 真实格式"""
@@ -2913,33 +2926,23 @@ class ModularCinemaMainWindow(QMainWindow):
             pass
     
     def _update_order_table(self, orders):
-        """更新订单表格"""
+        """更新订单表格（🔧 通过订单表格Model只变更差异行）"""
         try:
-            if not hasattr(self.tab_manager_widget, 'order_table'):
+            if not hasattr(self.tab_manager_widget, 'order_model'):
                 return
-                
-            table = self.tab_manager_widget.order_table
-            table.setRowCount(len(orders))
-            
-            for i, order in enumerate(orders):
-                table.setItem(i, 0, table.__class__.createItem(order.get('movie', '')))
-                table.setItem(i, 1, table.__class__.createItem(order.get('cinema', '')))
-                
-                status = order.get('status', '')
-                if status == '已完成':
-                    table.add_colored_item(i, 2, status, "#4caf50")
-                elif status == '待支付':
-                    table.add_colored_item(i, 2, status, "#ff9800")
-                elif status == '已取消':
-                    table.add_colored_item(i, 2, status, "#f44336")
-                else:
-                    table.setItem(i, 2, table.__class__.createItem(status))
-                
-                table.setItem(i, 3, table.__class__.createItem(order.get('order_id', '')))
-                
+
+            self.tab_manager_widget.order_data_cache = orders
+            self.tab_manager_widget.order_model.set_orders(orders, self._format_order_list_row)
+
         except Exception as e:
             pass
 
+    @staticmethod
+    def _format_order_list_row(order: dict) -> tuple:
+        """订单列表接口格式 -> (影片, 影院, 状态, 订单号)"""
+        return (str(order.get('movie', '')), str(order.get('cinema', '')),
+                str(order.get('status', '')), str(order.get('order_id', '')))
+
     # ===== 定时器相关方法（PyQt5替换tkinter.after） =====
     
     # 🆕 移除倒计时相关方法
@@ -3059,6 +3062,8 @@ class ModularCinemaMainWindow(QMainWindow):
     def _clear_seat_area(self):
         """清理座位区域的所有组件"""
         try:
+            self._stop_seat_refresher()
+
             if hasattr(self, 'seat_area_layout') and self.seat_area_layout:
                 # 清理布局中的所有组件
                 while self.seat_area_layout.count():
@@ -3175,18 +3180,25 @@ class ModularCinemaMainWindow(QMainWindow):
             if seat_matrix and len(seat_matrix) > 0:
                 try:
                     # 替换占位符为实际的座位图组件
-                    from ui.components.seat_map_panel_pyqt5 import SeatMapPanelPyQt5
+                    from config import config
+                    from ui.components.seat_map_canvas_pyqt5 import get_seat_map_panel_class
                     
-                    # 移除现有的占位符
                     if hasattr(self, 'seat_area_layout'):
-                        # 清除现有组件
-                        while self.seat_area_layout.count():
-                            child = self.seat_area_layout.takeAt(0)
-                            if child.widget():
-                                child.widget().deleteLater()
-                        
-                        # 创建新的座位图面板
-                        seat_panel = SeatMapPanelPyQt5()
+                        # 大厅使用自绘版本
+                        panel_class = get_seat_map_panel_class(hall_info.get('seat_count', 0), config.SEAT_MAP_RENDERER)
+
+                        # 🆕 同类型面板仍在显示时直接复用，座位按钮由面板内部对象池复用
+                        seat_panel = self._get_reusable_seat_panel(panel_class)
+                        is_new_panel = seat_panel is None
+
+                        if is_new_panel:
+                            # 移除现有的占位符和旧面板
+                            while self.seat_area_layout.count():
+                                child = self.seat_area_layout.takeAt(0)
+                                if child.widget():
+                                    child.widget().deleteLater()
+
+                            seat_panel = panel_class()
 
                         # 🆕 使用多区域更新方法
                         if 'area_data' in locals():
@@ -3200,18 +3212,22 @@ class ModularCinemaMainWindow(QMainWindow):
                         print(f"  - 账号数据: {'存在' if session_info.get('account') else '缺失'}")
                         print(f"  - 场次数据: {'存在' if session_info.get('session_data') else '缺失'}")
 
-                        # 连接座位选择信号
-                        seat_panel.seat_selected.connect(self._on_seat_map_selection_changed)
+                        if is_new_panel:
+                            # 连接座位选择信号
+                            seat_panel.seat_selected.connect(self._on_seat_map_selection_changed)
 
-                        # 🆕 连接提交订单回调
-                        seat_panel.set_on_submit_order(self._on_seat_panel_submit_order)
-                        seat_panel.set_account_getter(lambda: self.current_account)
-                        
-                        # 添加到布局
-                        self.seat_area_layout.addWidget(seat_panel)
+                            # 🆕 连接提交订单回调
+                            seat_panel.set_on_submit_order(self._on_seat_panel_submit_order)
+                            seat_panel.set_account_getter(lambda: self.current_account)
+
+                            # 添加到布局
+                            self.seat_area_layout.addWidget(seat_panel)
                         
                         # 保存引用
                         self.current_seat_panel = seat_panel
+
+                        # 🆕 可售座位实时刷新
+                        self._setup_seat_refresher(seat_panel, session_info)
                         
                         # 更新成功信息
                         session_text = session_info.get('session_text', 'N/A')
@@ -3240,6 +3256,60 @@ class ModularCinemaMainWindow(QMainWindow):
             traceback.print_exc()
             self._safe_update_seat_area("显示座位图异常\n\n请重新选择场次")
 
+    def _get_reusable_seat_panel(self, panel_class):
+        """返回仍在座位区域中显示、且类型相同的当前座位面板，不可复用时返回None"""
+        seat_panel = getattr(self, 'current_seat_panel', None)
+        if seat_panel is None or type(seat_panel) is not panel_class:
+            return None
+
+        try:
+            if self.seat_area_layout.indexOf(seat_panel) < 0:
+                return None
+        except RuntimeError:
+            # 面板已被删除
+            return None
+
+        return seat_panel
+
+    def _setup_seat_refresher(self, seat_panel, session_info: dict):
+        """为当前座位图创建可售座位实时刷新器"""
+        try:
+            self._stop_seat_refresher()
+
+            cinema_id = (session_info.get('cinema_data') or {}).get('cinemaid', '')
+            schedule_id = (session_info.get('session_data') or {}).get('schedule_id', '')
+            token = (session_info.get('account') or {}).get('token', '')
+            if not all([cinema_id, schedule_id, token]):
+                seat_panel.auto_refresh_checkbox.setEnabled(False)
+                return
+
+            from config import config
+            from services.seat_refresh_service import SeatStatusRefresher
+
+            self.seat_refresher = SeatStatusRefresher(seat_panel, token, cinema_id, schedule_id)
+
+            # 复用的面板上可能还连着上一个场次的刷新器
+            try:
+                seat_panel.auto_refresh_toggled.disconnect()
+            except TypeError:
+                pass
+            seat_panel.auto_refresh_toggled.connect(self.seat_refresher.set_enabled)
+            seat_panel.auto_refresh_checkbox.setEnabled(True)
+
+            if config.SEAT_AUTO_REFRESH or seat_panel.auto_refresh_checkbox.isChecked():
+                seat_panel.set_auto_refresh_checked(True)
+                self.seat_refresher.start()
+
+        except Exception as e:
+            print(f"[主窗口] ⚠️ 座位实时刷新初始化失败: {e}")
+
+    def _stop_seat_refresher(self):
+        """停止当前座位图的实时刷新"""
+        refresher = getattr(self, 'seat_refresher', None)
+        if refresher:
+            refresher.stop()
+            self.seat_refresher = None
+
     def _parse_womei_room_seat(self, room_seat: List[Dict], hall_info: dict) -> tuple[List[List[Dict]], List[Dict]]:
         """解析沃美room_seat数据为座位矩阵和区域数据（增强调试功能）"""
         try:
@@ -3553,6 +3623,9 @@ class ModularCinemaMainWindow(QMainWindow):
             
             # 触发座位选择事件
             self._on_seat_selected(", ".join([seat.get('num', '') for seat in selected_seats]))
+
+            # 🆕 预构建创建订单请求，提交时直接发送
+            self._prepare_womei_order_submit(selected_seats)
             
         except Exception as e:
             import traceback
@@ -3583,8 +3656,12 @@ class ModularCinemaMainWindow(QMainWindow):
                 else:
                     pass
 
+                # 🆕 订单流程链路追踪从提交订单开始
+                get_tracer().start_trace('order_flow')
+
                 # 🔧 修复：直接使用沃美专用订单创建流程
-                self._create_womei_order_direct(selected_seats, session_info)
+                with get_tracer().span('submit_order', seats=len(selected_seats)):
+                    self._create_womei_order_direct(selected_seats, session_info)
 
             else:
                 # 兼容旧格式：只有座位数据
@@ -3761,6 +3838,12 @@ class ModularCinemaMainWindow(QMainWindow):
     def _on_global_order_paid(self, order_id: str):
         """全局订单支付处理 - 修复：不覆盖已显示的取票码二维码"""
         try:
+            # 🆕 支付成功后券已核销，使当前账号的券库存缓存失效
+            account = getattr(self, 'current_account', None) or {}
+            if account.get('token'):
+                from services.voucher_inventory import invalidate_voucher_inventory
+                invalidate_voucher_inventory(account['token'])
+
             # 🔧 修复：支付成功后不再覆盖取票码显示
             # 因为_get_ticket_code_after_payment已经处理了取票码显示
             # 这里只做必要的状态更新，不覆盖二维码显示
@@ -3786,11 +3869,42 @@ class ModularCinemaMainWindow(QMainWindow):
                     }
                 """)
 
+                # 🆕 取票码可能尚未生成，后台轮询订单状态，出码后自动显示
+                self._watch_paid_order(order_id)
+
             # 🆕 移除倒计时显示更新
 
         except Exception as e:
             pass
 
+    def _watch_paid_order(self, order_id: str):
+        """🆕 支付后监视订单状态，取票码就绪后自动生成二维码"""
+        order = self.current_order or {}
+        cinema_id = order.get('cinemaid') or order.get('cinema_id') or getattr(self, '_payment_cinema_id', '')
+        token = (self.current_account or {}).get('token', '')
+
+        def on_watch_finished(watched_order_id: str, outcome: dict):
+            detail = outcome.get('order_detail') or {}
+            if not detail.get('ticket_code'):
+                if outcome.get('timed_out'):
+                    self._show_payment_success_without_qrcode(watched_order_id)
+                return
+
+            # 转换为取票码显示流程使用的字段名
+            detail_data = dict(detail)
+            detail_data.update({
+                'qrCode': detail.get('ticket_code', ''),
+                'filmName': detail.get('film_name', ''),
+                'showTime': detail.get('show_time', ''),
+                'hallName': detail.get('hall_name', ''),
+                'seatInfo': detail.get('seat_info', ''),
+                'cinemaName': detail.get('cinema_name', '')
+            })
+            self._get_ticket_code_after_payment(watched_order_id, cinema_id, detail_data)
+
+        from services.order_status_watcher import get_order_status_watcher
+        get_order_status_watcher().watch(order_id, cinema_id, token, callback=on_watch_finished)
+
     def _get_ticket_code_after_payment(self, order_id: str, cinema_id: str, detail_data: dict):
         """支付成功后获取取票码并显示（与双击订单流程一致）"""
         try:
@@ -3812,12 +3926,16 @@ class ModularCinemaMainWindow(QMainWindow):
                 # 显示支付成功但无取票码的信息
                 self._show_payment_success_without_qrcode(order_id)
 
+            get_tracer().finish_trace(order_id, 'ok' if final_ticket_code else 'no_ticket_code')
+
         except Exception as e:
             import traceback
             traceback.print_exc()
             # 降级显示支付成功信息
             self._show_payment_success_without_qrcode(order_id)
+            get_tracer().finish_trace(order_id, 'error')
 
+    @traced('generate_qrcode', kind='cpu', key_arg='order_id')
     def _generate_payment_success_qrcode(self, order_id: str, ticket_code: str, detail_data: dict, cinema_id: str):
         """支付成功后生成并显示取票码二维码"""
         try:
@@ -5046,6 +5164,7 @@ class ModularCinemaMainWindow(QMainWindow):
 
         print(f"{'=' * 80}")
 
+    @traced('order_detail', kind='network', key_arg='order_id')
     def _query_and_print_order_detail(self, order_id: str, session_info: dict):
         """查询并打印沃美订单详细信息"""
         try:
@@ -5289,6 +5408,16 @@ class ModularCinemaMainWindow(QMainWindow):
 
     def _load_available_coupons(self, order_id: str, cinema_id: str):
         """获取订单可用券列表 - 复用现有实现"""
+        coupon_result = self._fetch_available_coupons(order_id, cinema_id)
+        self._apply_available_coupons_result(coupon_result)
+
+    @traced('available_vouchers', kind='network', key_arg='order_id')
+    def _fetch_available_coupons(self, order_id: str, cinema_id: str):
+        """🆕 查询订单可用券（只发起网络请求，不操作界面，可在后台线程调用）
+
+        Returns:
+            沃美券API的响应；本地参数校验失败或请求异常时返回 {'local_error': 提示文字}
+        """
         try:
             print(f"  - current_account存在: {bool(self.current_account)}")
             print(f"  - order_id: '{order_id}' (长度: {len(order_id) if order_id else 0})")
@@ -5296,18 +5425,15 @@ class ModularCinemaMainWindow(QMainWindow):
 
             if not self.current_account:
                 print("[优惠券] ❌ 券列表加载失败：缺少账号信息")
-                self._show_coupon_error_message("缺少账号信息，无法加载券列表")
-                return
+                return {'local_error': "缺少账号信息，无法加载券列表"}
 
             if not order_id:
                 print("[优惠券] ❌ 券列表加载失败：缺少订单号")
-                self._show_coupon_error_message("缺少订单号，无法加载券列表")
-                return
+                return {'local_error': "缺少订单号，无法加载券列表"}
 
             if not cinema_id:
                 print("[优惠券] ❌ 券列表加载失败：缺少影院ID")
-                self._show_coupon_error_message("缺少影院ID，无法加载券列表")
-                return
+                return {'local_error': "缺少影院ID，无法加载券列表"}
 
             # 🆕 获取订单可用券 - 使用沃美新API
             from api.voucher_api import get_order_available_vouchers
@@ -5323,8 +5449,17 @@ class ModularCinemaMainWindow(QMainWindow):
                 print(f"[优惠券] 🎫 Token状态: 未配置")
 
             # 🆕 调用沃美订单可用券API
-            coupon_result = get_order_available_vouchers(cinema_id, token)
+            return get_order_available_vouchers(cinema_id, token)
+
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            print(f"[优惠券] 券列表加载异常: {e}")
+            return {'local_error': "券列表加载异常，请重试"}
 
+    def _apply_available_coupons_result(self, coupon_result):
+        """🆕 根据可用券查询结果刷新券列表界面（主线程调用）"""
+        try:
             # 🆕 检查沃美API响应
             if coupon_result is None:
                 print("[优惠券] 沃美券API返回None，可能是网络异常")
@@ -5336,6 +5471,10 @@ class ModularCinemaMainWindow(QMainWindow):
                 self._show_coupon_error_message("数据格式错误，无法解析券列表")
                 return
 
+            if 'local_error' in coupon_result:
+                self._show_coupon_error_message(coupon_result['local_error'])
+                return
+
             # 🆕 检查沃美API响应状态 (success字段)
             if coupon_result.get('success'):
                 # 成功获取券列表
@@ -5436,17 +5575,12 @@ class ModularCinemaMainWindow(QMainWindow):
     def _show_coupon_error_message(self, error_message: str):
         """显示券列表错误信息"""
         try:
-            # 查找券列表组件
-            coupon_list_widget = None
+            # 🔧 券列表Model显示一行错误提示
+            coupon_model = getattr(getattr(self, 'tab_manager_widget', None), 'coupon_model', None)
 
-            if hasattr(self, 'coupon_list'):
-                coupon_list_widget = self.coupon_list
-            elif hasattr(self, 'tab_manager_widget') and hasattr(self.tab_manager_widget, 'coupon_list'):
-                coupon_list_widget = self.tab_manager_widget.coupon_list
-
-            if coupon_list_widget is not None:
-                coupon_list_widget.clear()
-                coupon_list_widget.addItem(f"❌ {error_message}")
+            if coupon_model is not None:
+                self.coupons_data = []
+                coupon_model.set_message(f"❌ {error_message}")
                 print(f"[优惠券] 券列表错误信息已显示: {error_message}")
             else:
                 print(f"[优惠券] 无法显示券列表错误信息: {error_message}")
@@ -5467,7 +5601,8 @@ class ModularCinemaMainWindow(QMainWindow):
 
             print(f"[优惠券] 显示券列表: {len(coupons)} 张券")
 
-            # 保存券数据到实例变量
+            # 保存券数据到实例变量（跳过无效券数据）
+            coupons = [coupon for coupon in coupons if isinstance(coupon, dict)]
             self.coupons_data = coupons
 
             # 根据当前订单的座位数设置券选择数量限制
@@ -5481,81 +5616,32 @@ class ModularCinemaMainWindow(QMainWindow):
             else:
                 self.max_coupon_select = 1
 
-            # 查找现有的券列表组件
-            coupon_list_widget = None
-
-            # 方法1：直接查找 coupon_list 属性
-            if hasattr(self, 'coupon_list'):
-                coupon_list_widget = self.coupon_list
-
-            # 方法2：查找 tab_manager_widget 中的券列表
-            elif hasattr(self, 'tab_manager_widget') and hasattr(self.tab_manager_widget, 'coupon_list'):
-                coupon_list_widget = self.tab_manager_widget.coupon_list
-
-            # 方法3：遍历查找 QListWidget
-            else:
-                from PyQt5.QtWidgets import QListWidget
-                for child in self.findChildren(QListWidget):
-                    # 检查是否是券列表（通过父组件名称或位置判断）
-                    parent = child.parent()
-                    if parent and hasattr(parent, 'title') and '券' in parent.title():
-                        coupon_list_widget = child
-                        break
+            # 🔧 券列表为Model/View：切换订单时只替换Model数据，单元格文本在绘制可见行时才格式化
+            tab_manager = getattr(self, 'tab_manager_widget', None)
+            coupon_list_widget = getattr(tab_manager, 'coupon_list', None)
 
-            # 处理券列表显示
             if coupon_list_widget is not None:
-                print(f"[优惠券] 券列表组件有效，类型: {type(coupon_list_widget)}")
-
                 # 设置券列表为多选模式
                 from PyQt5.QtWidgets import QAbstractItemView
                 coupon_list_widget.setSelectionMode(QAbstractItemView.MultiSelection)
 
-                # 连接券选择事件
-                if hasattr(coupon_list_widget, 'itemSelectionChanged'):
-                    # 先断开可能存在的连接，避免重复连接
-                    try:
-                        coupon_list_widget.itemSelectionChanged.disconnect()
-                    except:
-                        pass
-                    # 连接新的事件处理器
-                    if hasattr(self, '_on_coupon_selection_changed'):
-                        coupon_list_widget.itemSelectionChanged.connect(self._on_coupon_selection_changed)
+                # 连接券选择事件（先断开可能存在的连接，避免重复连接）
+                selection_model = coupon_list_widget.selectionModel()
+                try:
+                    selection_model.selectionChanged.disconnect(self._on_coupon_selection_changed)
+                except TypeError:
+                    pass
+                selection_model.selectionChanged.connect(self._on_coupon_selection_changed)
 
-                # 清空现有券列表
-                coupon_list_widget.clear()
+                # 清空旧订单的选择（触发选择事件，清除券抵扣信息）
+                selection_model.clearSelection()
 
                 if not coupons:
                     # 显示无券提示
-                    coupon_list_widget.addItem("暂无可用券")
+                    tab_manager.coupon_model.set_message("暂无可用券")
                     return
 
-                # 显示券列表
-                for i, coupon in enumerate(coupons):
-                    # 确保coupon是字典类型
-                    if not isinstance(coupon, dict):
-                        print(f"[优惠券] 跳过无效券数据: {coupon}")
-                        continue
-
-                    # 解析券信息
-                    coupon_name = coupon.get('couponname') or coupon.get('voucherName') or DataUtils.safe_get(coupon, 'name', f'券{i+1}')
-                    expire_date = coupon.get('expireddate') or coupon.get('expiredDate') or DataUtils.safe_get(coupon, 'expireDate', '未知')
-                    coupon_code = coupon.get('couponcode') or coupon.get('voucherCode') or DataUtils.safe_get(coupon, 'code', f'券号{i+1}')
-                    coupon_type = coupon.get('voucherType') or coupon.get('coupontype') or '优惠券'
-
-                    # 如果券类型为空或者是数字，尝试从券名称推断
-                    if not coupon_type or (isinstance(coupon_type, str) and coupon_type.isdigit()):
-                        if '延时' in str(coupon_name):
-                            coupon_type = '延时券'
-                        elif '折' in str(coupon_name):
-                            coupon_type = '折扣券'
-                        elif '送' in str(coupon_name):
-                            coupon_type = '赠送券'
-                        else:
-                            coupon_type = '优惠券'
-
-                    # 格式化显示文本
-                    display_text = f"{coupon_type} | 有效期至 {expire_date} | 券号 {coupon_code}"
-                    coupon_list_widget.addItem(display_text)
+                tab_manager.coupon_model.set_vouchers(coupons)
 
             else:
                 print("[优惠券] 未找到券列表组件")
@@ -5565,6 +5651,75 @@ class ModularCinemaMainWindow(QMainWindow):
             traceback.print_exc()
             print(f"[优惠券] 显示券列表异常: {e}")
 
+    def _on_best_coupon_requested(self):
+        """🆕 一键最优券：后台并发询价，完成后选中支付价格最低的券（选中后走正常的用券流程）"""
+        from services.ui_utils import MessageManager
+
+        if not self.current_order or not self.current_account:
+            MessageManager.show_warning(self, "无法选券", "请先创建订单")
+            return
+
+        coupons = getattr(self, 'coupons_data', None) or []
+        voucher_codes = [coupon.get('couponcode') or coupon.get('voucherCode') or coupon.get('code', '')
+                         for coupon in coupons if isinstance(coupon, dict)]
+        if not any(voucher_codes):
+            MessageManager.show_warning(self, "无法选券", "当前订单没有可用券")
+            return
+
+        cinema_data = getattr(self.tab_manager_widget, 'current_cinema_data', None) or {}
+        cinema_id = (DataUtils.safe_get(cinema_data, 'cinema_id', '') or
+                     DataUtils.safe_get(cinema_data, 'cinemaid', '') or
+                     DataUtils.safe_get(cinema_data, 'id', ''))
+        order_id = self.current_order.get('orderno') or DataUtils.safe_get(self.current_order, 'order_id', '')
+        token = DataUtils.safe_get(self.current_account, 'token', '')
+        if not cinema_id or not order_id or not token:
+            MessageManager.show_warning(self, "无法选券", "缺少影院、订单或账号信息")
+            return
+
+        from performance.task_graph import TaskGraph
+        from services.voucher_optimizer import get_voucher_optimizer
+
+        self.tab_manager_widget.best_coupon_btn.setEnabled(False)
+        graph = TaskGraph(name=f"best_voucher_{order_id}")
+        graph.add_task('best_voucher', get_voucher_optimizer().find_best_voucher,
+                       cinema_id, token, order_id, voucher_codes,
+                       on_ui=lambda result: self._on_best_coupon_found(order_id, result))
+        graph.graph_finished.connect(lambda _: self.tab_manager_widget.best_coupon_btn.setEnabled(True))
+
+        # 保持引用，避免任务图在执行过程中被回收
+        self._best_voucher_graph = graph
+        graph.start()
+
+    def _on_best_coupon_found(self, order_id: str, result: dict):
+        """🆕 最优券询价完成（主线程）：选中最优券，触发券选择事件完成用券"""
+        from services.ui_utils import MessageManager
+
+        current_order_id = (self.current_order or {}).get('orderno') or (self.current_order or {}).get('order_id')
+        if current_order_id != order_id:
+            print(f"[最优券] 订单已切换({order_id} -> {current_order_id})，忽略询价结果")
+            return
+
+        if not result.get('success'):
+            MessageManager.show_warning(self, "最优券", f"没有找到可用的券\n{result.get('error', '')}")
+            return
+
+        best_code = result['best']['voucher_code']
+        tab_manager = self.tab_manager_widget
+        row = tab_manager.coupon_model.find_row(best_code)
+        proxy_index = tab_manager.coupon_proxy_model.mapFromSource(tab_manager.coupon_model.index(row, 0))
+        if row < 0 or not proxy_index.isValid():
+            print(f"[最优券] ⚠️ 券列表中找不到最优券 {best_code}")
+            return
+
+        # 清空已有选择时不触发选择事件，只在选中最优券时触发一次
+        from PyQt5.QtCore import QItemSelectionModel
+        selection_model = tab_manager.coupon_list.selectionModel()
+        selection_model.blockSignals(True)
+        selection_model.clearSelection()
+        selection_model.blockSignals(False)
+        tab_manager.coupon_list.scrollTo(proxy_index)
+        selection_model.select(proxy_index, QItemSelectionModel.Select | QItemSelectionModel.Rows)
+
     def _on_coupon_selection_changed(self):
         """券选择事件处理器 - 修复券信息获取和显示"""
         try:
@@ -5577,7 +5732,7 @@ class ModularCinemaMainWindow(QMainWindow):
             elif hasattr(self, 'tab_manager_widget') and hasattr(self.tab_manager_widget, 'coupon_list'):
                 coupon_list_widget = self.tab_manager_widget.coupon_list
 
-            if not coupon_list_widget:
+            if coupon_list_widget is None:
                 print("[券选择事件] 找不到券列表组件")
                 return
 
@@ -5591,43 +5746,37 @@ class ModularCinemaMainWindow(QMainWindow):
                 print(f"[券选择事件] 券数据类型错误: {type(self.coupons_data)}")
                 return
 
-            # 获取选中的券项目索引
-            selected_items = coupon_list_widget.selectedItems()
-            if selected_items is None:
-                selected_items = []
+            # 🔧 获取选中的行（券列表为Model/View，行索引属于代理Model）
+            from PyQt5.QtCore import QItemSelectionModel
+            selection_model = coupon_list_widget.selectionModel()
+            selected_rows = selection_model.selectedRows() if selection_model is not None else []
 
-            selected_indices = []
-            for item in selected_items:
-                if item is not None:
-                    row = coupon_list_widget.row(item)
-                    if row >= 0:
-                        selected_indices.append(row)
+            def deselect_rows(rows):
+                for index in rows:
+                    selection_model.select(index, QItemSelectionModel.Deselect | QItemSelectionModel.Rows)
 
-            print(f"[券选择事件] 选中券索引: {selected_indices}")
+            print(f"[券选择事件] 选中券行: {[index.row() for index in selected_rows]}")
 
             # 检查max_coupon_select属性
             if not hasattr(self, 'max_coupon_select') or self.max_coupon_select is None:
                 self.max_coupon_select = 1
 
             # 检查选择数量限制
-            if len(selected_indices) > self.max_coupon_select:
+            if len(selected_rows) > self.max_coupon_select:
                 from services.ui_utils import MessageManager
                 MessageManager.show_warning(
                     self, "选择限制",
                     f"最多只能选择 {self.max_coupon_select} 张券"
                 )
                 # 清除多余的选择，保留前面的选择
-                for i, item in enumerate(selected_items):
-                    if i >= self.max_coupon_select:
-                        item.setSelected(False)
+                deselect_rows(selected_rows[self.max_coupon_select:])
                 return
 
             # 获取选中的券号
             selected_codes = []
-            for index in selected_indices:
-                if 0 <= index < len(self.coupons_data):
-                    coupon = self.coupons_data[index]
-
+            for index in selected_rows:
+                coupon = coupon_list_widget.model().voucher_at(index)
+                if coupon is not None:
                     # 确保coupon是字典类型
                     if not isinstance(coupon, dict):
                         print(f"[券选择事件] 跳过无效券数据: {coupon}")
@@ -5670,9 +5819,9 @@ class ModularCinemaMainWindow(QMainWindow):
                     from services.womei_order_voucher_service import get_womei_order_voucher_service
                     voucher_service = get_womei_order_voucher_service()
 
-                    # 🆕 第一步：调用券价格计算接口（必需步骤）
+                    # 🆕 第一步：获取券价格（必需步骤，反复选中同一张券时复用询价结果）
                     print(f"[券选择事件] 1️⃣ 第一步：计算券价格...")
-                    price_result = voucher_service.calculate_voucher_price(
+                    price_result = voucher_service.get_voucher_price_quote(
                         cinema_id=cinema_id,
                         token=account['token'],
                         order_id=order_id,
@@ -5690,8 +5839,7 @@ class ModularCinemaMainWindow(QMainWindow):
                         MessageManager.show_warning(self, "券价格计算失败", f"无法计算券使用后的价格\n{error_msg}")
 
                         # 取消选择
-                        for item in selected_items:
-                            item.setSelected(False)
+                        deselect_rows(selected_rows)
                         return
 
                     # 显示价格计算结果
@@ -5801,8 +5949,7 @@ class ModularCinemaMainWindow(QMainWindow):
                             MessageManager.show_warning(self, "券绑定失败", error_msg)
 
                         # 取消选择
-                        for item in selected_items:
-                            item.setSelected(False)
+                        deselect_rows(selected_rows)
 
                 except Exception as e:
                     import traceback
@@ -5816,8 +5963,7 @@ class ModularCinemaMainWindow(QMainWindow):
                     MessageManager.show_error(self, "选券异常", f"查询券价格信息失败: {e}")
 
                     # 取消选择
-                    for item in selected_items:
-                        item.setSelected(False)
+                    deselect_rows(selected_rows)
             else:
                 # 券号为空，清空券信息
                 print(f"[券选择事件] 清空券选择")
@@ -5,7 +5,21 @@
 解决 _show_order_detail 和 _update_order_details 方法重复问题
 """
 
-from typing import Dict, List, Any
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+# 🆕 预编译的时间格式（_format_time_string 按顺序匹配）
+# 格式1：YYYY-MM-DD HH:MM:SS 或 YYYY-MM-DD HH:MM
+_DASH_DATETIME_PATTERN = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?')
+# 格式2：YYYY/MM/DD HH:MM:SS 或 YYYY/MM/DD HH:MM
+_SLASH_DATETIME_PATTERN = re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?')
+# 格式3：YYYYMMDD HHMM 或 YYYYMMDD HH:MM
+_COMPACT_DATETIME_PATTERN = re.compile(r'(\d{8})\s+(\d{2}):?(\d{2})')
+# 格式4：只有日期的情况（YYYY-MM-DD 或 YYYY/MM/DD）
+_DATE_ONLY_PATTERN = re.compile(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})')
 
 
 class FieldNameMapper:
@@ -56,40 +70,119 @@ class FieldNameMapper:
 class OrderDetailManager:
     """订单详情显示管理器 - 统一所有订单详情显示逻辑"""
     
+    # 🆕 格式化缓存容量（按最近使用淘汰）
+    CACHE_SIZE = 64
+
     def __init__(self, main_window):
         self.main_window = main_window
-        
+        # 🆕 格式化缓存：payload哈希 -> 标准化数据；(订单号, payload哈希) -> 显示内容；原始时间字符串 -> 格式化结果
+        self._normalize_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._content_cache: 'OrderedDict[tuple, List[str]]' = OrderedDict()
+        self._time_format_cache: Dict[str, str] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
     def display_order_detail(self, order_data: Dict[str, Any], display_context: str = 'default') -> None:
         """统一的订单详情显示方法
-        
+
         Args:
             order_data: 订单数据
             display_context: 显示上下文 ('creation', 'update', 'default')
         """
         try:
             print(f"[订单详情管理器] 开始显示订单详情，上下文: {display_context}")
-            
+
             # 1. 数据增强和标准化
             enhanced_data = self._enhance_and_normalize_order_data(order_data)
-            
-            # 2. 构建显示内容
-            display_content = self._build_display_content(enhanced_data, display_context)
-            
+
+            # 2. 构建显示内容（同一订单、同一数据、同一券状态直接使用缓存）
+            cache_key = self._get_content_cache_key(enhanced_data)
+            display_content = self._cache_get(self._content_cache, cache_key) if cache_key else None
+            if display_content is None:
+                self.cache_misses += 1
+                display_content = self._build_display_content(enhanced_data, display_context)
+                if cache_key:
+                    self._cache_put(self._content_cache, cache_key, display_content)
+            else:
+                self.cache_hits += 1
+                print(f"[订单详情管理器] ⚡ 使用缓存的显示内容 (命中 {self.cache_hits}/{self.cache_hits + self.cache_misses})")
+
             # 3. 更新UI显示
             self._update_ui_display(display_content, enhanced_data)
-            
+
             print(f"[订单详情管理器] 订单详情显示完成")
-            
+
         except Exception as e:
             print(f"[订单详情管理器] 显示错误: {e}")
             import traceback
             traceback.print_exc()
-            
+
+    def invalidate_cache(self, order_id: Optional[str] = None) -> None:
+        """🆕 清除格式化缓存
+
+        Args:
+            order_id: 只清除该订单的显示内容缓存，为空时清除全部
+        """
+        if order_id is None:
+            self._normalize_cache.clear()
+            self._content_cache.clear()
+            self._time_format_cache.clear()
+            return
+
+        for key in [key for key in self._content_cache if key[0] == str(order_id)]:
+            del self._content_cache[key]
+
+    @staticmethod
+    def _payload_hash(payload: Any) -> Optional[str]:
+        """🆕 计算数据的稳定哈希（无法序列化时返回None，不使用缓存）"""
+        try:
+            text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _get_content_cache_key(self, enhanced_data: Dict[str, Any]) -> Optional[tuple]:
+        """🆕 显示内容缓存键：订单号 + 增强后数据和券状态的哈希"""
+        order_id = enhanced_data.get('order_id', enhanced_data.get('orderno'))
+        if not order_id:
+            return None
+
+        # 价格信息还读取主窗口的券选择和券绑定结果，一并计入哈希
+        payload_hash = self._payload_hash({
+            'order': enhanced_data,
+            'selected_coupons': getattr(self.main_window, 'selected_coupons', None),
+            'coupon_info': getattr(self.main_window, 'current_coupon_info', None),
+        })
+        if payload_hash is None:
+            return None
+        return (str(order_id), payload_hash)
+
+    def _cache_get(self, cache: OrderedDict, key) -> Any:
+        """🆕 读取缓存并标记为最近使用"""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, cache: OrderedDict, key, value) -> None:
+        """🆕 写入缓存，超出容量时淘汰最久未使用的项"""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.CACHE_SIZE:
+            cache.popitem(last=False)
+
     def _enhance_and_normalize_order_data(self, order_data: Dict[str, Any]) -> Dict[str, Any]:
         """数据增强和标准化 - 统一字段名和数据格式"""
         try:
-            # 字段名标准化
-            enhanced_data = FieldNameMapper.normalize_data(order_data)
+            # 字段名标准化（相同payload复用上次结果）
+            payload_hash = self._payload_hash(order_data)
+            normalized = self._cache_get(self._normalize_cache, payload_hash) if payload_hash else None
+            if normalized is None:
+                normalized = FieldNameMapper.normalize_data(order_data)
+                if payload_hash:
+                    self._cache_put(self._normalize_cache, payload_hash, normalized)
+            # 后续增强会修改数据，缓存中的结果不能被改动
+            enhanced_data = dict(normalized)
             
             # 数据增强 - 从主窗口上下文获取更多信息
             enhanced_data = self._enhance_with_context_data(enhanced_data)
@@ -316,11 +409,24 @@ class OrderDetailManager:
         """
         格式化时间字符串为标准格式
         支持多种输入格式，输出统一格式：YYYY/MM/DD HH:MM
+        🔧 使用预编译的正则，相同输入直接返回上次结果
         """
-        try:
-            if not time_str or not isinstance(time_str, str):
-                return ""
+        if not time_str or not isinstance(time_str, str):
+            return ""
+
+        cached = self._time_format_cache.get(time_str)
+        if cached is not None:
+            return cached
 
+        formatted = self._parse_time_string(time_str)
+        if len(self._time_format_cache) >= self.CACHE_SIZE * 4:
+            self._time_format_cache.clear()
+        self._time_format_cache[time_str] = formatted
+        return formatted
+
+    def _parse_time_string(self, time_str: str) -> str:
+        """按预编译的格式依次匹配时间字符串"""
+        try:
             time_str = time_str.strip()
             print(f"[时间格式化] 输入时间字符串: '{time_str}'")
 
@@ -334,12 +440,8 @@ class OrderDetailManager:
                 print(f"[时间格式化] 纯数字日期格式: {formatted}")
                 return formatted
 
-            # 处理包含时间的格式
-            import re
-
             # 格式1：YYYY-MM-DD HH:MM:SS 或 YYYY-MM-DD HH:MM
-            pattern1 = r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?'
-            match1 = re.match(pattern1, time_str)
+            match1 = _DASH_DATETIME_PATTERN.match(time_str)
             if match1:
                 year, month, day, hour, minute = match1.groups()[:5]
                 formatted = f"{year}/{month.zfill(2)}/{day.zfill(2)} {hour.zfill(2)}:{minute.zfill(2)}"
@@ -347,8 +449,7 @@ class OrderDetailManager:
                 return formatted
 
             # 格式2：YYYY/MM/DD HH:MM:SS 或 YYYY/MM/DD HH:MM
-            pattern2 = r'(\d{4})/(\d{1,2})/(\d{1,2})\s+(\d{1,2}):(\d{1,2})(?::(\d{1,2}))?'
-            match2 = re.match(pattern2, time_str)
+            match2 = _SLASH_DATETIME_PATTERN.match(time_str)
             if match2:
                 year, month, day, hour, minute = match2.groups()[:5]
                 formatted = f"{year}/{month.zfill(2)}/{day.zfill(2)} {hour.zfill(2)}:{minute.zfill(2)}"
@@ -356,8 +457,7 @@ class OrderDetailManager:
                 return formatted
 
             # 格式3：YYYYMMDD HHMM 或 YYYYMMDD HH:MM
-            pattern3 = r'(\d{8})\s+(\d{2}):?(\d{2})'
-            match3 = re.match(pattern3, time_str)
+            match3 = _COMPACT_DATETIME_PATTERN.match(time_str)
             if match3:
                 date_part, hour, minute = match3.groups()
                 year = date_part[:4]
@@ -368,8 +468,7 @@ class OrderDetailManager:
                 return formatted
 
             # 格式4：只有日期的情况（YYYY-MM-DD 或 YYYY/MM/DD）
-            pattern4 = r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})'
-            match4 = re.match(pattern4, time_str)
+            match4 = _DATE_ONLY_PATTERN.match(time_str)
             if match4:
                 year, month, day = match4.groups()
                 formatted = f"{year}/{month.zfill(2)}/{day.zfill(2)}"
@@ -5,9 +5,12 @@
 自动生成，用于第三阶段C设计模式应用
 """
 
+import queue
+import threading
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
+from PyQt5.QtCore import QObject, pyqtSignal
 
 class OrderStatus(Enum):
     """订单状态枚举"""
@@ -17,17 +20,34 @@ class OrderStatus(Enum):
     CANCELLED = "cancelled"
     COMPLETED = "completed"
 
+# 🆕 观察者分发方式
+DISPATCH_UI = "ui"                  # 在Qt主线程调用（更新界面）
+DISPATCH_BACKGROUND = "background"  # 在后台队列线程批量调用（日志、通知等I/O）
+
+# 一次状态变化事件 (订单号, 旧状态, 新状态, 订单数据)
+OrderEvent = Tuple[str, OrderStatus, OrderStatus, Dict[str, Any]]
+
 class OrderObserver(ABC):
     """订单观察者抽象基类"""
 
+    # 🆕 分发方式：默认在后台线程调用，操作界面的观察者需声明为 DISPATCH_UI
+    dispatch_mode = DISPATCH_BACKGROUND
+
     @abstractmethod
     def update(self, order_id: str, old_status: OrderStatus, new_status: OrderStatus, order_data: Dict[str, Any]):
         """订单状态更新通知"""
         pass
 
+    def update_batch(self, events: List[OrderEvent]):
+        """🆕 批量状态更新通知（后台观察者使用），默认逐个调用 update"""
+        for order_id, old_status, new_status, order_data in events:
+            self.update(order_id, old_status, new_status, order_data)
+
 class UIUpdateObserver(OrderObserver):
     """UI更新观察者"""
 
+    dispatch_mode = DISPATCH_UI
+
     def __init__(self, main_window):
         self.main_window = main_window
 
@@ -85,17 +105,105 @@ class LoggingObserver(OrderObserver):
         # 这里可以写入日志文件或发送到日志服务
         self._write_to_log(log_message, order_data)
 
+    def update_batch(self, events: List[OrderEvent]):
+        """🆕 批量记录状态变化日志"""
+        messages = [f"订单状态变化: {order_id} {old_status.value} -> {new_status.value}"
+                    for order_id, old_status, new_status, _ in events]
+        for message in messages:
+            print(f"日志: {message}")
+
+        # 一批事件只写入一次
+        self._write_to_log("\n".join(messages), {order_id: order_data for order_id, _, _, order_data in events})
+
     def _write_to_log(self, message: str, order_data: Dict[str, Any]):
         """写入日志"""
         # 实际实现中可以写入文件或数据库
         pass
 
+class _UIDispatcher(QObject):
+    """🆕 UI观察者分发器 - 把调用转到Qt主线程（在主线程创建）"""
+
+    # 从其他线程发射时自动排队到主线程执行，在主线程发射时直接执行
+    dispatch = pyqtSignal(object, object)  # (观察者, 事件)
+
+    def __init__(self):
+        super().__init__()
+        self.dispatch.connect(self._on_dispatch)
+
+    def _on_dispatch(self, observer: OrderObserver, event: OrderEvent):
+        try:
+            observer.update(*event)
+        except Exception as e:
+            print(f"[订单观察者] ❌ UI观察者 {type(observer).__name__} 异常: {e}")
+
+class _BackgroundDispatcher:
+    """🆕 后台观察者分发器 - 队列 + 单个工作线程，按批次通知观察者"""
+
+    # 每批最多处理的事件数
+    BATCH_SIZE = 50
+
+    def __init__(self):
+        self._queue: "queue.Queue[Tuple[List[OrderObserver], OrderEvent]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, observers: List[OrderObserver], event: OrderEvent):
+        """加入队列（不阻塞调用方）"""
+        self._ensure_worker()
+        self._queue.put((observers, event))
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待队列中的事件处理完成"""
+        done = threading.Event()
+        self._ensure_worker()
+        self._queue.put(([], done))
+        return done.wait(timeout)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='OrderObserverDispatcher', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._deliver(batch)
+
+    def _deliver(self, batch):
+        # 按观察者归组，保持各观察者收到事件的顺序
+        grouped: Dict[int, Tuple[OrderObserver, List[OrderEvent]]] = {}
+        markers = []
+        for observers, event in batch:
+            if isinstance(event, threading.Event):
+                markers.append(event)
+                continue
+            for observer in observers:
+                grouped.setdefault(id(observer), (observer, []))[1].append(event)
+
+        for observer, events in grouped.values():
+            try:
+                observer.update_batch(events)
+            except Exception as e:
+                print(f"[订单观察者] ❌ 后台观察者 {type(observer).__name__} 异常: {e}")
+
+        for marker in markers:
+            marker.set()
+
 class OrderSubject:
     """订单主题类（被观察者）"""
 
     def __init__(self):
         self._observers: List[OrderObserver] = []
         self._orders: Dict[str, Dict[str, Any]] = {}
+        # 🆕 观察者分发器（UI分发器在主线程调用 setup_order_observers 时创建）
+        self._ui_dispatcher: Optional[_UIDispatcher] = None
+        self._background_dispatcher = _BackgroundDispatcher()
 
     def add_observer(self, observer: OrderObserver):
         """添加观察者"""
@@ -107,11 +215,35 @@ class OrderSubject:
         if observer in self._observers:
             self._observers.remove(observer)
 
+    def init_ui_dispatcher(self):
+        """🆕 创建UI分发器（必须在Qt主线程调用）"""
+        if self._ui_dispatcher is None:
+            self._ui_dispatcher = _UIDispatcher()
+
     def notify_observers(self, order_id: str, old_status: OrderStatus, new_status: OrderStatus):
-        """通知所有观察者"""
-        order_data = self._orders.get(order_id, {})
-        for observer in self._observers:
-            observer.update(order_id, old_status, new_status, order_data)
+        """
+        通知所有观察者
+        🔧 不在调用线程同步执行：UI观察者转到Qt主线程，后台观察者进入队列批量处理
+        """
+        # 观察者拿到的是快照，避免后续状态更新改动尚未处理的事件
+        event = (order_id, old_status, new_status, dict(self._orders.get(order_id, {})))
+
+        background_observers = []
+        for observer in list(self._observers):
+            if getattr(observer, 'dispatch_mode', DISPATCH_BACKGROUND) == DISPATCH_UI:
+                if self._ui_dispatcher is not None:
+                    self._ui_dispatcher.dispatch.emit(observer, event)
+                else:
+                    print(f"[订单观察者] ⚠️ UI分发器未初始化，跳过 {type(observer).__name__}")
+            else:
+                background_observers.append(observer)
+
+        if background_observers:
+            self._background_dispatcher.submit(background_observers, event)
+
+    def wait_for_observers(self, timeout: Optional[float] = None) -> bool:
+        """🆕 等待后台观察者处理完已发出的通知"""
+        return self._background_dispatcher.wait_idle(timeout)
 
     def update_order_status(self, order_id: str, new_status: OrderStatus, order_data: Dict[str, Any] = None):
         """更新订单状态"""
@@ -150,6 +282,7 @@ def get_order_subject() -> OrderSubject:
 def setup_order_observers(main_window):
     """设置订单观察者"""
     subject = get_order_subject()
+    subject.init_ui_dispatcher()
 
     # 添加UI更新观察者
     ui_observer = UIUpdateObserver(main_window)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务图执行器 - 把有依赖关系的网络请求组织成任务图
+没有依赖关系的任务在线程池中并发执行，任务完成后的界面回调统一回到Qt主线程执行
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class _GraphTask:
+    """任务图中的单个任务"""
+
+    def __init__(self, name: str, func: Optional[Callable], args: tuple, kwargs: dict,
+                 deps: List[str], on_ui: Optional[Callable]):
+        self.name = name
+        self.func = func          # 为None时表示汇合节点，只在依赖完成后执行界面回调
+        self.args = args
+        self.kwargs = kwargs
+        self.deps = deps
+        self.on_ui = on_ui
+        self.started_at = 0.0
+        self.finished_at = 0.0
+
+
+class TaskGraph(QObject):
+    """任务图 - 依赖完成即调度，界面回调在主线程执行"""
+
+    # 信号定义
+    task_finished = pyqtSignal(str, object)  # 任务完成信号 (任务名, 结果)
+    task_failed = pyqtSignal(str, str)       # 任务失败信号 (任务名, 错误信息)
+    graph_finished = pyqtSignal(dict)        # 全部任务完成信号 (任务名 -> 耗时毫秒)
+
+    # 内部信号：工作线程 -> 主线程
+    _task_done = pyqtSignal(str, object, object)
+
+    def __init__(self, name: str = 'task_graph', max_workers: int = 4):
+        super().__init__()
+        self.name = name
+        self.max_workers = max_workers
+        self.tasks: Dict[str, _GraphTask] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self._pending: Dict[str, _GraphTask] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started_at = 0.0
+
+        self._task_done.connect(self._on_task_done)
+
+    def add_task(self, name: str, func: Optional[Callable], *args, deps: Optional[List[str]] = None,
+                 on_ui: Optional[Callable] = None, **kwargs) -> 'TaskGraph':
+        """
+        添加任务
+
+        Args:
+            name: 任务名（唯一）
+            func: 在工作线程执行的函数；为None时作为汇合节点
+            deps: 依赖的任务名，全部完成（成功或失败）后才会执行
+            on_ui: 完成后在主线程执行的回调；普通任务传入结果，汇合节点传入全部结果字典
+
+        Returns:
+            任务图本身，便于链式调用
+        """
+        if name in self.tasks:
+            raise ValueError(f"任务名重复: {name}")
+
+        self.tasks[name] = _GraphTask(name, func, args, kwargs, list(deps or []), on_ui)
+        return self
+
+    def start(self):
+        """开始执行任务图"""
+        for task in self.tasks.values():
+            missing = [dep for dep in task.deps if dep not in self.tasks]
+            if missing:
+                raise ValueError(f"任务 {task.name} 依赖不存在的任务: {missing}")
+
+        self._started_at = time.time()
+        self._pending = dict(self.tasks)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        self._schedule_ready()
+
+    def _schedule_ready(self):
+        """调度依赖已全部完成的任务（汇合节点在本方法内完成，不重入调度）"""
+        while True:
+            done = set(self.results) | set(self.errors)
+            ready = [task for task in self._pending.values() if all(dep in done for dep in task.deps)]
+
+            # 先把本轮就绪的任务全部移出待调度表，再逐个处理
+            for task in ready:
+                del self._pending[task.name]
+                task.started_at = time.time()
+
+            joins = []
+            for task in ready:
+                if task.func is None:
+                    joins.append(task)
+                else:
+                    self._executor.submit(self._run_task, task)
+
+            if not joins:
+                break
+
+            # 汇合节点直接在主线程完成，完成后继续下一轮调度其后续任务
+            for task in joins:
+                self._complete_task(task.name, None, None)
+
+        if not self._pending and len(self.results) + len(self.errors) == len(self.tasks):
+            self._finish()
+
+    def _run_task(self, task: _GraphTask):
+        """在工作线程中执行任务"""
+        try:
+            result = task.func(*task.args, **task.kwargs)
+            self._task_done.emit(task.name, result, None)
+        except Exception as e:
+            self._task_done.emit(task.name, None, str(e))
+
+    def _on_task_done(self, name: str, result: Any, error: Optional[str]):
+        """工作线程任务完成（主线程）：记录结果并调度后续任务"""
+        self._complete_task(name, result, error)
+        self._schedule_ready()
+
+    def _complete_task(self, name: str, result: Any, error: Optional[str]):
+        """记录任务结果并执行界面回调（不调度后续任务）"""
+        task = self.tasks[name]
+        task.finished_at = time.time()
+
+        if error is not None:
+            print(f"[任务图] ❌ {self.name}/{name} 失败: {error}")
+            self.errors[name] = error
+            self.task_failed.emit(name, error)
+        else:
+            self.results[name] = result
+
+        if task.on_ui:
+            try:
+                if task.func is None:
+                    task.on_ui({dep: self.results.get(dep) for dep in task.deps})
+                elif error is None:
+                    task.on_ui(result)
+            except Exception as e:
+                print(f"[任务图] ❌ {self.name}/{name} 界面回调异常: {e}")
+
+        if error is None:
+            self.task_finished.emit(name, result)
+
+    def _finish(self):
+        """全部任务完成"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+        self.graph_finished.emit(self.get_timings())
+
+    def get_timings(self) -> Dict[str, float]:
+        """获取各任务耗时（毫秒），total为整个任务图耗时"""
+        timings = {
+            name: round((task.finished_at - task.started_at) * 1000, 1)
+            for name, task in self.tasks.items() if task.finished_at
+        }
+        finished = [task.finished_at for task in self.tasks.values() if task.finished_at]
+        if finished and self._started_at:
+            timings['total'] = round((max(finished) - self._started_at) * 1000, 1)
+        return timings
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订单流程链路追踪 - 轻量级span记录
+记录从选座提交到出票二维码各环节的耗时（区分网络和本地处理）及结果，
+最近的链路保存在内存环形缓冲区中，可导出为Chrome trace JSON（chrome://tracing 或 Perfetto 打开）
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+class Span:
+    """单个耗时片段"""
+
+    __slots__ = ('name', 'kind', 'start', 'end', 'thread_id', 'depth', 'outcome', 'attrs')
+
+    def __init__(self, name: str, kind: str, start: float, thread_id: int, depth: int, attrs: Dict[str, Any]):
+        self.name = name
+        self.kind = kind            # network / cpu
+        self.start = start          # time.time() 秒
+        self.end = 0.0
+        self.thread_id = thread_id
+        self.depth = depth          # 同一线程内的嵌套层级
+        self.outcome = 'ok'         # ok / failed / error
+        self.attrs = attrs
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000 if self.end else 0.0
+
+
+class Trace:
+    """一次完整的订单流程"""
+
+    def __init__(self, trace_id: int, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.keys: List[str] = []
+        self.spans: List[Span] = []
+        self.start = time.time()
+        self.end = 0.0
+        self.outcome = ''
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        链路摘要：总耗时、网络与本地处理耗时
+
+        网络耗时为所有 network span（任意嵌套层级、任意线程）时间区间的并集，
+        并发请求重叠的部分只计一次；本地处理耗时 = 总耗时 - 网络耗时
+        """
+        end = self.end or max((span.end for span in self.spans), default=self.start)
+        total_ms = (end - self.start) * 1000
+        network_ms = self._union_ms([(span.start, span.end) for span in self.spans
+                                     if span.kind == 'network' and span.end])
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'keys': list(self.keys),
+            'total_ms': round(total_ms, 1),
+            'network_ms': round(network_ms, 1),
+            'cpu_ms': round(max(total_ms - network_ms, 0.0), 1),
+            'outcome': self.outcome or ('error' if any(s.outcome == 'error' for s in self.spans) else 'ok'),
+            'spans': [
+                {'name': span.name, 'kind': span.kind, 'ms': round(span.duration_ms, 1), 'outcome': span.outcome}
+                for span in self.spans
+            ]
+        }
+
+
+    @staticmethod
+    def _union_ms(intervals: List[tuple]) -> float:
+        """时间区间并集的总长度（毫秒）"""
+        total = 0.0
+        current_start = current_end = None
+        for start, end in sorted(intervals):
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    total += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            total += current_end - current_start
+        return total * 1000
+
+
+class OrderTracer:
+    """订单流程追踪器"""
+
+    def __init__(self, max_traces: int = 50, enabled: bool = True):
+        """
+        初始化追踪器
+
+        Args:
+            max_traces: 内存中保留的最近链路数量
+            enabled: 是否开启
+        """
+        self.enabled = enabled
+        self.traces: deque = deque(maxlen=max_traces)
+        self._active: Dict[str, Trace] = {}     # 关联键（如订单号） -> 进行中的链路
+        self._lock = threading.Lock()
+        # 线程本地：stack 为当前线程的span栈，trace 为本线程开始的链路（未指定关联键时使用）
+        self._local = threading.local()
+        self._next_id = 1
+
+    # ===== 链路 =====
+
+    def start_trace(self, name: str = 'order_flow', key: Optional[str] = None) -> Optional[Trace]:
+        """开始新的链路（本线程上一条未结束的链路会被自动结束）"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            previous = getattr(self._local, 'trace', None)
+            if previous is not None and not previous.end:
+                self._close(previous, 'abandoned')
+
+            trace = Trace(self._next_id, name)
+            self._next_id += 1
+            self.traces.append(trace)
+            self._local.trace = trace
+            if key:
+                trace.keys.append(key)
+                self._active[key] = trace
+        return trace
+
+    def bind_key(self, key: str):
+        """为本线程的链路添加关联键（如创建订单后得到的订单号），之后其他线程的span也可按该键归属"""
+        if not self.enabled or not key:
+            return
+
+        with self._lock:
+            trace = getattr(self._local, 'trace', None)
+            if trace is not None and not trace.end:
+                trace.keys.append(key)
+                self._active[key] = trace
+
+    def finish_trace(self, key: Optional[str] = None, outcome: str = 'ok') -> Optional[Dict[str, Any]]:
+        """结束链路并返回摘要"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            trace = self._find(key)
+            if trace is None or trace.end:
+                return None
+            self._close(trace, outcome)
+
+        summary = trace.summary()
+        print(f"[链路追踪] ⏱️ {trace.name}#{trace.trace_id} 完成: 总耗时 {summary['total_ms']}ms, "
+              f"网络 {summary['network_ms']}ms, 本地 {summary['cpu_ms']}ms, 结果 {summary['outcome']}")
+        return summary
+
+    def _find(self, key: Optional[str]) -> Optional[Trace]:
+        """按关联键查找链路；没有关联键或未绑定时只使用本线程开始的链路，其他线程不记录"""
+        if key and key in self._active:
+            return self._active[key]
+        return getattr(self._local, 'trace', None)
+
+    def _close(self, trace: Trace, outcome: str):
+        trace.end = time.time()
+        trace.outcome = outcome
+        for trace_key in trace.keys:
+            if self._active.get(trace_key) is trace:
+                del self._active[trace_key]
+
+    # ===== span =====
+
+    @contextmanager
+    def span(self, name: str, kind: str = 'cpu', key: Optional[str] = None, **attrs):
+        """
+        记录一个耗时片段
+
+        Args:
+            name: 片段名称
+            kind: network（网络请求）或 cpu（本地处理）
+            key: 关联键（订单号），为空或未绑定时归属本线程开始的链路，没有则不记录
+        """
+        trace = self._find(key) if self.enabled else None
+        if trace is None or trace.end:
+            yield None
+            return
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        span = Span(name, kind, time.time(), threading.get_ident(), len(stack), attrs)
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.outcome = 'error'
+            span.attrs['error'] = str(e)
+            raise
+        finally:
+            span.end = time.time()
+            stack.pop()
+            with self._lock:
+                trace.spans.append(span)
+
+    # ===== 查询与导出 =====
+
+    def get_summaries(self) -> List[Dict[str, Any]]:
+        """最近链路的摘要"""
+        with self._lock:
+            traces = list(self.traces)
+        return [trace.summary() for trace in traces]
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """转换为Chrome trace事件格式，每条链路一个进程，线程按实际线程区分"""
+        events = []
+        with self._lock:
+            traces = list(self.traces)
+
+        for trace in traces:
+            events.append({
+                'name': 'process_name', 'ph': 'M', 'pid': trace.trace_id,
+                'args': {'name': f"{trace.name}#{trace.trace_id} {','.join(trace.keys)}"}
+            })
+            for span in trace.spans:
+                events.append({
+                    'name': span.name,
+                    'cat': span.kind,
+                    'ph': 'X',
+                    'ts': int(span.start * 1_000_000),
+                    'dur': int((span.end - span.start) * 1_000_000),
+                    'pid': trace.trace_id,
+                    'tid': span.thread_id,
+                    'args': dict(span.attrs, outcome=span.outcome)
+                })
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path: Optional[str] = None) -> str:
+        """导出为Chrome trace JSON文件，返回文件路径"""
+        if path is None:
+            os.makedirs('data/traces', exist_ok=True)
+            path = os.path.join('data/traces', f"order_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False, default=str)
+        return path
+
+
+def traced(name: str, kind: str = 'cpu', key_arg: Optional[str] = None):
+    """
+    装饰器：把函数调用记录为span
+
+    Args:
+        name: 片段名称
+        kind: network 或 cpu
+        key_arg: 作为关联键的参数名（如 'order_id'）
+
+    返回 {'success': False} 的调用记录为 failed
+    """
+    def decorator(func: Callable):
+        signature = inspect.signature(func) if key_arg else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+
+            key = None
+            if signature is not None:
+                try:
+                    key = signature.bind_partial(*args, **kwargs).arguments.get(key_arg)
+                except TypeError:
+                    key = None
+
+            with tracer.span(name, kind=kind, key=key) as span:
+                result = func(*args, **kwargs)
+                if span is not None and isinstance(result, dict) and result.get('success') is False:
+                    span.outcome = 'failed'
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+# 全局实例
+_tracer = None
+
+
+def get_tracer() -> OrderTracer:
+    """获取订单流程追踪器实例（单例模式），开关读取 ORDER_TRACE 配置"""
+    global _tracer
+
+    if _tracer is None:
+        from config import config
+        _tracer = OrderTracer(enabled=config.ORDER_TRACE)
+
+    return _tracer
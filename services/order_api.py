@@ -377,66 +377,151 @@ def cancel_order(params: dict) -> dict:
     # 修复：使用GET请求而不是POST请求
     return api_get('MiniTicket/index.php/MiniOrder/cancelorder', cinemaid, params=request_params)
 
-def cancel_all_unpaid_orders(account: dict, cinemaid: str) -> dict:
+def _cancel_order_with_retry(orderno: str, account: dict, cinemaid: str, max_retries: int) -> dict:
+    """取消单个订单，网络异常（resultCode=-1）时按退避间隔重试"""
+    import time
+
+    params = {
+        'orderno': orderno,
+        'groupid': '',
+        'cinemaid': cinemaid,
+        'cardno': account.get('cardno', ''),
+        'userid': account.get('userid') or account.get('phone', ''),
+        'openid': account.get('openid', ''),
+        'CVersion': '3.9.12',
+        'OS': 'Windows',
+        'token': account['token'],
+        'source': '2'
+    }
+
+    cancel_result = {}
+    for attempt in range(max_retries + 1):
+        try:
+            cancel_result = cancel_order(params) or {}
+        except Exception as e:
+            cancel_result = {"resultCode": "-1", "resultDesc": f"请求异常: {e}"}
+
+        # 业务失败（如订单已支付）不重试，只有网络类错误重试
+        if str(cancel_result.get('resultCode')) != '-1' or attempt == max_retries:
+            break
+        time.sleep(0.3 * (attempt + 1))
+
+    return {
+        'orderno': orderno,
+        'success': cancel_result.get('resultCode') == '0',
+        'resultDesc': cancel_result.get('resultDesc', ''),
+        'attempts': attempt + 1
+    }
+
+
+def cancel_all_unpaid_orders(account: dict, cinemaid: str, max_workers: int = 4, max_retries: int = 2,
+                             on_result=None, max_pages: int = 50) -> dict:
     """
     取消该账号在指定影院的所有未付款订单 - 使用动态base_url
+    逐页拉取订单列表，每页的未付款订单立即提交到线程池并发取消（并发数受限，失败自动重试），
+    每个订单取消完成后立即回调，不等待其余页的订单列表
     :param account: 账号信息字典
     :param cinemaid: 影院ID
-    :return: dict，包含取消结果和取消数量
+    :param max_workers: 最大并发取消数
+    :param max_retries: 单个订单网络异常时的重试次数
+    :param on_result: 每个订单取消完成时的回调，参数为 {'orderno', 'success', 'resultDesc', 'attempts'}（在工作线程中按完成顺序调用，同一时刻只有一个回调在执行；在Qt中可直接发射信号）
+    :param max_pages: 最多拉取的订单列表页数
+    :return: dict，包含取消结果和取消数量；第1页订单列表获取失败时 resultCode 为 -1，
+             之后的页获取失败时 partial 为 True，failedPages 为失败的页码
     """
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
     if not cinemaid:
         return {"resultCode": "-1", "resultDesc": "缺少影院ID参数", "resultData": None}
-    
-    
-    # 首先获取订单列表
+
     list_params = {
         'pageNo': 1,
         'groupid': '',
         'cinemaid': cinemaid,
         'cardno': account.get('cardno', ''),
-        'userid': account['userid'],
-        'openid': account['openid'],
+        'userid': account.get('userid') or account.get('phone', ''),
+        'openid': account.get('openid', ''),
         'CVersion': '3.9.12',
         'OS': 'Windows',
         'token': account['token'],
         'source': '2'
     }
-    
-    order_list_result = get_order_list(list_params)
-    if order_list_result.get('resultCode') != '0':
-        print(f"[取消未付款订单] 获取订单列表失败: {order_list_result.get('resultDesc')}")
-        return {"resultCode": "0", "resultDesc": "success", "cancelledCount": 0}
-    
-    orders = order_list_result.get('resultData', {}).get('orders', [])
-    unpaid_orders = [order for order in orders if order.get('orderS') == '待付款']
-    
-    print(f"[取消未付款订单] 找到 {len(unpaid_orders)} 个未付款订单")
-    
-    cancelled_count = 0
-    for order in unpaid_orders:
-        orderno = order.get('orderno')
-        if orderno:
-            cancel_result = cancel_order({
-                'orderno': orderno,
-                'groupid': '',
-                'cinemaid': cinemaid,
-                'cardno': account.get('cardno', ''),
-                'userid': account['userid'],
-                'openid': account['openid'],
-                'CVersion': '3.9.12',
-                'OS': 'Windows',
-                'token': account['token'],
-                'source': '2'
-            })
-            
-            if cancel_result.get('resultCode') == '0':
-                cancelled_count += 1
-                print(f"[取消未付款订单] 订单 {orderno} 取消成功")
-            else:
-                print(f"[取消未付款订单] 订单 {orderno} 取消失败: {cancel_result.get('resultDesc')}")
-    
+
+    results = []
+    submitted = set()
+    seen_ordernos = set()
+    result_lock = threading.Lock()
+
+    def on_done(future):
+        """订单取消完成（工作线程）：记录结果并立即回调"""
+        orderno = future_ordernos[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'orderno': orderno, 'success': False, 'resultDesc': f"取消异常: {e}", 'attempts': 0}
+
+        if result['success']:
+            print(f"[取消未付款订单] 订单 {result['orderno']} 取消成功")
+        else:
+            print(f"[取消未付款订单] 订单 {result['orderno']} 取消失败: {result['resultDesc']}")
+
+        with result_lock:
+            results.append(result)
+            if on_result:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    print(f"[取消未付款订单] 结果回调异常: {e}")
+
+    future_ordernos = {}
+    failed_pages = []
+    # 退出 with 时等待所有取消请求（及其回调）完成
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # 边翻页边提交取消请求，列表请求与取消请求重叠执行
+        for page_no in range(1, max_pages + 1):
+            list_params['pageNo'] = page_no
+            order_list_result = get_order_list(list_params)
+            if order_list_result.get('resultCode') != '0':
+                print(f"[取消未付款订单] 获取第 {page_no} 页订单列表失败: {order_list_result.get('resultDesc')}")
+                if page_no == 1:
+                    # 订单列表一页都没有读到，不能当作没有未付款订单
+                    return {
+                        "resultCode": "-1",
+                        "resultDesc": order_list_result.get('resultDesc') or "获取订单列表失败",
+                        "resultData": None
+                    }
+                failed_pages.append(page_no)
+                break
+
+            orders = (order_list_result.get('resultData') or {}).get('orders', [])
+            page_ordernos = {order.get('orderno') for order in orders} - seen_ordernos
+            if not page_ordernos:
+                # 空页，或接口忽略页码重复返回同一页
+                break
+            seen_ordernos |= page_ordernos
+
+            for order in orders:
+                orderno = order.get('orderno')
+                if order.get('orderS') == '待付款' and orderno and orderno not in submitted:
+                    submitted.add(orderno)
+                    future = executor.submit(_cancel_order_with_retry, orderno, account, cinemaid, max_retries)
+                    future_ordernos[future] = orderno
+                    future.add_done_callback(on_done)
+
+        print(f"[取消未付款订单] 找到 {len(submitted)} 个未付款订单")
+
+    cancelled_count = sum(1 for result in results if result['success'])
     print(f"[取消未付款订单] 总共取消了 {cancelled_count} 个订单")
-    return {"resultCode": "0", "resultDesc": "success", "cancelledCount": cancelled_count}
+    return {
+        "resultCode": "0",
+        "resultDesc": "partial" if failed_pages else "success",
+        "partial": bool(failed_pages),
+        "failedPages": failed_pages,
+        "cancelledCount": cancelled_count,
+        "failedCount": len(results) - cancelled_count,
+        "results": results
+    }
 
 def get_coupon_prepay_info(params: dict) -> dict:
     """
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨账号订单看板服务
+并发同步所有账号的订单（同一主机限制并发请求数），从本地订单存储合并排序，
+未支付且即将超时的订单排在最前
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from services.order_store import OrderStore, get_order_store, sync_account_orders
+
+
+class HostLimiter:
+    """按主机限制并发请求数"""
+
+    def __init__(self, per_host: int = 4):
+        self.per_host = per_host
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url: str):
+        """在该URL所属主机的并发额度内执行"""
+        host = urlparse(url).netloc or url
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = semaphore
+
+        with semaphore:
+            yield
+
+
+def _parse_time(value: Any) -> Optional[float]:
+    """解析时间戳（秒/毫秒）或 YYYY-MM-DD HH:MM:SS 格式的时间"""
+    if value in (None, '', 0, '0'):
+        return None
+
+    try:
+        number = float(value)
+        return number / 1000 if number > 1e12 else number
+    except (TypeError, ValueError):
+        pass
+
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y/%m/%d %H:%M:%S'):
+        try:
+            return datetime.strptime(str(value), fmt).timestamp()
+        except ValueError:
+            continue
+    return None
+
+
+class OrderDashboardService:
+    """跨账号订单看板服务"""
+
+    # 订单列表接口地址（用于按主机限流）
+    ORDERS_URL = "https://ct.womovie.cn/ticket/wmyc/user/orders/"
+    # 未支付订单的锁座时长（分钟），接口没有返回过期时间时用下单时间推算
+    UNPAID_LOCK_MINUTES = 15
+    # 剩余时间少于该值（秒）视为即将超时
+    NEAR_EXPIRY_SECONDS = 5 * 60
+
+    UNPAID_KEYWORDS = ('待支付', '待付款')
+    EXPIRE_FIELDS = ('expire_time', 'pay_expire_time', 'pay_end_time', 'lock_expire_time')
+    CREATE_FIELDS = ('create_time', 'order_time', 'add_time', 'created_at')
+
+    def __init__(self, store: Optional[OrderStore] = None, per_host: int = 4, max_workers: int = 8,
+                 accounts_file: str = 'data/accounts.json'):
+        self.store = store or get_order_store()
+        self.limiter = HostLimiter(per_host)
+        self.max_workers = max_workers
+        self.accounts_file = accounts_file
+
+    def load_accounts(self) -> List[Dict[str, Any]]:
+        """读取所有有token的账号"""
+        if not os.path.exists(self.accounts_file):
+            return []
+
+        try:
+            with open(self.accounts_file, 'r', encoding='utf-8') as f:
+                accounts = json.load(f)
+        except Exception as e:
+            print(f"[订单看板] ❌ 读取账号文件失败: {e}")
+            return []
+
+        return [account for account in accounts if isinstance(account, dict) and account.get('token')]
+
+    @staticmethod
+    def account_key(account: Dict[str, Any]) -> str:
+        """本地订单存储中的账号标识（与订单Tab一致，优先使用手机号）"""
+        return str(account.get('phone') or account.get('userid') or account.get('token', ''))
+
+    def _limited_fetch_page(self, token: str, offset: int) -> Dict[str, Any]:
+        """受主机并发限制的订单分页请求"""
+        from services.womei_order_service import WomeiOrderService
+
+        with self.limiter.limit(self.ORDERS_URL):
+            # 每个线程使用独立的服务实例，避免共享token
+            return WomeiOrderService(token).get_orders(token, offset)
+
+    def refresh(self, accounts: List[Dict[str, Any]],
+                on_account_synced: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        并发增量同步多个账号的订单
+
+        Args:
+            accounts: 账号列表
+            on_account_synced: 每个账号同步完成时调用，参数为 (账号标识, 同步结果)
+
+        Returns:
+            {'success': True, 'accounts': 账号数, 'changed_accounts': 有变化的账号标识列表, 'failed': {账号: 错误}}
+        """
+        summary = {'success': True, 'accounts': len(accounts), 'changed_accounts': [], 'failed': {}}
+        if not accounts:
+            return summary
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(accounts))) as executor:
+            futures = {
+                executor.submit(sync_account_orders, self.store, self.account_key(account), account['token'],
+                                self._limited_fetch_page): self.account_key(account)
+                for account in accounts
+            }
+
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'success': False, 'error': str(e)}
+
+                if not result.get('success'):
+                    summary['failed'][key] = result.get('error', '未知错误')
+                elif result.get('new') or result.get('changed'):
+                    summary['changed_accounts'].append(key)
+
+                if on_account_synced:
+                    on_account_synced(key, result)
+
+        return summary
+
+    def collect_orders(self, accounts: List[Dict[str, Any]], only_unpaid: bool = False,
+                       keyword: str = '') -> List[Dict[str, Any]]:
+        """
+        从本地订单存储合并所有账号的订单并排序
+
+        Returns:
+            订单列表，每项额外包含 account / is_unpaid / expire_at / remaining_seconds / near_expiry
+        """
+        now = time.time()
+        merged = []
+        for account in accounts:
+            key = self.account_key(account)
+            for index, order in enumerate(self.store.get_orders(key, keyword)):
+                item = self.annotate_order(order, key, now)
+                if only_unpaid and not item['is_unpaid']:
+                    continue
+                item['_account_index'] = index
+                merged.append(item)
+
+        merged.sort(key=self._sort_key)
+        return merged
+
+    def annotate_order(self, order: Dict[str, Any], account_key: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """为订单补充账号、未支付和剩余支付时间信息"""
+        now = now or time.time()
+        item = dict(order)
+        item['account'] = account_key
+
+        status_desc = order.get('status_desc', '') or ''
+        is_unpaid = any(word in status_desc for word in self.UNPAID_KEYWORDS)
+        item['is_unpaid'] = is_unpaid
+
+        expire_at = self._get_expire_at(order) if is_unpaid else None
+        item['expire_at'] = expire_at
+        item['remaining_seconds'] = max(0, int(expire_at - now)) if expire_at else None
+        item['near_expiry'] = item['remaining_seconds'] is not None and item['remaining_seconds'] <= self.NEAR_EXPIRY_SECONDS
+        return item
+
+    def _get_expire_at(self, order: Dict[str, Any]) -> Optional[float]:
+        """未支付订单的过期时间：优先使用接口返回的过期时间，否则由下单时间推算"""
+        raw = order.get('raw_data') or {}
+
+        for field in self.EXPIRE_FIELDS:
+            expire_at = _parse_time(raw.get(field))
+            if expire_at:
+                return expire_at
+
+        for field in self.CREATE_FIELDS:
+            created_at = _parse_time(raw.get(field))
+            if created_at:
+                return created_at + self.UNPAID_LOCK_MINUTES * 60
+
+        return None
+
+    @staticmethod
+    def _sort_key(item: Dict[str, Any]):
+        """排序：未支付在前（剩余时间少的更靠前），其余按各账号内的新旧顺序"""
+        remaining = item['remaining_seconds']
+        return (
+            0 if item['is_unpaid'] else 1,
+            remaining if remaining is not None else float('inf'),
+            item['_account_index'],
+            item['account']
+        )
+
+
+# 全局实例
+_order_dashboard_service = None
+
+
+def get_order_dashboard_service() -> OrderDashboardService:
+    """获取跨账号订单看板服务实例（单例模式）"""
+    global _order_dashboard_service
+
+    if _order_dashboard_service is None:
+        _order_dashboard_service = OrderDashboardService()
+
+    return _order_dashboard_service
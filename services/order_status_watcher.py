@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订单状态监视器
+支付后按自适应间隔轮询订单详情（开始时频繁，之后逐步放慢，超过截止时间停止），
+同一订单的多个监视请求合并为一个轮询，状态变化自动通知订单观察者
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from patterns.order_observer import OrderStatus, get_order_subject
+
+
+def map_order_status(order_detail: Dict[str, Any]) -> Optional[OrderStatus]:
+    """
+    把沃美订单详情映射为订单状态
+
+    Args:
+        order_detail: WomeiOrderService.format_order_detail 格式的订单详情
+
+    Returns:
+        订单状态；状态描述无法识别时返回None
+    """
+    status_desc = order_detail.get('status_desc', '') or ''
+
+    if any(word in status_desc for word in ('取消', '退款', '失效', '关闭')):
+        return OrderStatus.CANCELLED
+    if any(word in status_desc for word in ('已取票', '已完成', '已放映', '已使用')):
+        return OrderStatus.COMPLETED
+    if order_detail.get('ticket_code'):
+        # 已出取票码视为订单已确认
+        return OrderStatus.CONFIRMED
+    if any(word in status_desc for word in ('已支付', '已付款', '待使用', '出票')):
+        return OrderStatus.PAID
+    if any(word in status_desc for word in ('待支付', '待付款')):
+        return OrderStatus.CREATED
+    return None
+
+
+class _OrderWatch:
+    """单个订单的监视状态"""
+
+    def __init__(self, order_id: str, cinema_id: str, token: str, deadline: float):
+        self.order_id = order_id
+        self.cinema_id = cinema_id
+        self.token = token
+        self.deadline = deadline
+        self.attempt = 0
+        self.last_status: Optional[OrderStatus] = None
+        self.last_detail: Dict[str, Any] = {}
+        self.callbacks: List[Callable[[str, Dict[str, Any]], None]] = []
+        self.in_flight = False
+
+
+class OrderStatusWatcher(QObject):
+    """订单状态监视器"""
+
+    # 信号定义
+    status_changed = pyqtSignal(str, str, dict)  # 状态变化信号 (订单号, 新状态, 订单详情)
+    ticket_ready = pyqtSignal(str, dict)         # 取票码就绪信号 (订单号, 订单详情)
+    watch_finished = pyqtSignal(str, dict)       # 监视结束信号 (订单号, 结果)
+
+    # 内部信号：工作线程 -> 主线程
+    _poll_done = pyqtSignal(str, dict)
+
+    # 轮询间隔（秒）：先快后慢，用完后保持最后一个间隔
+    POLL_SCHEDULE = (1, 1, 2, 2, 3, 5, 8, 13, 20, 30)
+    # 默认截止时间（秒）
+    DEFAULT_TIMEOUT = 180
+    # 出现以下状态后停止轮询
+    FINAL_STATUSES = (OrderStatus.CONFIRMED, OrderStatus.COMPLETED, OrderStatus.CANCELLED)
+
+    def __init__(self, max_workers: int = 2):
+        super().__init__()
+        self.watches: Dict[str, _OrderWatch] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='OrderStatusWatcher')
+        self._poll_done.connect(self._on_poll_done)
+
+    def watch(self, order_id: str, cinema_id: str, token: str,
+              callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+              timeout: float = DEFAULT_TIMEOUT) -> bool:
+        """
+        开始监视订单状态
+
+        Args:
+            order_id: 订单号
+            cinema_id: 影院ID
+            token: 用户token
+            callback: 监视结束时在主线程调用，参数为 (订单号, 结果)，
+                      结果包含 status / order_detail / timed_out
+            timeout: 截止时间（秒）
+
+        Returns:
+            是否新建了轮询（同一订单已在监视中时只合并回调，返回False）
+        """
+        if not order_id or not cinema_id or not token:
+            return False
+
+        watch = self.watches.get(order_id)
+        if watch is not None:
+            # 合并到已有的轮询，截止时间取较晚者
+            if callback:
+                watch.callbacks.append(callback)
+            watch.deadline = max(watch.deadline, time.time() + timeout)
+            watch.token = token
+            return False
+
+        watch = _OrderWatch(order_id, cinema_id, token, time.time() + timeout)
+        if callback:
+            watch.callbacks.append(callback)
+        self.watches[order_id] = watch
+
+        print(f"[订单监视] 👀 开始监视订单 {order_id}")
+        self._poll(watch)
+        return True
+
+    def cancel(self, order_id: str):
+        """停止监视订单（不触发回调）"""
+        self.watches.pop(order_id, None)
+
+    def is_watching(self, order_id: str) -> bool:
+        """订单是否在监视中"""
+        return order_id in self.watches
+
+    def _poll(self, watch: _OrderWatch):
+        """在后台线程查询一次订单详情"""
+        if self.watches.get(watch.order_id) is not watch or watch.in_flight:
+            return
+
+        watch.in_flight = True
+        watch.attempt += 1
+        self._executor.submit(self._fetch_detail, watch.order_id, watch.cinema_id, watch.token)
+
+    def _fetch_detail(self, order_id: str, cinema_id: str, token: str):
+        """工作线程：查询订单详情"""
+        try:
+            from services.womei_order_service import get_order_detail
+            result = get_order_detail(order_id, cinema_id, token)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        self._poll_done.emit(order_id, result)
+
+    def _on_poll_done(self, order_id: str, result: dict):
+        """主线程：处理一次轮询结果"""
+        watch = self.watches.get(order_id)
+        if watch is None:
+            return
+        watch.in_flight = False
+
+        if result.get('success'):
+            detail = result.get('order_detail', {}) or {}
+            watch.last_detail = detail
+            status = map_order_status(detail)
+
+            if status is not None and status != watch.last_status:
+                watch.last_status = status
+                print(f"[订单监视] 🔄 订单 {order_id} 状态: {status.value}")
+                get_order_subject().update_order_status(order_id, status, dict(detail))
+                self.status_changed.emit(order_id, status.value, detail)
+
+                if status == OrderStatus.CONFIRMED:
+                    self.ticket_ready.emit(order_id, detail)
+
+            if status in self.FINAL_STATUSES:
+                self._finish(watch, timed_out=False)
+                return
+        else:
+            print(f"[订单监视] ⚠️ 订单 {order_id} 第{watch.attempt}次查询失败: {result.get('error', '未知错误')}")
+
+        # 计算下一次轮询
+        delay = self.POLL_SCHEDULE[min(watch.attempt, len(self.POLL_SCHEDULE)) - 1]
+        if time.time() + delay > watch.deadline:
+            self._finish(watch, timed_out=True)
+            return
+
+        QTimer.singleShot(int(delay * 1000), lambda: self._poll(watch))
+
+    def _finish(self, watch: _OrderWatch, timed_out: bool):
+        """结束监视并通知所有回调"""
+        self.watches.pop(watch.order_id, None)
+
+        outcome = {
+            'status': watch.last_status.value if watch.last_status else None,
+            'order_detail': watch.last_detail,
+            'timed_out': timed_out,
+            'attempts': watch.attempt
+        }
+        print(f"[订单监视] ✅ 订单 {watch.order_id} 监视结束: 状态={outcome['status']}, "
+              f"查询{watch.attempt}次{', 已超时' if timed_out else ''}")
+
+        for callback in watch.callbacks:
+            try:
+                callback(watch.order_id, outcome)
+            except Exception as e:
+                print(f"[订单监视] ❌ 回调异常: {e}")
+
+        self.watch_finished.emit(watch.order_id, outcome)
+
+
+# 全局实例
+_order_status_watcher = None
+
+
+def get_order_status_watcher() -> OrderStatusWatcher:
+    """获取订单状态监视器实例（单例模式）"""
+    global _order_status_watcher
+
+    if _order_status_watcher is None:
+        _order_status_watcher = OrderStatusWatcher()
+
+    return _order_status_watcher
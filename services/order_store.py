@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地订单存储 - 按账号保存订单历史（SQLite）
+订单表直接从本地存储读取，后台通过订单列表接口的 next_offset 增量同步：
+从第一页开始拉取直到遇到已知订单为止，再逐步补齐更早的历史订单
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class OrderStore:
+    """本地订单存储"""
+
+    def __init__(self, db_path: str = 'data/order_history.db'):
+        """
+        初始化订单存储
+
+        Args:
+            db_path: 数据库文件路径
+        """
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建数据表"""
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS orders (
+                    account TEXT NOT NULL,
+                    order_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    movie_name TEXT,
+                    cinema_name TEXT,
+                    status_desc TEXT,
+                    show_date TEXT,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (account, order_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_orders_account_seq ON orders (account, seq DESC);
+
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    account TEXT PRIMARY KEY,
+                    backfill_offset INTEGER NOT NULL DEFAULT 0,
+                    history_complete INTEGER NOT NULL DEFAULT 0,
+                    last_sync_at REAL NOT NULL DEFAULT 0
+                );
+            """)
+
+    # ===== 读取 =====
+
+    def get_orders(self, account: str, keyword: str = '', limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        读取账号的订单（新订单在前）
+
+        Args:
+            account: 账号标识
+            keyword: 按影片、影院、状态、订单号模糊搜索
+            limit: 最多返回的数量
+
+        Returns:
+            与 WomeiOrderService.format_single_order 相同格式的订单列表
+        """
+        sql = "SELECT data FROM orders WHERE account = ?"
+        params: List[Any] = [account]
+
+        keyword = (keyword or '').strip()
+        if keyword:
+            pattern = f"%{keyword}%"
+            sql += " AND (movie_name LIKE ? OR cinema_name LIKE ? OR status_desc LIKE ? OR order_id LIKE ?)"
+            params.extend([pattern] * 4)
+
+        sql += " ORDER BY seq DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def count_orders(self, account: str) -> int:
+        """账号已保存的订单数量"""
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM orders WHERE account = ?", (account,)).fetchone()
+        return row[0]
+
+    def count_known(self, account: str, order_ids: List[str]) -> int:
+        """统计给定订单号中已保存的数量"""
+        if not order_ids:
+            return 0
+
+        placeholders = ','.join('?' * len(order_ids))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COUNT(*) FROM orders WHERE account = ? AND order_id IN ({placeholders})",
+                [account, *order_ids]
+            ).fetchone()
+        return row[0]
+
+    # ===== 写入 =====
+
+    def upsert_orders(self, account: str, orders: List[Dict[str, Any]], at_head: bool = True) -> Dict[str, int]:
+        """
+        写入一页订单（页内顺序为新订单在前）
+
+        Args:
+            account: 账号标识
+            orders: 格式化后的订单列表
+            at_head: True表示比已有订单更新（排在最前），False表示更早的历史订单（排在最后）
+
+        Returns:
+            {'new': 新增数量, 'changed': 状态等字段发生变化的数量, 'known': 已存在的数量}
+        """
+        stats = {'new': 0, 'changed': 0, 'known': 0}
+        if not orders:
+            return stats
+
+        now = time.time()
+        with self._lock, self._conn:
+            seq_row = self._conn.execute(
+                "SELECT MAX(seq), MIN(seq) FROM orders WHERE account = ?", (account,)
+            ).fetchone()
+            max_seq = seq_row[0] if seq_row[0] is not None else 0
+            min_seq = seq_row[1] if seq_row[1] is not None else 1
+
+            new_orders = []
+            for order in orders:
+                order_id = str(order.get('order_id', ''))
+                if not order_id:
+                    continue
+
+                data = json.dumps(order, ensure_ascii=False, separators=(',', ':'))
+                existing = self._conn.execute(
+                    "SELECT data FROM orders WHERE account = ? AND order_id = ?", (account, order_id)
+                ).fetchone()
+
+                if existing is None:
+                    new_orders.append((order_id, order, data))
+                    continue
+
+                stats['known'] += 1
+                if existing['data'] != data:
+                    stats['changed'] += 1
+                    self._conn.execute(
+                        "UPDATE orders SET movie_name = ?, cinema_name = ?, status_desc = ?, show_date = ?, "
+                        "data = ?, updated_at = ? WHERE account = ? AND order_id = ?",
+                        (order.get('movie_name', ''), order.get('cinema_name', ''), order.get('status_desc', ''),
+                         order.get('show_date', ''), data, now, account, order_id)
+                    )
+
+            # 新订单排序号：页头更新的排在已有订单之前，历史页排在已有订单之后
+            count = len(new_orders)
+            for index, (order_id, order, data) in enumerate(new_orders):
+                seq = max_seq + count - index if at_head else min_seq - 1 - index
+                self._conn.execute(
+                    "INSERT INTO orders (account, order_id, seq, movie_name, cinema_name, status_desc, show_date, "
+                    "data, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (account, order_id, seq, order.get('movie_name', ''), order.get('cinema_name', ''),
+                     order.get('status_desc', ''), order.get('show_date', ''), data, now)
+                )
+            stats['new'] = count
+
+        return stats
+
+    # ===== 同步状态 =====
+
+    def get_sync_state(self, account: str) -> Dict[str, Any]:
+        """获取账号的同步状态"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT backfill_offset, history_complete, last_sync_at FROM sync_state WHERE account = ?", (account,)
+            ).fetchone()
+
+        if row is None:
+            return {'backfill_offset': 0, 'history_complete': False, 'last_sync_at': 0}
+        return {
+            'backfill_offset': row['backfill_offset'],
+            'history_complete': bool(row['history_complete']),
+            'last_sync_at': row['last_sync_at']
+        }
+
+    def save_sync_state(self, account: str, backfill_offset: int, history_complete: bool):
+        """保存账号的同步状态"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (account, backfill_offset, history_complete, last_sync_at) "
+                "VALUES (?, ?, ?, ?)",
+                (account, int(backfill_offset), 1 if history_complete else 0, time.time())
+            )
+
+    def clear_account(self, account: str):
+        """清除账号的本地订单（下次同步会重新拉取）"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM orders WHERE account = ?", (account,))
+            self._conn.execute("DELETE FROM sync_state WHERE account = ?", (account,))
+
+
+def sync_account_orders(store: OrderStore, account: str, token: str,
+                        fetch_page: Optional[Callable[[str, int], Dict[str, Any]]] = None,
+                        max_backfill_pages: int = 5, max_head_pages: int = 20) -> Dict[str, Any]:
+    """
+    增量同步账号订单
+
+    先从第一页开始拉取，直到某页出现已知订单为止（新订单和状态变化写入存储）；
+    再从上次的位置继续向后补齐历史订单，每次最多 max_backfill_pages 页
+
+    Args:
+        store: 订单存储
+        account: 账号标识
+        token: 用户token
+        fetch_page: 分页拉取函数 (token, offset) -> get_orders格式的结果，默认使用 get_user_orders
+        max_backfill_pages: 单次同步最多补齐的历史页数
+        max_head_pages: 单次同步最多拉取的新订单页数
+
+    Returns:
+        {'success': bool, 'new': 新增数量, 'changed': 变化数量, 'pages': 请求页数,
+         'history_complete': 历史是否已补齐, 'error': 错误信息}
+    """
+    if fetch_page is None:
+        from services.womei_order_service import get_user_orders
+        fetch_page = get_user_orders
+
+    summary = {'success': True, 'new': 0, 'changed': 0, 'pages': 0, 'history_complete': False}
+    state = store.get_sync_state(account)
+    had_orders = store.count_orders(account) > 0
+
+    # 第一阶段：拉取新订单，遇到已知订单即停止（各页合并后一次写入，保证新订单整体排在已有订单之前）
+    offset = 0
+    head_orders: List[Dict[str, Any]] = []
+    head_end_offset = 0
+    reached_end = False
+    for _ in range(max_head_pages):
+        result = fetch_page(token, offset)
+        summary['pages'] += 1
+        if not result.get('success'):
+            summary['success'] = False
+            summary['error'] = result.get('error', '获取订单列表失败')
+            return summary
+
+        orders = result.get('orders', [])
+        head_orders.extend(orders)
+
+        next_offset = result.get('next_offset') or 0
+        if not orders or next_offset <= offset:
+            reached_end = True
+            break
+
+        offset = next_offset
+        head_end_offset = next_offset
+        if store.count_known(account, [str(order.get('order_id', '')) for order in orders]):
+            break
+
+    stats = store.upsert_orders(account, head_orders, at_head=True)
+    head_new = stats['new']
+    summary['new'] += head_new
+    summary['changed'] += stats['changed']
+
+    # 首次同步时，第一阶段拉到的位置就是历史补齐的起点；
+    # 之后的同步中，新订单插入在前面会使历史页的偏移整体后移
+    if not had_orders:
+        backfill_offset = head_end_offset
+        history_complete = reached_end
+    else:
+        backfill_offset = state['backfill_offset'] + head_new
+        history_complete = state['history_complete']
+
+    # 第二阶段：补齐更早的历史订单
+    pages = 0
+    while not history_complete and pages < max_backfill_pages:
+        result = fetch_page(token, backfill_offset)
+        summary['pages'] += 1
+        pages += 1
+        if not result.get('success'):
+            # 历史补齐失败不影响新订单，下次同步继续
+            print(f"[订单存储] ⚠️ 历史订单补齐失败: {result.get('error', '未知错误')}")
+            break
+
+        orders = result.get('orders', [])
+        stats = store.upsert_orders(account, orders, at_head=False)
+        summary['new'] += stats['new']
+        summary['changed'] += stats['changed']
+
+        next_offset = result.get('next_offset') or 0
+        if not orders or next_offset <= backfill_offset:
+            history_complete = True
+        else:
+            backfill_offset = next_offset
+
+    store.save_sync_state(account, backfill_offset, history_complete)
+    summary['history_complete'] = history_complete
+    return summary
+
+
+# 全局实例
+_order_store = None
+
+
+def get_order_store() -> OrderStore:
+    """获取本地订单存储实例（单例模式）"""
+    global _order_store
+
+    if _order_store is None:
+        _order_store = OrderStore()
+
+    return _order_store
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订单提交快速通道
+选座时预先构建好创建订单(order/ticket)的请求体和请求头，并保持一个预热的长连接；
+点击提交时只做一次发送，所有日志和格式化都推迟到收到响应之后，同时记录提交到响应的耗时
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cinema_api_adapter import WomeiConfig
+
+
+def build_seatlable(selected_seats: List[Dict]) -> str:
+    """
+    从选中座位构建沃美座位参数
+
+    Args:
+        selected_seats: 座位数据列表（需包含座位图接口的original_data）
+
+    Returns:
+        座位参数字符串，格式 area_no:row:col:seat_no，多个座位以|分隔；数据不完整时返回空字符串
+    """
+    seat_parts = []
+    for seat in selected_seats:
+        original_data = seat.get('original_data', {})
+
+        seat_no = original_data.get('seat_no', '')
+        area_no = original_data.get('area_no', '')
+        if not seat_no or '#' not in seat_no or not area_no:
+            return ""
+
+        seat_parts.append(f"{area_no}:{original_data.get('row', '')}:{original_data.get('col', '')}:{seat_no}")
+
+    return "|".join(seat_parts)
+
+
+@dataclass
+class PreparedOrder:
+    """预先构建好的创建订单请求"""
+    key: Tuple
+    url: str
+    headers: Dict[str, str]
+    body: bytes
+    cinema_id: str
+    schedule_id: str
+    seatlable: str
+    prepared_at: float = field(default_factory=time.time)
+
+
+class OrderSubmitService:
+    """订单提交快速通道 - 预构建请求 + 预热连接 + 延迟日志"""
+
+    # 连接空闲超过该时间（秒）后，下次准备请求时重新预热
+    WARM_INTERVAL = 15
+    # 保留的耗时记录数量
+    LATENCY_HISTORY = 50
+
+    def __init__(self, timeout: int = 30):
+        self.timeout = timeout
+
+        # 独立的连接池，只用于下单，避免和其他接口抢连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount('https://', adapter)
+
+        self._prepared: Optional[PreparedOrder] = None
+        self._lock = threading.Lock()
+        self._last_warm_time = 0.0
+        self._warming = False
+        self.latencies: deque = deque(maxlen=self.LATENCY_HISTORY)
+
+    # ===== 预构建 =====
+
+    def prepare(self, token: str, cinema_id: str, schedule_id: str,
+                selected_seats: List[Dict]) -> Optional[PreparedOrder]:
+        """
+        构建（或复用已构建的）创建订单请求，并按需预热连接
+
+        Returns:
+            预构建的请求；参数不完整或座位数据无法构建时返回None
+        """
+        if not token or not cinema_id or not schedule_id or not selected_seats:
+            return None
+
+        seat_ids = tuple(seat.get('original_data', {}).get('seat_no', '') for seat in selected_seats)
+        key = (token, cinema_id, schedule_id, seat_ids)
+
+        prepared = self._prepared
+        if prepared is None or prepared.key != key:
+            seatlable = build_seatlable(selected_seats)
+            if not seatlable:
+                return None
+
+            url = WomeiConfig.build_api_url('order_ticket', cinema_id)
+            body = urlencode({'seatlable': seatlable, 'schedule_id': schedule_id}).encode('utf-8')
+            prepared = PreparedOrder(
+                key=key,
+                url=url,
+                headers=WomeiConfig.build_order_headers(token),
+                body=body,
+                cinema_id=cinema_id,
+                schedule_id=schedule_id,
+                seatlable=seatlable
+            )
+            self._prepared = prepared
+
+        self.warm_up()
+        return prepared
+
+    def warm_up(self):
+        """后台预热到订单接口主机的连接（TLS握手提前完成，提交时直接复用）"""
+        if self._warming or time.time() - self._last_warm_time < self.WARM_INTERVAL:
+            return
+
+        with self._lock:
+            if self._warming:
+                return
+            self._warming = True
+
+        def warm():
+            try:
+                self.session.head(WomeiConfig.get_config()['api_config']['base_url'], timeout=5, verify=False)
+            except Exception:
+                pass
+            finally:
+                self._last_warm_time = time.time()
+                self._warming = False
+
+        threading.Thread(target=warm, name='OrderSubmitWarmUp', daemon=True).start()
+
+    # ===== 提交 =====
+
+    def submit(self, prepared: PreparedOrder) -> Dict[str, Any]:
+        """
+        发送预构建的创建订单请求
+
+        Returns:
+            与 WomeiFilmService.create_order 相同格式的结果，额外包含 latency_ms
+        """
+        start = time.perf_counter()
+        error = None
+        response = None
+        try:
+            response = self.session.post(prepared.url, data=prepared.body, headers=prepared.headers,
+                                         timeout=self.timeout, verify=False)
+        except Exception as e:
+            error = e
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        # ===== 以下均在收到响应之后执行 =====
+        self._last_warm_time = time.time()
+        self.latencies.append(latency_ms)
+        # 已提交的请求不再复用，避免重复下单
+        if self._prepared is prepared:
+            self._prepared = None
+
+        print(f"[订单提交] 🚀 座位: {prepared.seatlable}, 场次: {prepared.schedule_id}, "
+              f"提交到响应耗时: {latency_ms:.1f}ms")
+
+        if error is not None:
+            print(f"[订单提交] ❌ 请求异常: {error}")
+            result = {"success": False, "error": f"请求异常: {error}", "order_info": {}}
+        elif response.status_code != 200:
+            print(f"[订单提交] ❌ HTTP错误: {response.status_code}")
+            result = {"success": False, "error": f"HTTP错误: {response.status_code}", "order_info": {}}
+        else:
+            try:
+                raw = response.json()
+            except Exception as e:
+                print(f"[订单提交] ❌ JSON解析失败: {e}, 响应内容: {response.text[:500]}")
+                raw = {"ret": -1, "msg": f"响应解析失败: {e}", "data": {}}
+
+            from services.womei_film_service import WomeiFilmService
+            result = WomeiFilmService.parse_create_order_response(raw)
+
+        result['latency_ms'] = round(latency_ms, 1)
+        return result
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """获取提交到响应耗时统计（毫秒）"""
+        if not self.latencies:
+            return {'count': 0}
+
+        ordered = sorted(self.latencies)
+        count = len(ordered)
+        return {
+            'count': count,
+            'last': round(self.latencies[-1], 1),
+            'min': round(ordered[0], 1),
+            'avg': round(sum(ordered) / count, 1),
+            'p50': round(ordered[count // 2], 1),
+            'p95': round(ordered[min(count - 1, int(count * 0.95))], 1),
+            'max': round(ordered[-1], 1)
+        }
+
+
+# 全局实例
+_order_submit_service = None
+
+
+def get_order_submit_service() -> OrderSubmitService:
+    """获取订单提交快速通道实例（单例模式）"""
+    global _order_submit_service
+
+    if _order_submit_service is None:
+        _order_submit_service = OrderSubmitService()
+
+    return _order_submit_service
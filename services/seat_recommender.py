@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+座位推荐器
+在座位矩阵上预先计算每排连续可选座位段，按离银幕中心的距离为N连座打分，返回最优的前K组
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+SeatKey = Tuple[int, int]  # (数组行索引, 数组列索引)
+
+
+@dataclass
+class SeatBlock:
+    """推荐的连座组合"""
+    keys: List[SeatKey]          # 座位在矩阵中的数组索引
+    score: float                 # 得分，越小越好
+    logical_row: int             # 逻辑排号
+    area_name: str = ''
+    area_price: float = 0
+    seat_labels: List[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        """描述文字，如：5排 12-13座"""
+        return f"{self.logical_row}排 {'/'.join(self.seat_labels)}座"
+
+
+@dataclass
+class _SeatRun:
+    """一排中连续可选、同区域同价格的座位段"""
+    keys: List[SeatKey]
+    xs: List[int]
+    seat_types: List[int]
+    labels: List[str]
+    physical_y: int
+    logical_row: int
+    area_name: str
+    area_price: float
+
+
+class SeatRecommender:
+    """连座推荐器 - 座位段预先计算，单次查询只做O(座位数)的区间打分"""
+
+    # 前后方向距离的权重（大于1表示更在意排的位置）
+    ROW_WEIGHT = 1.5
+
+    def __init__(self, seat_data: List[List[Dict]]):
+        self.seat_data = seat_data or []
+        self.runs: List[_SeatRun] = []
+        self.center_x = 0.0
+        self.center_y = 0.0
+        self._build_runs()
+
+    def _build_runs(self):
+        """按物理排分组并切分出连续可选座位段"""
+        rows: Dict[int, List[Tuple[int, SeatKey, Dict]]] = {}
+        min_x = min_y = None
+        max_x = max_y = None
+
+        for r, row in enumerate(self.seat_data):
+            for c, seat in enumerate(row):
+                if not seat or seat.get('status') == 'empty':
+                    continue
+
+                x = seat.get('x', c + 1)
+                y = seat.get('y', r + 1)
+                rows.setdefault(y, []).append((x, (r, c), seat))
+
+                min_x = x if min_x is None else min(min_x, x)
+                max_x = x if max_x is None else max(max_x, x)
+                min_y = y if min_y is None else min(min_y, y)
+                max_y = y if max_y is None else max(max_y, y)
+
+        if min_x is None:
+            return
+
+        # 银幕中心：横向取座位区域中线，纵向取中间排
+        self.center_x = (min_x + max_x) / 2.0
+        self.center_y = (min_y + max_y) / 2.0
+
+        for y, row_seats in rows.items():
+            row_seats.sort(key=lambda item: item[0])
+            positions = {x: seat for x, _, seat in row_seats}
+
+            current: Optional[_SeatRun] = None
+            last_x = None
+            for x, key, seat in row_seats:
+                if not self._is_seat_usable(seat, x, positions):
+                    current = None
+                    last_x = None
+                    continue
+
+                area_name = seat.get('area_name', '')
+                area_price = seat.get('area_price', 0)
+                continues_run = (
+                    current is not None
+                    and last_x == x - 1
+                    and current.area_name == area_name
+                    and current.area_price == area_price
+                )
+                if not continues_run:
+                    current = _SeatRun([], [], [], [], y, seat.get('row', key[0] + 1), area_name, area_price)
+                    self.runs.append(current)
+
+                current.keys.append(key)
+                current.xs.append(x)
+                current.seat_types.append(seat.get('type', 0))
+                current.labels.append(str(seat.get('num', seat.get('col', key[1] + 1))))
+                last_x = x
+
+    @staticmethod
+    def _is_seat_usable(seat: Dict, x: int, positions: Dict[int, Dict]) -> bool:
+        """座位可选；情侣座还要求配对座位（同排相邻、类型互补）也可选"""
+        if seat.get('status', 'available') != 'available':
+            return False
+
+        seat_type = seat.get('type', 0)
+        if seat_type not in [1, 2]:
+            return True
+
+        # 与座位面板 _find_couple_partner 的配对规则一致：左座(1)配右侧x+1的右座(2)
+        partner_x, partner_type = (x + 1, 2) if seat_type == 1 else (x - 1, 1)
+        partner = positions.get(partner_x)
+        return bool(partner) and partner.get('type') == partner_type and partner.get('status', 'available') == 'available'
+
+    def recommend(self, count: int, top_k: int = 5, area_name: Optional[str] = None) -> List[SeatBlock]:
+        """
+        推荐N连座
+
+        Args:
+            count: 连座数量
+            top_k: 返回的组合数量
+            area_name: 只在指定区域内推荐
+
+        Returns:
+            按得分从优到劣排列的连座组合
+        """
+        if count <= 0:
+            return []
+
+        candidates = []
+        for run_index, run in enumerate(self.runs):
+            if len(run.keys) < count:
+                continue
+            if area_name and run.area_name != area_name:
+                continue
+
+            dy = (run.physical_y - self.center_y) * self.ROW_WEIGHT
+            dy_squared = dy * dy
+            xs = run.xs
+            seat_types = run.seat_types
+
+            for start in range(len(xs) - count + 1):
+                end = start + count - 1
+                # 不能把情侣座拆开：起点不能是右座，终点不能是左座
+                if seat_types[start] == 2 or seat_types[end] == 1:
+                    continue
+
+                dx = (xs[start] + xs[end]) / 2.0 - self.center_x
+                candidates.append((dx * dx + dy_squared, run_index, start))
+
+        best = heapq.nsmallest(top_k, candidates)
+
+        blocks = []
+        for score, run_index, start in best:
+            run = self.runs[run_index]
+            blocks.append(SeatBlock(
+                keys=run.keys[start:start + count],
+                score=score,
+                logical_row=run.logical_row,
+                area_name=run.area_name,
+                area_price=run.area_price,
+                seat_labels=run.labels[start:start + count]
+            ))
+        return blocks
+
+    def best_block(self, count: int, area_name: Optional[str] = None) -> Optional[SeatBlock]:
+        """获取最优的N连座"""
+        blocks = self.recommend(count, top_k=1, area_name=area_name)
+        return blocks[0] if blocks else None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+座位状态实时刷新服务
+定时拉取当前场次的可售座位(hall_saleable)，与座位图当前状态对比，只重绘发生变化的座位
+"""
+
+from typing import Dict, List, Optional, Set, Tuple
+from PyQt5.QtCore import QObject, QThread, QTimer, QEvent, pyqtSignal
+
+
+def extract_saleable_positions(saleable_data: Dict) -> Optional[Set[Tuple[int, int]]]:
+    """
+    从可售座位数据中提取座位逻辑位置
+
+    Args:
+        saleable_data: hall_saleable接口返回的data字段
+
+    Returns:
+        可售座位位置集合 {(row, col), ...}；数据格式无法识别时返回None
+    """
+    if not isinstance(saleable_data, dict) or 'room_seat' not in saleable_data:
+        return None
+
+    positions = set()
+    for area in saleable_data.get('room_seat') or []:
+        seats_data = area.get('seats', [])
+
+        # 兼容按行组织的字典格式和直接包含座位的列表格式
+        if isinstance(seats_data, dict):
+            seat_details = []
+            for row_data in seats_data.values():
+                seat_details.extend(row_data.get('detail', []))
+        elif isinstance(seats_data, list):
+            seat_details = seats_data
+        else:
+            continue
+
+        for seat in seat_details:
+            try:
+                row = int(seat.get('row', 0))
+                col = int(seat.get('col', 0))
+            except (TypeError, ValueError):
+                continue
+            if row > 0 and col > 0:
+                positions.add((row, col))
+
+    return positions
+
+
+def diff_seat_overlay(seat_data: List[List[Dict]], saleable_positions: Set[Tuple[int, int]]) -> Dict[Tuple[int, int], str]:
+    """
+    对比座位图当前状态与最新可售座位，计算需要更新的座位
+
+    Args:
+        seat_data: 座位面板中的座位矩阵
+        saleable_positions: 最新可售座位位置集合
+
+    Returns:
+        {(数组行索引, 数组列索引): 新状态}
+    """
+    updates = {}
+    for r, row in enumerate(seat_data):
+        for c, seat in enumerate(row):
+            if not seat:
+                continue
+
+            status = seat.get('status', 'available')
+            # 空位、不可选择座位和用户已选座位不参与对比
+            if status in ('empty', 'unavailable', 'selected'):
+                continue
+
+            position = (seat.get('row', r + 1), seat.get('col', c + 1))
+            is_saleable = position in saleable_positions
+
+            if status == 'available' and not is_saleable:
+                updates[(r, c)] = 'locked'
+            elif status in ('sold', 'locked') and is_saleable:
+                updates[(r, c)] = 'available'
+
+    return updates
+
+
+class SaleableFetchThread(QThread):
+    """可售座位拉取线程"""
+
+    # 定义信号
+    saleable_loaded = pyqtSignal(object)  # 可售座位位置集合
+    fetch_failed = pyqtSignal(str)        # 拉取失败信号
+
+    def __init__(self, film_service, cinema_id: str, schedule_id: str):
+        super().__init__()
+        self.film_service = film_service
+        self.cinema_id = cinema_id
+        self.schedule_id = schedule_id
+
+    def run(self):
+        """执行可售座位拉取"""
+        try:
+            result = self.film_service.get_hall_saleable(self.cinema_id, self.schedule_id)
+            if not result.get('success'):
+                self.fetch_failed.emit(result.get('error', '获取可售座位失败'))
+                return
+
+            positions = extract_saleable_positions(result.get('saleable_info', {}))
+            if positions is None:
+                self.fetch_failed.emit("可售座位数据格式无法识别")
+                return
+
+            self.saleable_loaded.emit(positions)
+
+        except Exception as e:
+            self.fetch_failed.emit(f"获取可售座位异常: {str(e)}")
+
+
+class SeatStatusRefresher(QObject):
+    """座位状态实时刷新器 - 自适应刷新间隔，窗口隐藏时暂停"""
+
+    # 信号定义
+    seats_changed = pyqtSignal(dict)  # 座位状态变化信号，传递 {(r, c): 新状态}
+
+    MIN_INTERVAL = 3 * 1000    # 最短刷新间隔（毫秒）
+    BASE_INTERVAL = 5 * 1000   # 初始刷新间隔（毫秒）
+    MAX_INTERVAL = 30 * 1000   # 最长刷新间隔（毫秒）
+
+    def __init__(self, seat_panel, token: str, cinema_id: str, schedule_id: str):
+        super().__init__()
+
+        self.seat_panel = seat_panel
+        self.cinema_id = cinema_id
+        self.schedule_id = schedule_id
+
+        # 使用独立的服务实例，避免与界面线程共享同一个HTTP会话
+        from services.womei_film_service import WomeiFilmService
+        self.film_service = WomeiFilmService(token)
+
+        # 状态变量
+        self.interval = self.BASE_INTERVAL
+        self.is_running = False
+        self.is_paused = False
+        self.fetch_thread: Optional[SaleableFetchThread] = None
+        self._watched_window = None
+
+        # 单次定时器，每轮根据结果重新计算下次间隔
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._on_timeout)
+
+        # 座位面板销毁时自动停止
+        seat_panel.destroyed.connect(self.stop)
+
+    def start(self):
+        """开始定时刷新"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.is_paused = False
+        self.interval = self.BASE_INTERVAL
+        self._watch_window()
+        self.timer.start(self.interval)
+
+    def stop(self):
+        """停止定时刷新"""
+        self.is_running = False
+        self.timer.stop()
+
+        if self._watched_window is not None:
+            try:
+                self._watched_window.removeEventFilter(self)
+            except RuntimeError:
+                pass
+            self._watched_window = None
+
+    def set_enabled(self, enabled: bool):
+        """开启或关闭定时刷新"""
+        if enabled:
+            self.start()
+        else:
+            self.stop()
+
+    def _watch_window(self):
+        """监听顶层窗口的显示/隐藏/最小化事件"""
+        try:
+            window = self.seat_panel.window()
+        except RuntimeError:
+            return
+
+        if window is not None and window is not self._watched_window:
+            window.installEventFilter(self)
+            self._watched_window = window
+
+    def eventFilter(self, obj, event):
+        """窗口隐藏或最小化时暂停刷新，恢复显示后立即刷新一次"""
+        if obj is self._watched_window and self.is_running:
+            event_type = event.type()
+            if event_type in (QEvent.Hide, QEvent.WindowStateChange, QEvent.Show):
+                if self._is_window_hidden():
+                    self._pause()
+                elif self.is_paused:
+                    self._resume()
+        return False
+
+    def _is_window_hidden(self) -> bool:
+        """判断座位图当前是否对用户不可见"""
+        try:
+            window = self.seat_panel.window()
+            return (not self.seat_panel.isVisible()) or window.isHidden() or window.isMinimized()
+        except RuntimeError:
+            return True
+
+    def _pause(self):
+        """暂停刷新"""
+        self.is_paused = True
+        self.timer.stop()
+
+    def _resume(self):
+        """恢复刷新"""
+        self.is_paused = False
+        self.interval = self.BASE_INTERVAL
+        self.timer.start(0)
+
+    def _on_timeout(self):
+        """定时器触发 - 后台拉取可售座位"""
+        if not self.is_running:
+            return
+
+        if self._is_window_hidden():
+            self._pause()
+            return
+
+        # 上一轮尚未返回时不重复请求
+        if self.fetch_thread is not None and self.fetch_thread.isRunning():
+            self._schedule_next()
+            return
+
+        self.fetch_thread = SaleableFetchThread(self.film_service, self.cinema_id, self.schedule_id)
+        self.fetch_thread.saleable_loaded.connect(self._on_saleable_loaded)
+        self.fetch_thread.fetch_failed.connect(self._on_fetch_failed)
+        self.fetch_thread.start()
+
+    def _on_saleable_loaded(self, saleable_positions: set):
+        """可售座位返回 - 对比当前座位图并增量重绘"""
+        if not self.is_running:
+            return
+
+        try:
+            updates = diff_seat_overlay(self.seat_panel.seat_data, saleable_positions)
+            changed = self.seat_panel.apply_seat_status_updates(updates) if updates else 0
+        except RuntimeError:
+            # 座位面板已被销毁
+            self.stop()
+            return
+
+        if changed:
+            print(f"[座位刷新] 🔄 {changed} 个座位状态已更新")
+            self.seats_changed.emit(updates)
+            # 座位变化活跃时加快刷新
+            self.interval = max(self.MIN_INTERVAL, self.interval // 2)
+        else:
+            # 无变化时逐步放慢刷新
+            self.interval = min(self.MAX_INTERVAL, int(self.interval * 1.5))
+
+        self._schedule_next()
+
+    def _on_fetch_failed(self, error_msg: str):
+        """拉取失败 - 退避到最长间隔"""
+        print(f"[座位刷新] ⚠️ {error_msg}")
+        self.interval = self.MAX_INTERVAL
+        self._schedule_next()
+
+    def _schedule_next(self):
+        """安排下一次刷新"""
+        if self.is_running and not self.is_paused:
+            self.timer.start(self.interval)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量绑券任务 - 限流下的有界并发绑券
+每张券的结果实时回调；支持暂停、取消，Token失效时停止并保留剩余券，
+重新登录后用新token继续绑定剩余部分；绑定成功的券号持久化记录，重复提交时自动跳过
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from services.womei_voucher_service import get_womei_voucher_service
+from utils.rate_limiter import RateLimiter
+
+# 单张券结果回调（在工作线程中调用）
+BindResultCallback = Callable[[Dict[str, Any]], None]
+
+
+class VoucherBindRecordStore:
+    """绑券成功记录（SQLite）"""
+
+    def __init__(self, db_path: str = 'data/voucher_bind_records.db'):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS bound_vouchers (
+                    account TEXT NOT NULL,
+                    voucher_code TEXT NOT NULL,
+                    cinema_id TEXT NOT NULL,
+                    message TEXT,
+                    bound_at REAL NOT NULL,
+                    PRIMARY KEY (account, voucher_code)
+                )
+            """)
+
+    def record_success(self, account: str, cinema_id: str, voucher_code: str, message: str = ''):
+        """记录绑定成功的券"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO bound_vouchers (account, voucher_code, cinema_id, message, bound_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (account, voucher_code, str(cinema_id), message, time.time())
+            )
+
+    def get_bound_codes(self, account: str) -> Set[str]:
+        """账号已绑定成功的券号"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT voucher_code FROM bound_vouchers WHERE account = ?", (account,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def is_bound(self, account: str, voucher_code: str) -> bool:
+        """券是否已由该账号绑定成功"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM bound_vouchers WHERE account = ? AND voucher_code = ?", (account, voucher_code)
+            ).fetchone()
+        return row is not None
+
+
+class BatchBindJob:
+    """批量绑券任务"""
+
+    # 任务状态
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_PAUSED = 'paused'
+    STATUS_COMPLETED = 'completed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_TOKEN_EXPIRED = 'token_expired'
+
+    # 并发数与请求间隔（所有并发请求共享同一个限流器）
+    MAX_WORKERS = 3
+    REQUEST_INTERVAL = 0.3
+
+    def __init__(self, cinema_id: str, token: str, account: str, vouchers: List[Tuple[str, str]],
+                 max_workers: int = MAX_WORKERS, request_interval: float = REQUEST_INTERVAL,
+                 record_store: Optional[VoucherBindRecordStore] = None):
+        """
+        Args:
+            cinema_id: 影院ID
+            token: 用户token
+            account: 账号标识（手机号），用于绑定成功记录
+            vouchers: 券列表 [(voucher_code, voucher_password), ...]
+            max_workers: 最大并发数
+            request_interval: 相邻请求的最小间隔（秒）
+            record_store: 绑券成功记录，默认使用全局记录
+        """
+        self.cinema_id = cinema_id
+        self.token = token
+        self.account = account
+        self.max_workers = max(1, max_workers)
+        self.records = record_store or get_voucher_bind_records()
+        self.total = len(vouchers)
+        self.status = self.STATUS_PENDING
+
+        self.success = 0
+        self.fail = 0
+        self.skipped = 0
+        self.fail_codes: List[str] = []
+
+        self._pending = deque((index, code, password) for index, (code, password) in enumerate(vouchers, 1))
+        self._limiter = RateLimiter(request_interval)
+        self._lock = threading.Lock()
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._stopped = False
+        self._service = get_womei_voucher_service()
+
+    # ===== 控制 =====
+
+    def pause(self):
+        """暂停（正在进行的请求完成后停止发起新请求）"""
+        if self.status == self.STATUS_RUNNING:
+            self.status = self.STATUS_PAUSED
+            self._resume_event.clear()
+
+    def resume(self, token: Optional[str] = None):
+        """
+        继续绑定
+
+        Args:
+            token: 新token（Token失效并重新登录后传入），之后需重新调用 run 绑定剩余券
+        """
+        if token:
+            self.token = token
+        if self.status == self.STATUS_PAUSED:
+            self.status = self.STATUS_RUNNING
+        self._resume_event.set()
+
+    def cancel(self):
+        """取消，未绑定的券保留在剩余列表中"""
+        self._stopped = True
+        self.status = self.STATUS_CANCELLED
+        self._resume_event.set()
+
+    def remaining(self) -> List[Tuple[str, str]]:
+        """尚未绑定的券"""
+        with self._lock:
+            return [(code, password) for _, code, password in self._pending]
+
+    @property
+    def can_resume(self) -> bool:
+        """是否可以用 run 继续绑定剩余券"""
+        return self.status in (self.STATUS_TOKEN_EXPIRED, self.STATUS_CANCELLED) and bool(self._pending)
+
+    # ===== 执行 =====
+
+    def run(self, on_result: Optional[BindResultCallback] = None) -> Dict[str, Any]:
+        """
+        执行绑定（阻塞直到完成、取消或Token失效），Token失效或取消后可再次调用继续剩余券
+
+        Args:
+            on_result: 单张券结果回调，参数 {'index', 'voucher_code', 'success', 'skipped', 'message', 'result'}
+
+        Returns:
+            任务汇总，见 summary
+        """
+        self._stopped = False
+        self.status = self.STATUS_RUNNING
+        self._resume_event.set()
+
+        workers = min(self.max_workers, len(self._pending)) or 1
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='voucher-bind') as executor:
+            for future in [executor.submit(self._worker, on_result) for _ in range(workers)]:
+                future.result()
+
+        if self.status == self.STATUS_RUNNING:
+            self.status = self.STATUS_COMPLETED
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """任务汇总"""
+        return {
+            'status': self.status,
+            'total': self.total,
+            'success': self.success,
+            'fail': self.fail,
+            'skipped': self.skipped,
+            'fail_codes': list(self.fail_codes),
+            'remaining': len(self._pending)
+        }
+
+    def _worker(self, on_result: Optional[BindResultCallback]):
+        while True:
+            self._resume_event.wait()
+            with self._lock:
+                if self._stopped or not self._pending:
+                    return
+                index, code, password = self._pending.popleft()
+
+            if self.records.is_bound(self.account, code):
+                with self._lock:
+                    self.skipped += 1
+                self._emit(on_result, index, code, True, True, f"券 {code} 已绑定过，跳过", {})
+                continue
+
+            self._limiter.wait()
+            result = self._service.bind_voucher(self.cinema_id, self.token, code, password)
+            result['voucher_code'] = code
+
+            if self._is_token_expired(result):
+                # Token失效：当前券放回队列，停止所有工作线程，等待重新登录后继续
+                with self._lock:
+                    self._pending.appendleft((index, code, password))
+                    self._stopped = True
+                    self.status = self.STATUS_TOKEN_EXPIRED
+                return
+
+            is_success, message = self._service.format_bind_result(result)
+            with self._lock:
+                if is_success:
+                    self.success += 1
+                else:
+                    self.fail += 1
+                    self.fail_codes.append(code)
+            if is_success:
+                self.records.record_success(self.account, self.cinema_id, code, message)
+            self._emit(on_result, index, code, is_success, False, message, result)
+
+    @staticmethod
+    def _emit(on_result: Optional[BindResultCallback], index: int, code: str, success: bool,
+              skipped: bool, message: str, result: Dict[str, Any]):
+        if on_result is None:
+            return
+        try:
+            on_result({
+                'index': index,
+                'voucher_code': code,
+                'success': success,
+                'skipped': skipped,
+                'message': message,
+                'result': result
+            })
+        except Exception as e:
+            print(f"[批量绑券] ⚠️ 结果回调异常: {e}")
+
+    @staticmethod
+    def _is_token_expired(result: Dict[str, Any]) -> bool:
+        """沃美Token超时：sub=408，或错误信息包含TOKEN"""
+        if result.get('sub') == 408:
+            return True
+        return result.get('ret') != 0 and 'TOKEN' in str(result.get('msg', '')).upper()
+
+
+# 全局实例
+_voucher_bind_records = None
+
+
+def get_voucher_bind_records() -> VoucherBindRecordStore:
+    """获取绑券成功记录实例（单例模式）"""
+    global _voucher_bind_records
+
+    if _voucher_bind_records is None:
+        _voucher_bind_records = VoucherBindRecordStore()
+
+    return _voucher_bind_records
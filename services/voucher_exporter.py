@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+券数据流式导出 - CSV / JSONL，可选gzip压缩
+每页券到达后立即逐行写入文件并释放，内存占用与券总数无关；
+多个账号（影院）可依次导出到同一个文件，每行带账号和影院ID
+"""
+
+import csv
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from services.voucher_service import VoucherInfo, get_voucher_service
+
+# 导出列：账号、影院 + VoucherInfo.to_dict() 的字段
+EXPORT_FIELDS = ['account', 'cinema_id'] + list(VoucherInfo({}).to_dict().keys())
+
+
+class VoucherExporter:
+    """券数据流式导出器（上下文管理器）"""
+
+    FORMATS = ('csv', 'jsonl')
+
+    def __init__(self, filepath: str, export_format: str = 'csv', compress: bool = False):
+        """
+        Args:
+            filepath: 输出文件路径
+            export_format: 导出格式 (csv, jsonl)
+            compress: 是否gzip压缩
+        """
+        export_format = export_format.lower()
+        if export_format not in self.FORMATS:
+            raise ValueError(f"不支持的导出格式: {export_format}")
+
+        self.filepath = filepath
+        self.export_format = export_format
+        self.compress = compress
+        self.total_rows = 0
+        self._file = None
+        self._csv_writer = None
+
+    def __enter__(self) -> 'VoucherExporter':
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """打开输出文件（CSV写入表头）"""
+        file_dir = os.path.dirname(self.filepath)
+        if file_dir:
+            os.makedirs(file_dir, exist_ok=True)
+
+        # CSV带BOM便于Excel识别中文
+        encoding = 'utf-8-sig' if self.export_format == 'csv' else 'utf-8'
+        if self.compress:
+            self._file = gzip.open(self.filepath, 'wt', encoding=encoding, newline='')
+        else:
+            self._file = open(self.filepath, 'w', encoding=encoding, newline='')
+
+        if self.export_format == 'csv':
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+            self._csv_writer.writeheader()
+
+    def close(self):
+        """关闭输出文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._csv_writer = None
+
+    def write_vouchers(self, vouchers: List[VoucherInfo], account: str = '', cinema_id: str = '') -> int:
+        """
+        写入一批券并立即刷新到文件
+
+        Returns:
+            写入的行数
+        """
+        for voucher in vouchers:
+            row = voucher.to_dict()
+            row['account'] = account
+            row['cinema_id'] = cinema_id
+            if self._csv_writer is not None:
+                self._csv_writer.writerow(row)
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False))
+                self._file.write('\n')
+
+        self._file.flush()
+        self.total_rows += len(vouchers)
+        return len(vouchers)
+
+    def export_account(self, cinema_id: str, token: str, account: str = '') -> Dict[str, Any]:
+        """
+        分页获取一个账号在影院的所有券，逐页写入
+
+        Returns:
+            {'success': 是否获取成功, 'count': 写入行数, 'failed_pages': 获取失败的页码（非空时为部分导出）,
+             'page_info': 分页信息}
+        """
+        written = [0]
+
+        def on_page(page_index: int, page_vouchers: List[VoucherInfo], page_info: Dict[str, Any]):
+            written[0] += self.write_vouchers(page_vouchers, account, str(cinema_id))
+
+        _, page_info = get_voucher_service().get_all_vouchers(cinema_id, token, on_page=on_page, collect=False)
+        failed_pages = page_info.get('failed_pages', [])
+        if failed_pages:
+            print(f"[券导出] ⚠️ {account or cinema_id}: 第{'、'.join(map(str, failed_pages))}页获取失败，导出不完整")
+        return {'success': bool(page_info), 'count': written[0], 'failed_pages': failed_pages,
+                'page_info': page_info}
+
+
+def default_export_path(export_format: str, compress: bool = False, name: str = 'vouchers_export') -> str:
+    """默认导出路径 data/exports/<name>_<时间>.<格式>[.gz]"""
+    filename = f"{name}_{time.strftime('%Y%m%d_%H%M%S')}.{export_format.lower()}"
+    if compress:
+        filename += '.gz'
+    return os.path.join('data', 'exports', filename)
+
+
+def export_vouchers(accounts: List[Dict[str, str]], filepath: Optional[str] = None,
+                    export_format: str = 'csv', compress: bool = False) -> Dict[str, Any]:
+    """
+    导出多个账号的券到同一个文件
+
+    Args:
+        accounts: [{'account': 账号标识, 'cinema_id': 影院ID, 'token': 用户token}, ...]
+        filepath: 输出文件路径，为空时使用 default_export_path
+        export_format: 导出格式 (csv, jsonl)
+        compress: 是否gzip压缩
+
+    Returns:
+        {'success', 'partial': 是否有账号只导出了部分券, 'filepath', 'format', 'total_vouchers', 'file_size',
+         'accounts': 各账号导出结果, 'error'}
+    """
+    filepath = filepath or default_export_path(export_format, compress)
+    results = []
+
+    try:
+        with VoucherExporter(filepath, export_format, compress) as exporter:
+            for item in accounts:
+                account = item.get('account', '')
+                cinema_id = str(item.get('cinema_id', ''))
+                try:
+                    result = exporter.export_account(cinema_id, item.get('token', ''), account)
+                except Exception as e:
+                    result = {'success': False, 'count': 0, 'failed_pages': [], 'error': str(e)}
+                result.pop('page_info', None)
+                result.update({'account': account, 'cinema_id': cinema_id})
+                results.append(result)
+                print(f"[券导出] 📄 {account or cinema_id}: 导出{result['count']}张券")
+            total = exporter.total_rows
+    except ValueError as e:
+        return {'success': False, 'partial': False, 'filepath': filepath, 'format': export_format,
+                'total_vouchers': 0, 'file_size': 0, 'accounts': results, 'error': str(e)}
+
+    return {
+        'success': any(result['success'] for result in results),
+        'partial': any(not result['success'] or result['failed_pages'] for result in results),
+        'filepath': filepath,
+        'format': export_format.lower(),
+        'total_vouchers': total,
+        'file_size': os.path.getsize(filepath),
+        'accounts': results,
+        'error': '' if any(result['success'] for result in results) else '所有账号的券列表都获取失败'
+    }
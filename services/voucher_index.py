@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+券内存索引 - 券号/券名的n-gram倒排索引 + 状态/类型/影院/账号分桶 + 过期时间有序表
+搜索时先用索引求候选集再做子串校验，过滤时直接取分桶交集，不再逐张扫描；
+未使用的券按过期时间保存在有序表中，“最近过期”“N天内过期”只需二分查找，
+有效券按过期时间排列时直接顺序读取，不再整体排序；
+券库存刷新时按券号增量更新（新增、变化、移除），跨账号上万张券也能即时搜索
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from services.voucher_service import VoucherInfo, VoucherStatus
+from utils.voucher_utils import VoucherDataProcessor
+
+
+class _IndexedVoucher:
+    """索引中的一张券"""
+
+    __slots__ = ('doc_id', 'voucher', 'account', 'cinema_id', 'position', 'fields', 'status', 'voucher_type',
+                 'expiry_key')
+
+    def __init__(self, doc_id: int, voucher: VoucherInfo, account: str, cinema_id: str, position: int):
+        self.doc_id = doc_id
+        self.voucher = voucher
+        self.account = account
+        self.cinema_id = cinema_id
+        self.position = position
+        self.fields = VoucherIndex.searchable_fields(voucher)
+        self.status = voucher.status
+        self.voucher_type = VoucherDataProcessor.parse_voucher_type_from_code(voucher.voucher_code)
+        # 过期时间有序表的排序键：过期时间升序，同时过期的后绑定的在前（与 sort_vouchers_by_priority 一致）
+        self.expiry_key = (_to_int(voucher.expire_time), -_to_int(voucher.bind_time), doc_id)
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class VoucherIndex:
+    """券内存索引"""
+
+    # 可搜索字段（与 VoucherAPI.search_vouchers 原有的匹配范围一致）
+    SEARCH_FIELDS = ('voucher_code', 'voucher_name', 'voucher_code_mask')
+    # 建立1-gram和2-gram索引：单字查询直接取倒排表，多字查询取各2-gram交集
+    MAX_GRAM = 2
+    # 只有未使用的券进入过期时间有序表
+    EXPIRY_STATUS = VoucherStatus.UN_USE
+
+    def __init__(self):
+        self._docs: Dict[int, _IndexedVoucher] = {}
+        self._by_key: Dict[Tuple[str, str, str], int] = {}   # (账号, 影院, 券号) -> doc_id
+        self._grams: Dict[str, Set[int]] = {}
+        self._by_status: Dict[str, Set[int]] = {}
+        self._by_type: Dict[str, Set[int]] = {}
+        self._by_cinema: Dict[str, Set[int]] = {}
+        self._by_account: Dict[str, Set[int]] = {}
+        # 未使用券的过期时间有序表：全部 + 按 (账号, 影院)
+        self._expiry: List[Tuple[int, int, int]] = []
+        self._expiry_by_inventory: Dict[Tuple[str, str], List[Tuple[int, int, int]]] = {}
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    # ===== 更新 =====
+
+    def replace_inventory(self, account: str, cinema_id: str, vouchers: List[VoucherInfo]) -> Dict[str, int]:
+        """
+        用最新的券列表增量更新某账号在某影院的券
+
+        Returns:
+            {'added': 新增数量, 'updated': 变化数量, 'removed': 移除数量}
+        """
+        cinema_id = str(cinema_id)
+        stats = {'added': 0, 'updated': 0, 'removed': 0}
+
+        with self._lock:
+            seen = set()
+            for position, voucher in enumerate(vouchers):
+                key = (account, cinema_id, voucher.voucher_code)
+                seen.add(key)
+                doc_id = self._by_key.get(key)
+                if doc_id is None:
+                    self._add(account, cinema_id, voucher, position)
+                    stats['added'] += 1
+                    continue
+
+                doc = self._docs[doc_id]
+                doc.position = position
+                if doc.voucher.to_dict() != voucher.to_dict():
+                    self._remove(doc_id)
+                    self._add(account, cinema_id, voucher, position)
+                    stats['updated'] += 1
+                else:
+                    # 内容相同时替换为新对象，保持与券库存缓存一致
+                    doc.voucher = voucher
+
+            stale = [doc_id for doc_id in self._candidates(cinema_id=cinema_id, account=account)
+                     if (account, cinema_id, self._docs[doc_id].voucher.voucher_code) not in seen]
+            for doc_id in stale:
+                self._remove(doc_id)
+            stats['removed'] = len(stale)
+
+        return stats
+
+    def remove_inventory(self, account: Optional[str] = None, cinema_id: Optional[str] = None) -> int:
+        """移除某账号（和影院）的所有券，返回移除数量"""
+        with self._lock:
+            doc_ids = self._candidates(account=account, cinema_id=cinema_id)
+            for doc_id in list(doc_ids):
+                self._remove(doc_id)
+        return len(doc_ids)
+
+    def _add(self, account: str, cinema_id: str, voucher: VoucherInfo, position: int):
+        doc = _IndexedVoucher(self._next_id, voucher, account, cinema_id, position)
+        self._next_id += 1
+
+        self._docs[doc.doc_id] = doc
+        self._by_key[(account, cinema_id, voucher.voucher_code)] = doc.doc_id
+        for gram in self._doc_grams(doc.fields):
+            self._grams.setdefault(gram, set()).add(doc.doc_id)
+        self._by_status.setdefault(doc.status, set()).add(doc.doc_id)
+        self._by_type.setdefault(doc.voucher_type, set()).add(doc.doc_id)
+        self._by_cinema.setdefault(cinema_id, set()).add(doc.doc_id)
+        self._by_account.setdefault(account, set()).add(doc.doc_id)
+        if doc.status == self.EXPIRY_STATUS:
+            bisect.insort(self._expiry, doc.expiry_key)
+            bisect.insort(self._expiry_by_inventory.setdefault((account, cinema_id), []), doc.expiry_key)
+
+    def _remove(self, doc_id: int):
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+
+        self._by_key.pop((doc.account, doc.cinema_id, doc.voucher.voucher_code), None)
+        for gram in self._doc_grams(doc.fields):
+            self._discard(self._grams, gram, doc_id)
+        self._discard(self._by_status, doc.status, doc_id)
+        self._discard(self._by_type, doc.voucher_type, doc_id)
+        self._discard(self._by_cinema, doc.cinema_id, doc_id)
+        self._discard(self._by_account, doc.account, doc_id)
+        if doc.status == self.EXPIRY_STATUS:
+            self._discard_expiry(self._expiry, doc.expiry_key)
+            inventory_key = (doc.account, doc.cinema_id)
+            expiry = self._expiry_by_inventory.get(inventory_key)
+            if expiry is not None:
+                self._discard_expiry(expiry, doc.expiry_key)
+                if not expiry:
+                    del self._expiry_by_inventory[inventory_key]
+
+    @staticmethod
+    def _discard(buckets: Dict[str, Set[int]], key: str, doc_id: int):
+        bucket = buckets.get(key)
+        if bucket is not None:
+            bucket.discard(doc_id)
+            if not bucket:
+                del buckets[key]
+
+    @staticmethod
+    def _discard_expiry(expiry: List[Tuple[int, int, int]], key: Tuple[int, int, int]):
+        i = bisect.bisect_left(expiry, key)
+        if i < len(expiry) and expiry[i] == key:
+            del expiry[i]
+
+    # ===== 查询 =====
+
+    def search(self, text: str = '', status: Optional[str] = None, voucher_type: Optional[str] = None,
+               cinema_id: Optional[str] = None, account: Optional[str] = None, valid_only: bool = False,
+               fields: Optional[Iterable[str]] = None, limit: Optional[int] = None,
+               sort_by_expiry: bool = False) -> List[VoucherInfo]:
+        """
+        搜索/过滤券
+
+        Args:
+            text: 关键词（不区分大小写的子串匹配）
+            status: 券状态 (UN_USE, USED, DISABLED)
+            voucher_type: 券类型（VoucherDataProcessor.parse_voucher_type_from_code 的结果）
+            cinema_id: 影院ID
+            account: 账号标识（券库存缓存使用token）
+            valid_only: 只返回有效券
+            fields: 关键词匹配的字段，默认 SEARCH_FIELDS
+            limit: 最多返回的数量
+            sort_by_expiry: 按优先级排序（有效券按过期时间升序在前，其余按绑定时间降序在后）
+
+        Returns:
+            券列表（默认同一账号影院内保持券列表原有顺序）
+        """
+        text = (text or '').strip().lower()
+        field_positions = self._field_positions(fields)
+        now = int(time.time())
+
+        with self._lock:
+            doc_ids = self._candidates(status, voucher_type, cinema_id, account)
+            if text:
+                gram_ids = self._gram_candidates(text)
+                doc_ids = gram_ids if doc_ids is None else doc_ids & gram_ids
+
+            if valid_only and sort_by_expiry:
+                # 有效券直接按过期时间有序表顺序读取
+                docs = [doc for doc in self._valid_docs(account, cinema_id, now)
+                        if (doc_ids is None or doc.doc_id in doc_ids)
+                        and (not text or any(text in doc.fields[i] for i in field_positions))]
+                return [doc.voucher for doc in (docs[:limit] if limit else docs)]
+
+            if doc_ids is None:
+                doc_ids = set(self._docs)
+
+            docs = []
+            for doc_id in doc_ids:
+                doc = self._docs[doc_id]
+                # 倒排索引只保证包含所有2-gram，还需校验连续子串
+                if text and not any(text in doc.fields[i] for i in field_positions):
+                    continue
+                if valid_only and not doc.voucher.is_valid(now):
+                    continue
+                docs.append(doc)
+
+        if sort_by_expiry:
+            docs.sort(key=lambda doc: self._priority_key(doc, now))
+        else:
+            docs.sort(key=lambda doc: (doc.account, doc.cinema_id, doc.position))
+        if limit:
+            docs = docs[:limit]
+        return [doc.voucher for doc in docs]
+
+    def get(self, account: str, cinema_id: str, voucher_code: str) -> Optional[VoucherInfo]:
+        """按券号获取券"""
+        with self._lock:
+            doc_id = self._by_key.get((account, str(cinema_id), voucher_code))
+            return self._docs[doc_id].voucher if doc_id is not None else None
+
+    def next_to_expire(self, account: Optional[str] = None, cinema_id: Optional[str] = None,
+                       now: Optional[int] = None) -> Optional[VoucherInfo]:
+        """
+        最近将要过期的有效券
+
+        Args:
+            account: 账号标识，与 cinema_id 同时给出时只查该账号在该影院的券
+            cinema_id: 影院ID
+            now: 当前时间戳，默认 time.time()
+
+        Returns:
+            券，没有有效券时返回None
+        """
+        now = int(time.time()) if now is None else now
+        with self._lock:
+            for doc in self._valid_docs(account, cinema_id, now):
+                return doc.voucher
+        return None
+
+    def expiring_within(self, days: float, account: Optional[str] = None, cinema_id: Optional[str] = None,
+                        now: Optional[int] = None) -> List[VoucherInfo]:
+        """
+        N天内过期的有效券（按过期时间升序）
+
+        Args:
+            days: 天数
+            account: 账号标识
+            cinema_id: 影院ID
+            now: 当前时间戳，默认 time.time()
+        """
+        now = int(time.time()) if now is None else now
+        with self._lock:
+            return [doc.voucher for doc in self._valid_docs(account, cinema_id, now, now + int(days * 24 * 3600))]
+
+    def count(self) -> int:
+        """索引中的券数量"""
+        return len(self._docs)
+
+    def _candidates(self, status: Optional[str] = None, voucher_type: Optional[str] = None,
+                    cinema_id: Optional[str] = None, account: Optional[str] = None) -> Optional[Set[int]]:
+        """分桶交集，没有任何条件时返回None（表示全部）"""
+        buckets = []
+        for index, key in ((self._by_status, status), (self._by_type, voucher_type),
+                           (self._by_cinema, None if cinema_id is None else str(cinema_id)),
+                           (self._by_account, account)):
+            if key is not None:
+                buckets.append(index.get(key, set()))
+
+        if not buckets:
+            return None
+        buckets.sort(key=len)
+        result = set(buckets[0])
+        for bucket in buckets[1:]:
+            result &= bucket
+        return result
+
+    def _gram_candidates(self, text: str) -> Set[int]:
+        """关键词的候选券：各gram倒排表的交集"""
+        if len(text) <= self.MAX_GRAM:
+            return set(self._grams.get(text, set()))
+
+        postings = [self._grams.get(text[i:i + self.MAX_GRAM], set())
+                    for i in range(len(text) - self.MAX_GRAM + 1)]
+        postings.sort(key=len)
+        result = set(postings[0])
+        for posting in postings[1:]:
+            if not result:
+                break
+            result &= posting
+        return result
+
+    def _valid_docs(self, account: Optional[str], cinema_id: Optional[str], now: int,
+                    until: Optional[int] = None) -> Iterable[_IndexedVoucher]:
+        """按过期时间升序返回 now < 过期时间 <= until 的未使用券（二分定位起点，调用方持有锁）"""
+        if account is not None and cinema_id is not None:
+            expiry = self._expiry_by_inventory.get((account, str(cinema_id)), [])
+            account = cinema_id = None
+        else:
+            expiry = self._expiry
+
+        cinema_id = None if cinema_id is None else str(cinema_id)
+        for i in range(bisect.bisect_right(expiry, (now, float('inf'))), len(expiry)):
+            expire_time, _, doc_id = expiry[i]
+            if until is not None and expire_time > until:
+                break
+            doc = self._docs[doc_id]
+            if (account is None or doc.account == account) and (cinema_id is None or doc.cinema_id == cinema_id):
+                yield doc
+
+    @staticmethod
+    def _priority_key(doc: _IndexedVoucher, now: int) -> Tuple:
+        """有效券按过期时间升序在前，其余按绑定时间降序在后"""
+        expire_time, neg_bind_time, _ = doc.expiry_key
+        if doc.status == VoucherStatus.UN_USE and expire_time > now:
+            return (0, expire_time, neg_bind_time)
+        return (1, neg_bind_time, expire_time)
+
+    # ===== 工具方法 =====
+
+    @classmethod
+    def searchable_fields(cls, voucher: VoucherInfo) -> Tuple[str, ...]:
+        """券的可搜索字段（小写）"""
+        return tuple(str(getattr(voucher, field, '') or '').lower() for field in cls.SEARCH_FIELDS)
+
+    @classmethod
+    def _field_positions(cls, fields: Optional[Iterable[str]]) -> List[int]:
+        if not fields:
+            return list(range(len(cls.SEARCH_FIELDS)))
+        return [cls.SEARCH_FIELDS.index(field) for field in fields if field in cls.SEARCH_FIELDS]
+
+    @classmethod
+    def _doc_grams(cls, fields: Tuple[str, ...]) -> Set[str]:
+        grams = set()
+        for value in fields:
+            for size in range(1, cls.MAX_GRAM + 1):
+                for i in range(len(value) - size + 1):
+                    grams.add(value[i:i + size])
+        return grams
+
+
+# 全局实例
+_voucher_index = None
+
+
+def get_voucher_index() -> VoucherIndex:
+    """获取券内存索引实例（单例模式）"""
+    global _voucher_index
+
+    if _voucher_index is None:
+        _voucher_index = VoucherIndex()
+
+    return _voucher_index
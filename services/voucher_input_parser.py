@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量券码输入解析 - 绑券前的预处理
+支持“卡号：xxx;密码：xxx”、制表符/逗号分隔、从表格粘贴的多列文本以及只有券码的行；
+解析后去重、校验券码格式，并跳过已知已绑定的券（券库存索引 + 绑券成功记录），全程不发起网络请求
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.voucher_utils import VoucherDataProcessor
+
+# 卡号/密码格式（一行可以有多组），密码取到下一个分隔符为止（可以包含字母数字以外的字符）
+_CARD_PASSWORD_PATTERN = re.compile(
+    r'(?:卡号|券号|券码)\s*[：:]\s*([A-Za-z0-9]+)\s*[;；,，\s]*\s*密码\s*[：:]\s*([^;；,，\s]+)'
+)
+# 分隔符：制表符、逗号、分号、竖线或连续空白
+_FIELD_SPLIT_PATTERN = re.compile(r'[\t,，;；|]+|\s+')
+# 字段标签：“密码”“卡号：xxx”等（单独的标签，或标签后跟冒号）
+_FIELD_LABEL_PATTERN = re.compile(
+    r'^(?:(卡号|券号|券码|密码|code|password|pwd)[：:](.*)|(卡号|券号|券码|密码|code|password|pwd))$',
+    re.IGNORECASE
+)
+_PASSWORD_LABELS = ('密码', 'password', 'pwd')
+# 行中出现密码标签时，该行应当有密码
+_PASSWORD_LABEL_PATTERN = re.compile(r'密码|password|pwd', re.IGNORECASE)
+# 券码字段（字母开头的字母数字串）
+_CODE_FIELD_PATTERN = re.compile(r'^[A-Za-z]{2,6}\d{6,}$')
+# 密码字段（分隔后的整个字段）
+_PASSWORD_FIELD_PATTERN = re.compile(r'^\S{1,64}$')
+# 表头行（从表格粘贴时的第一行，不含数字）
+_HEADER_PATTERN = re.compile(r'^[^0-9]*(?:卡号|券号|券码|密码|code|password)[^0-9]*$', re.IGNORECASE)
+
+
+def parse_voucher_lines(input_text: str) -> Tuple[List[Tuple[str, str, int]], List[Tuple[int, str, str]]]:
+    """
+    解析输入文本
+
+    Args:
+        input_text: 用户输入的文本
+
+    Returns:
+        ([(券码, 密码, 行号), ...], [(行号, 无法解析的行, 原因), ...])，券码统一转为大写；
+        行中有密码标签但读不到密码时记为“缺少密码”，不会以空密码绑定
+    """
+    entries: List[Tuple[str, str, int]] = []
+    unparsed: List[Tuple[int, str, str]] = []
+
+    for line_no, line in enumerate(input_text.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        # 1. 卡号：xxx;密码：xxx
+        matches = _CARD_PASSWORD_PATTERN.findall(line)
+        if matches:
+            entries.extend((code.upper(), password, line_no) for code, password in matches)
+            continue
+
+        # 2. 分隔文本：第一个像券码的字段作为券码，其后第一个非标签字段作为密码
+        fields = [_split_label(field) for field in _FIELD_SPLIT_PATTERN.split(line) if field]
+        code_index = next((i for i, (_, value) in enumerate(fields) if _CODE_FIELD_PATTERN.match(value)), None)
+        if code_index is not None:
+            password, password_expected = _column_password(fields[code_index + 1:])
+            if not password and (password_expected or _PASSWORD_LABEL_PATTERN.search(line)):
+                unparsed.append((line_no, line, '缺少密码'))
+                continue
+            entries.append((fields[code_index][1].upper(), password, line_no))
+            continue
+
+        # 表头行（第一行）直接忽略
+        if not entries and not unparsed and _HEADER_PATTERN.match(line):
+            continue
+
+        unparsed.append((line_no, line, '无法解析'))
+
+    return entries, unparsed
+
+
+def _split_label(field: str) -> Tuple[str, str]:
+    """字段 -> (标签, 值)，没有标签时标签为空；单独的标签值为空"""
+    match = _FIELD_LABEL_PATTERN.match(field)
+    if match is None:
+        return '', field
+    if match.group(3):
+        return match.group(3).lower(), ''
+    return match.group(1).lower(), match.group(2)
+
+
+def _column_password(fields: List[Tuple[str, str]]) -> Tuple[str, bool]:
+    """券码之后的字段中取密码，返回 (密码, 是否应当有密码)"""
+    password_expected = False
+    for label, value in fields:
+        if label in _PASSWORD_LABELS:
+            password_expected = True
+        if not value:
+            # 跳过单独的标签
+            continue
+        if label and label not in _PASSWORD_LABELS:
+            # 下一个字段是其他标签（如另一个卡号），本券没有密码
+            break
+        if _PASSWORD_FIELD_PATTERN.match(value):
+            return value, True
+        return '', True
+    return '', password_expected
+
+
+def prepare_bind_batch(input_text: str, cinema_id: Optional[str] = None, token: Optional[str] = None,
+                       account: Optional[str] = None) -> Dict[str, Any]:
+    """
+    解析并预处理待绑定的券
+
+    Args:
+        input_text: 用户输入的文本
+        cinema_id: 影院ID（与token一起用于查询券库存索引）
+        token: 用户token
+        account: 账号标识（手机号，用于查询绑券成功记录）
+
+    Returns:
+        {
+            'vouchers': [(券码, 密码), ...] 需要绑定的券,
+            'duplicates': [券码, ...] 重复输入的券,
+            'invalid': [(行号, 内容, 原因), ...] 无法解析、缺少密码或格式错误,
+            'already_bound': [券码, ...] 已知已绑定的券,
+            'parsed_count': 解析出的券数量
+        }
+    """
+    entries, unparsed = parse_voucher_lines(input_text)
+    invalid = list(unparsed)
+
+    known_bound = _known_bound_codes(account)
+
+    vouchers: List[Tuple[str, str]] = []
+    duplicates: List[str] = []
+    already_bound: List[str] = []
+    seen = set()
+
+    for code, password, line_no in entries:
+        if code in seen:
+            duplicates.append(code)
+            continue
+        seen.add(code)
+
+        if not VoucherDataProcessor.validate_voucher_code_format(code):
+            invalid.append((line_no, code, '券码格式错误'))
+            continue
+
+        if code in known_bound or (token and cinema_id and _indexed(token, cinema_id, code)):
+            already_bound.append(code)
+            continue
+
+        vouchers.append((code, password))
+
+    invalid.sort()
+    return {
+        'vouchers': vouchers,
+        'duplicates': duplicates,
+        'invalid': invalid,
+        'already_bound': already_bound,
+        'parsed_count': len(entries)
+    }
+
+
+def _known_bound_codes(account: Optional[str]) -> set:
+    """绑券成功记录中的券码"""
+    if not account:
+        return set()
+    from services.voucher_bind_runner import get_voucher_bind_records
+    return get_voucher_bind_records().get_bound_codes(account)
+
+
+def _indexed(token: str, cinema_id: str, voucher_code: str) -> bool:
+    """券是否已在账号的券库存索引中（只查本地索引）"""
+    from services.voucher_index import get_voucher_index
+    return get_voucher_index().get(token, cinema_id, voucher_code) is not None
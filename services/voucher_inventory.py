@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+券库存缓存 - 按 (账号, 影院) 缓存完整券列表
+搜索、按状态过滤、统计、导出都读取本地缓存，不再每次重新下载所有分页；
+缓存在TTL到期后自动重新获取，绑券、券用于订单、支付成功后主动失效。
+每次获取后增量更新券内存索引，搜索、过滤和按过期时间查询直接查索引
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.voucher_index import get_voucher_index
+from services.voucher_service import PageCallback, VoucherInfo, get_voucher_service
+
+
+class _InventoryEntry:
+    """单个 (账号, 影院) 的券库存"""
+
+    def __init__(self, vouchers: List[VoucherInfo], page_info: Dict[str, Any]):
+        self.vouchers = vouchers
+        self.page_info = page_info
+        self.loaded_at = time.time()
+        self.statistics: Optional[Dict[str, Any]] = None
+
+
+class VoucherInventoryCache:
+    """券库存缓存"""
+
+    # 默认缓存有效期（秒）
+    DEFAULT_TTL = 120
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, str], _InventoryEntry] = {}
+        self._lock = threading.Lock()
+        # 每个键一把加载锁：同一账号影院的并发请求只下载一次
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_vouchers(self, cinema_id: str, token: str, force_refresh: bool = False,
+                     on_page: Optional[PageCallback] = None) -> Tuple[List[VoucherInfo], Dict[str, Any]]:
+        """
+        获取账号在影院的全部券（含已使用、已过期）
+
+        Args:
+            cinema_id: 影院ID
+            token: 用户token
+            force_refresh: 忽略缓存重新获取
+            on_page: 重新获取时的分页回调（命中缓存时不调用）
+
+        Returns:
+            (券列表, 分页信息)，券列表为缓存中的同一对象，调用方不要修改
+        """
+        entry = self._get_entry(cinema_id, token, force_refresh, on_page)
+        return entry.vouchers, entry.page_info
+
+    def search(self, cinema_id: str, token: str, text: str = '', status: Optional[str] = None,
+               valid_only: bool = False, fields: Optional[Tuple[str, ...]] = None,
+               sort_by_expiry: bool = False) -> List[VoucherInfo]:
+        """
+        通过券内存索引搜索/过滤账号在影院的券
+
+        Args:
+            cinema_id: 影院ID
+            token: 用户token
+            text: 关键词（券号、券名、券号掩码，不区分大小写）
+            status: 券状态过滤
+            valid_only: 只返回有效券
+            fields: 关键词匹配的字段，默认全部可搜索字段
+            sort_by_expiry: 有效券按过期时间升序排在前面，默认保持券列表原有顺序
+
+        Returns:
+            匹配的券列表
+        """
+        if not self._index_ready(cinema_id, token):
+            return []
+        return get_voucher_index().search(text, status=status, cinema_id=cinema_id, account=token,
+                                          valid_only=valid_only, fields=fields, sort_by_expiry=sort_by_expiry)
+
+    def next_to_expire(self, cinema_id: str, token: str) -> Optional[VoucherInfo]:
+        """账号在影院最近将要过期的有效券"""
+        if not self._index_ready(cinema_id, token):
+            return None
+        return get_voucher_index().next_to_expire(token, cinema_id)
+
+    def expiring_within(self, cinema_id: str, token: str, days: float = 7) -> List[VoucherInfo]:
+        """账号在影院N天内过期的有效券（按过期时间升序）"""
+        if not self._index_ready(cinema_id, token):
+            return []
+        return get_voucher_index().expiring_within(days, token, cinema_id)
+
+    def find_voucher(self, cinema_id: str, token: str, voucher_code: str) -> Optional[VoucherInfo]:
+        """按券号查找账号在影院的券"""
+        if not self._index_ready(cinema_id, token):
+            return None
+        return get_voucher_index().get(token, cinema_id, voucher_code)
+
+    def get_statistics(self, cinema_id: str, token: str) -> Dict[str, Any]:
+        """获取券统计信息（同一份缓存只计算一次）"""
+        entry = self._get_entry(cinema_id, token)
+        if entry.statistics is None:
+            entry.statistics = get_voucher_service().get_voucher_statistics(entry.vouchers)
+        return entry.statistics
+
+    def invalidate(self, token: Optional[str] = None, cinema_id: Optional[str] = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            token: 只失效该账号的缓存，为空时不限账号
+            cinema_id: 只失效该影院的缓存，为空时不限影院
+
+        Returns:
+            失效的缓存数量
+        """
+        with self._lock:
+            keys = [key for key in self._entries
+                    if (token is None or key[0] == token) and (cinema_id is None or key[1] == str(cinema_id))]
+            for key in keys:
+                del self._entries[key]
+
+        if keys:
+            print(f"[券库存] 🗑️ 已失效 {len(keys)} 个券库存缓存")
+        return len(keys)
+
+    def _get_entry(self, cinema_id: str, token: str, force_refresh: bool = False,
+                   on_page: Optional[PageCallback] = None) -> _InventoryEntry:
+        key = (token, str(cinema_id))
+
+        if not force_refresh:
+            entry = self._fresh_entry(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+
+        with self._load_lock(key):
+            # 等待期间其他线程可能已加载完成
+            if not force_refresh:
+                entry = self._fresh_entry(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry
+
+            self.misses += 1
+            vouchers, page_info = get_voucher_service().get_all_vouchers(cinema_id, token, on_page=on_page)
+            entry = _InventoryEntry(vouchers, page_info)
+
+            # 获取失败（没有分页信息）或有页获取失败时不缓存，下次重新请求
+            if page_info and not page_info.get('failed_pages'):
+                with self._lock:
+                    self._entries[key] = entry
+                stats = get_voucher_index().replace_inventory(token, cinema_id, vouchers)
+                if stats['added'] or stats['updated'] or stats['removed']:
+                    print(f"[券库存] 🔍 索引更新: 新增{stats['added']} 变化{stats['updated']} 移除{stats['removed']}")
+            return entry
+
+    def _index_ready(self, cinema_id: str, token: str) -> bool:
+        """
+        券内存索引中是否有该账号影院成功获取的券库存
+        获取失败的结果不进入缓存和索引，此时索引中可能是旧数据，不能使用；
+        在加载锁内判断：等进行中的刷新完成后再检查，刷新失败时继续使用上一次的库存
+        """
+        self._get_entry(cinema_id, token)
+        key = (token, str(cinema_id))
+        with self._load_lock(key):
+            with self._lock:
+                return key in self._entries
+
+    def _load_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        """每个键一把加载锁"""
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def _fresh_entry(self, key: Tuple[str, str]) -> Optional[_InventoryEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry.loaded_at > self.ttl:
+                del self._entries[key]
+                entry = None
+        return entry
+
+
+# 全局实例
+_voucher_inventory = None
+
+
+def get_voucher_inventory() -> VoucherInventoryCache:
+    """获取券库存缓存实例（单例模式）"""
+    global _voucher_inventory
+
+    if _voucher_inventory is None:
+        _voucher_inventory = VoucherInventoryCache()
+
+    return _voucher_inventory
+
+
+def invalidate_voucher_inventory(token: Optional[str] = None, cinema_id: Optional[str] = None) -> int:
+    """使券库存缓存失效的便捷函数（绑券、用券、支付成功后调用）"""
+    return get_voucher_inventory().invalidate(token, cinema_id)
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+最优券选择 - 并发询价后按支付价格排序
+对订单可用券并发调用券价格计算接口（共享限流器），询价结果存入订单券服务的询价缓存
+（按 影院、订单号、券号、券类型 缓存，订单变更时失效），按 pay_price、surcharge_price
+从低到高排序，一键使用最便宜的券；候选券超过上限时优先询价快过期的券，
+价格相同时选择先过期的券（过期时间来自券库存索引）
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.voucher_index import get_voucher_index
+from utils.rate_limiter import RateLimiter
+
+
+class VoucherPriceOptimizer:
+    """最优券选择器"""
+
+    # 并发询价数与请求间隔
+    MAX_WORKERS = 4
+    REQUEST_INTERVAL = 0.1
+    # 最多询价的候选券数量
+    MAX_CANDIDATES = 30
+
+    def __init__(self):
+        self._limiter = RateLimiter(self.REQUEST_INTERVAL)
+
+    def find_best_voucher(self, cinema_id: str, token: str, order_id: str,
+                          voucher_codes: Optional[List[str]] = None,
+                          voucher_type: str = 'VGC_T') -> Dict[str, Any]:
+        """
+        为订单找出支付价格最低的券
+
+        Args:
+            cinema_id: 影院ID
+            token: 用户token
+            order_id: 订单ID
+            voucher_codes: 候选券号，为空时查询订单可用券
+            voucher_type: 券类型，默认VGC_T
+
+        Returns:
+            {'success', 'best': 最优报价, 'ranked': 按价格排序的报价, 'failed': 询价失败的券, 'error'}
+            报价格式: {'voucher_code', 'pay_price', 'surcharge_price', 'surcharge_msg', 'expire_time', 'cached'}
+        """
+        expire_times: Dict[str, int] = {}
+        if voucher_codes is None:
+            voucher_codes, expire_times, error = self._fetch_candidate_codes(cinema_id, token)
+            if error:
+                return {'success': False, 'best': None, 'ranked': [], 'failed': [], 'error': error}
+
+        # 去重，按过期时间先后取前 MAX_CANDIDATES 张（过期时间未知的排在最后，保持原有顺序）
+        voucher_codes = [code for code in dict.fromkeys(voucher_codes) if code]
+        expire_times = self._expire_times(cinema_id, token, voucher_codes, expire_times)
+        voucher_codes.sort(key=lambda code: (code not in expire_times, expire_times.get(code, 0)))
+        voucher_codes = voucher_codes[:self.MAX_CANDIDATES]
+        if not voucher_codes:
+            return {'success': False, 'best': None, 'ranked': [], 'failed': [], 'error': '没有可用券'}
+
+        quotes = self.quote_vouchers(cinema_id, token, order_id, voucher_codes, voucher_type)
+
+        ranked, failed = [], []
+        for code in voucher_codes:
+            quote = quotes[code]
+            quote['expire_time'] = expire_times.get(code)
+            if quote.get('error'):
+                failed.append(quote)
+            else:
+                ranked.append(quote)
+        # 价格相同时先用快过期的券（sort 稳定，过期时间未知的保持候选顺序）
+        ranked.sort(key=lambda quote: (quote['pay_price'], quote['surcharge_price']))
+
+        if not ranked:
+            return {'success': False, 'best': None, 'ranked': [], 'failed': failed,
+                    'error': failed[0]['error'] if failed else '询价失败'}
+
+        best = ranked[0]
+        print(f"[最优券] 🏆 询价{len(voucher_codes)}张，最优券 {best['voucher_code']}: "
+              f"支付{best['pay_price']} 附加{best['surcharge_price']}")
+        return {'success': True, 'best': best, 'ranked': ranked, 'failed': failed, 'error': ''}
+
+    def apply_best_voucher(self, cinema_id: str, token: str, order_id: str,
+                           voucher_codes: Optional[List[str]] = None,
+                           voucher_type: str = 'VGC_T') -> Dict[str, Any]:
+        """
+        找出最优券并绑定到订单
+
+        Returns:
+            find_best_voucher 的结果，另含 'bind_result'（券绑定结果）
+        """
+        result = self.find_best_voucher(cinema_id, token, order_id, voucher_codes, voucher_type)
+        if not result['success']:
+            return result
+
+        from services.womei_order_voucher_service import get_womei_order_voucher_service
+        bind_result = get_womei_order_voucher_service().bind_voucher_to_order(
+            cinema_id, token, order_id, result['best']['voucher_code'], voucher_type
+        )
+        result['bind_result'] = bind_result
+        if not bind_result.get('success', False):
+            result['success'] = False
+            result['error'] = bind_result.get('user_friendly_msg') or bind_result.get('msg', '券绑定失败')
+        return result
+
+    def quote_vouchers(self, cinema_id: str, token: str, order_id: str, voucher_codes: List[str],
+                       voucher_type: str = 'VGC_T') -> Dict[str, Dict[str, Any]]:
+        """
+        并发询价（命中缓存的券不再请求）
+
+        Returns:
+            券号 -> 报价
+        """
+        from services.womei_order_voucher_service import get_womei_order_voucher_service
+        service = get_womei_order_voucher_service()
+
+        quotes: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for code in voucher_codes:
+            price_result = service.peek_voucher_price_quote(cinema_id, order_id, code, voucher_type)
+            if price_result is not None:
+                quotes[code] = self._to_quote(code, price_result)
+            else:
+                missing.append(code)
+
+        if missing:
+            workers = min(self.MAX_WORKERS, len(missing))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='voucher-quote') as executor:
+                futures = {
+                    executor.submit(self._request_quote, cinema_id, token, order_id, code, voucher_type): code
+                    for code in missing
+                }
+                for future in as_completed(futures):
+                    code = futures[future]
+                    try:
+                        quotes[code] = future.result()
+                    except Exception as e:
+                        quotes[code] = {'voucher_code': code, 'error': f'询价异常: {str(e)}', 'cached': False}
+
+        return quotes
+
+    def _request_quote(self, cinema_id: str, token: str, order_id: str, voucher_code: str,
+                       voucher_type: str) -> Dict[str, Any]:
+        from services.womei_order_voucher_service import get_womei_order_voucher_service
+
+        self._limiter.wait()
+        price_result = get_womei_order_voucher_service().get_voucher_price_quote(
+            cinema_id, token, order_id, voucher_code, voucher_type
+        )
+        return self._to_quote(voucher_code, price_result)
+
+    @staticmethod
+    def _to_quote(voucher_code: str, price_result: Dict[str, Any]) -> Dict[str, Any]:
+        """价格计算结果 -> 报价"""
+        if not price_result.get('success', False) or price_result.get('ret') != 0:
+            return {'voucher_code': voucher_code, 'error': price_result.get('msg', '价格计算失败'), 'cached': False}
+
+        price_info = price_result.get('price_info', {})
+        return {
+            'voucher_code': voucher_code,
+            'pay_price': float(price_info.get('pay_price', 0) or 0),
+            'surcharge_price': float(price_info.get('surcharge_price', 0) or 0),
+            'surcharge_msg': price_info.get('surcharge_msg', ''),
+            'cached': price_result.get('cached', False)
+        }
+
+    @staticmethod
+    def _expire_times(cinema_id: str, token: str, voucher_codes: List[str],
+                      known: Dict[str, int]) -> Dict[str, int]:
+        """券号 -> 过期时间：优先使用券库存索引，其次使用接口返回的值"""
+        index = get_voucher_index()
+        expire_times = {}
+        for code in voucher_codes:
+            voucher = index.get(token, cinema_id, code)
+            expire_time = voucher.expire_time if voucher is not None else known.get(code)
+            if expire_time:
+                expire_times[code] = int(expire_time)
+        return expire_times
+
+    @staticmethod
+    def _fetch_candidate_codes(cinema_id: str, token: str) -> Tuple[List[str], Dict[str, int], str]:
+        """查询订单可用券，返回 (券号列表, 接口返回的过期时间, 错误信息)"""
+        from services.womei_voucher_service import get_womei_voucher_service
+
+        result = get_womei_voucher_service().get_order_available_vouchers(cinema_id, token)
+        if result.get('ret') != 0:
+            return [], {}, result.get('msg', '获取订单可用券失败')
+
+        vouchers = result.get('data', {}).get('vouchers', [])
+        expire_times = {}
+        for voucher in vouchers:
+            try:
+                expire_times[voucher.get('voucher_code', '')] = int(voucher.get('expire_time') or 0)
+            except (TypeError, ValueError):
+                continue
+        return [voucher.get('voucher_code', '') for voucher in vouchers], expire_times, ''
+
+
+# 全局实例
+_voucher_optimizer = None
+
+
+def get_voucher_optimizer() -> VoucherPriceOptimizer:
+    """获取最优券选择器实例（单例模式）"""
+    global _voucher_optimizer
+
+    if _voucher_optimizer is None:
+        _voucher_optimizer = VoucherPriceOptimizer()
+
+    return _voucher_optimizer
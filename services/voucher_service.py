@@ -7,7 +7,8 @@
 
 import requests
 import time
-from typing import Dict, List, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 import json
 import logging
@@ -16,6 +17,8 @@ import logging
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+from utils.rate_limiter import RateLimiter
+
 logger = logging.getLogger(__name__)
 
 class VoucherStatus:
@@ -52,14 +55,14 @@ class VoucherInfo:
         self.scope_desc = data.get('scope_desc', '')
         self.douyin_code_resault = data.get('douyin_code_resault', [])
     
-    def is_valid(self) -> bool:
-        """判断券是否有效（未使用且未过期）"""
+    def is_valid(self, now: Optional[int] = None) -> bool:
+        """判断券是否有效（未使用且未过期），批量判断时传入同一个 now 避免逐张取时间"""
         return (self.status == VoucherStatus.UN_USE and 
-                self.expire_time > int(time.time()))
+                self.expire_time > (int(time.time()) if now is None else now))
     
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[int] = None) -> bool:
         """判断券是否已过期"""
-        return self.expire_time <= int(time.time())
+        return self.expire_time <= (int(time.time()) if now is None else now)
     
     def get_expire_date(self) -> str:
         """获取格式化的过期日期"""
@@ -101,8 +104,15 @@ class VoucherInfo:
             'bind_date_formatted': self.get_bind_date()
         }
 
+# 分页回调：(页码, 该页券列表, 分页信息)
+PageCallback = Callable[[int, List['VoucherInfo'], Dict[str, Any]], None]
+
 class VoucherService:
     """沃美券管理服务"""
+
+    # 🆕 并发分页：最大并发请求数、相邻请求最小间隔（秒）
+    PAGE_WORKERS = 4
+    PAGE_REQUEST_INTERVAL = 0.1
     
     def __init__(self):
         self.base_url = "https://ct.womovie.cn/ticket/wmyc"
@@ -185,128 +195,192 @@ class VoucherService:
             }
     
     def get_all_vouchers(self, cinema_id: str, token: str, voucher_type: str = "VGC_T", 
-                        only_valid: bool = False) -> Tuple[List[VoucherInfo], Dict[str, Any]]:
+                        only_valid: bool = False,
+                        on_page: Optional[PageCallback] = None,
+                        collect: bool = True) -> Tuple[List[VoucherInfo], Dict[str, Any]]:
         """
         获取所有券列表（自动分页）
-        
+        🔧 第1页返回 total_page 后，其余页在速率限制下并发获取，按页码顺序合并
+
         Args:
             cinema_id: 影院ID
             token: 用户token
             voucher_type: 券类型
             only_valid: 是否只返回有效券
-            
+            on_page: 分页回调，按页码顺序逐页调用（用于边加载边显示）
+            collect: 是否合并返回所有券；为False时每页推送后即释放（流式导出），返回空列表
+
         Returns:
-            (券列表, 分页信息)
+            (券列表, 分页信息)，分页信息的 failed_pages 为获取失败的页码列表（非空时券列表不完整）；
+            第1页获取失败时返回 ([], {})
         """
+        parsed = self._fetch_and_parse_page(cinema_id, token, voucher_type, 1, only_valid)
+        if parsed is None:
+            return [], {}
+
+        first_vouchers, page_info = parsed
+        pages: Dict[int, List[VoucherInfo]] = {1: first_vouchers}
+        failed_pages: List[int] = []
+        if on_page:
+            on_page(1, first_vouchers, page_info)
+        if not collect:
+            pages[1] = []
+
+        try:
+            total_pages = int(page_info.get('total_page', 1) or 1)
+        except (TypeError, ValueError):
+            total_pages = 1
+
+        if total_pages > 1:
+            limiter = RateLimiter(self.PAGE_REQUEST_INTERVAL)
+            next_page_to_emit = 2
+
+            def fetch(page_index: int):
+                limiter.wait()
+                return self._fetch_and_parse_page(cinema_id, token, voucher_type, page_index, only_valid)
+
+            with ThreadPoolExecutor(max_workers=min(self.PAGE_WORKERS, total_pages - 1)) as executor:
+                futures = {executor.submit(fetch, page_index): page_index
+                           for page_index in range(2, total_pages + 1)}
+
+                for future in as_completed(futures):
+                    page_index = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"获取第{page_index}页券列表异常: {e}")
+                        result = None
+
+                    # 失败的页记录页码，按空页合并，不影响其他页
+                    if result is None:
+                        failed_pages.append(page_index)
+                    pages[page_index] = result[0] if result else []
+
+                    # 按页码顺序推送已连续完成的页
+                    while next_page_to_emit in pages:
+                        if on_page and pages[next_page_to_emit]:
+                            on_page(next_page_to_emit, pages[next_page_to_emit], page_info)
+                        if not collect:
+                            pages[next_page_to_emit] = []
+                        next_page_to_emit += 1
+
         all_vouchers = []
+        for page_index in sorted(pages):
+            all_vouchers.extend(pages[page_index])
+
+        page_info = dict(page_info, failed_pages=sorted(failed_pages))
+        if failed_pages:
+            logger.warning(f"券列表不完整 - 获取失败的页: {page_info['failed_pages']}")
+        logger.info(f"获取券列表完成 - 总数: {len(all_vouchers)}, 总页数: {page_info.get('total_page', 0)}")
+        return all_vouchers, page_info
+
+    def _fetch_and_parse_page(self, cinema_id: str, token: str, voucher_type: str, page_index: int,
+                              only_valid: bool) -> Optional[Tuple[List[VoucherInfo], Dict[str, Any]]]:
+        """获取并解析一页券列表，失败时返回None"""
+        result = self.get_vouchers_page(cinema_id, token, voucher_type, page_index)
+        parsed = self._parse_vouchers_page(result, page_index)
+        if parsed is None:
+            return None
+
+        vouchers_data, page_info = parsed
+        return self._to_voucher_infos(vouchers_data, page_index, only_valid), page_info
+
+    def _parse_vouchers_page(self, result: Any, current_page: int) -> Optional[Tuple[List[Any], Dict[str, Any]]]:
+        """解析券列表接口响应，返回 (券数据列表, 分页信息)，失败时返回None"""
+        # 安全地检查API响应
+        if not isinstance(result, dict):
+            logger.error(f"获取第{current_page}页券列表失败: API响应不是字典格式")
+            return None
+
+        if result.get('ret') != 0:
+            logger.error(f"获取第{current_page}页券列表失败: {result.get('msg')}")
+            return None
+
+        data = result.get('data', {})
+
+        # 🔧 强健的数据格式处理 - 支持所有可能的格式
         page_info = {}
-        current_page = 1
-        
-        while True:
-            result = self.get_vouchers_page(cinema_id, token, voucher_type, current_page)
+        vouchers_data = []
 
-            # 安全地检查API响应
-            if not isinstance(result, dict):
-                logger.error(f"获取第{current_page}页券列表失败: API响应不是字典格式")
-                break
+        try:
+            if isinstance(data, dict):
+                # 格式1：标准字典格式 {page: {...}, result: [...]}
+                if 'page' in data and 'result' in data:
+                    page_info = data.get('page', {})
+                    vouchers_data = data.get('result', [])
+                    logger.debug(f"第{current_page}页使用标准字典格式，券数量: {len(vouchers_data)}")
 
-            if result.get('ret') != 0:
-                logger.error(f"获取第{current_page}页券列表失败: {result.get('msg')}")
-                break
+                # 格式2：直接包含券数据的字典
+                elif any(key in data for key in ['voucher_code', 'voucher_name', 'vouchers']):
+                    if 'vouchers' in data:
+                        vouchers_data = data.get('vouchers', [])
+                    else:
+                        vouchers_data = [data]  # 单个券对象
+                    page_info = {'total_page': 1, 'page_num': current_page, 'data_total': len(vouchers_data)}
+                    logger.info(f"第{current_page}页使用券字典格式，券数量: {len(vouchers_data)}")
 
-            data = result.get('data', {})
+                # 格式3：其他字典格式，尝试找到券数据
+                else:
+                    # 尝试找到可能的券数据字段
+                    possible_keys = ['data', 'items', 'list', 'vouchers', 'result']
+                    for key in possible_keys:
+                        if key in data and isinstance(data[key], list):
+                            vouchers_data = data[key]
+                            break
+                    page_info = {'total_page': 1, 'page_num': current_page, 'data_total': len(vouchers_data)}
+                    logger.info(f"第{current_page}页使用其他字典格式，券数量: {len(vouchers_data)}")
 
-            # 🔧 强健的数据格式处理 - 支持所有可能的格式
-            page_info = {}
+            elif isinstance(data, list):
+                # 格式4：data直接是券列表
+                vouchers_data = data
+                page_info = {'total_page': 1, 'page_num': current_page, 'data_total': len(data)}
+                logger.info(f"第{current_page}页使用列表格式，券数量: {len(vouchers_data)}")
+
+            else:
+                # 格式5：未知格式
+                logger.error(f"第{current_page}页data字段格式未知: {type(data)}")
+                if data is None:
+                    logger.warning(f"第{current_page}页data字段为None，跳过此页")
+                    return None
+                else:
+                    logger.warning(f"第{current_page}页data内容: {str(data)[:100]}...")
+                    vouchers_data = []
+                    page_info = {}
+
+        except Exception as parse_error:
+            logger.error(f"第{current_page}页数据解析异常: {parse_error}")
             vouchers_data = []
+            page_info = {}
 
+        # 安全地检查券数据
+        if not isinstance(vouchers_data, list):
+            logger.error(f"获取第{current_page}页券列表失败: 券数据不是列表格式，类型: {type(vouchers_data)}")
+            return None
+
+        return vouchers_data, page_info
+
+    def _to_voucher_infos(self, vouchers_data: List[Any], current_page: int, only_valid: bool) -> List[VoucherInfo]:
+        """转换为VoucherInfo对象"""
+        vouchers = []
+        for i, voucher_data in enumerate(vouchers_data):
             try:
-                if isinstance(data, dict):
-                    # 格式1：标准字典格式 {page: {...}, result: [...]}
-                    if 'page' in data and 'result' in data:
-                        page_info = data.get('page', {})
-                        vouchers_data = data.get('result', [])
-                        logger.debug(f"第{current_page}页使用标准字典格式，券数量: {len(vouchers_data)}")
-
-                    # 格式2：直接包含券数据的字典
-                    elif any(key in data for key in ['voucher_code', 'voucher_name', 'vouchers']):
-                        if 'vouchers' in data:
-                            vouchers_data = data.get('vouchers', [])
-                        else:
-                            vouchers_data = [data]  # 单个券对象
-                        page_info = {'total_page': 1, 'page_num': current_page, 'data_total': len(vouchers_data)}
-                        logger.info(f"第{current_page}页使用券字典格式，券数量: {len(vouchers_data)}")
-
-                    # 格式3：其他字典格式，尝试找到券数据
-                    else:
-                        # 尝试找到可能的券数据字段
-                        possible_keys = ['data', 'items', 'list', 'vouchers', 'result']
-                        for key in possible_keys:
-                            if key in data and isinstance(data[key], list):
-                                vouchers_data = data[key]
-                                break
-                        page_info = {'total_page': 1, 'page_num': current_page, 'data_total': len(vouchers_data)}
-                        logger.info(f"第{current_page}页使用其他字典格式，券数量: {len(vouchers_data)}")
-
-                elif isinstance(data, list):
-                    # 格式4：data直接是券列表
-                    vouchers_data = data
-                    page_info = {'total_page': 1, 'page_num': current_page, 'data_total': len(data)}
-                    logger.info(f"第{current_page}页使用列表格式，券数量: {len(vouchers_data)}")
+                # 确保券数据是字典格式
+                if not isinstance(voucher_data, dict):
+                    logger.warning(f"第{current_page}页第{i+1}个券数据不是字典格式，跳过")
+                    continue
 
-                else:
-                    # 格式5：未知格式
-                    logger.error(f"第{current_page}页data字段格式未知: {type(data)}")
-                    if data is None:
-                        logger.warning(f"第{current_page}页data字段为None，跳过此页")
-                        break
-                    else:
-                        logger.warning(f"第{current_page}页data内容: {str(data)[:100]}...")
-                        vouchers_data = []
-                        page_info = {}
-
-            except Exception as parse_error:
-                logger.error(f"第{current_page}页数据解析异常: {parse_error}")
-                vouchers_data = []
-                page_info = {}
-
-            # 安全地检查券数据
-            if not isinstance(vouchers_data, list):
-                logger.error(f"获取第{current_page}页券列表失败: 券数据不是列表格式，类型: {type(vouchers_data)}")
-                break
-
-            # 转换为VoucherInfo对象
-            for i, voucher_data in enumerate(vouchers_data):
-                try:
-                    # 确保券数据是字典格式
-                    if not isinstance(voucher_data, dict):
-                        logger.warning(f"第{current_page}页第{i+1}个券数据不是字典格式，跳过")
-                        continue
-
-                    voucher = VoucherInfo(voucher_data)
-
-                    # 根据only_valid参数过滤
-                    if only_valid and not voucher.is_valid():
-                        continue
-
-                    all_vouchers.append(voucher)
-
-                except Exception as e:
-                    logger.error(f"处理第{current_page}页第{i+1}个券数据失败: {e}")
+                voucher = VoucherInfo(voucher_data)
+
+                # 根据only_valid参数过滤
+                if only_valid and not voucher.is_valid():
                     continue
-            
-            # 检查是否还有下一页
-            total_pages = page_info.get('total_page', 1)
-            if current_page >= total_pages:
-                break
-                
-            current_page += 1
-            
-            # ⚡ 性能优化：减少延迟50%，提升响应速度
-            time.sleep(0.25)
-        
-        logger.info(f"获取券列表完成 - 总数: {len(all_vouchers)}, 总页数: {page_info.get('total_page', 0)}")
-        return all_vouchers, page_info
+
+                vouchers.append(voucher)
+
+            except Exception as e:
+                logger.error(f"处理第{current_page}页第{i+1}个券数据失败: {e}")
+                continue
+        return vouchers
     
     def filter_vouchers(self, vouchers: List[VoucherInfo], 
                        status_filter: Optional[str] = None,
@@ -351,10 +425,11 @@ class VoucherService:
             统计信息字典
         """
         total = len(vouchers)
-        valid_count = len([v for v in vouchers if v.is_valid()])
+        now = int(time.time())
+        valid_count = len([v for v in vouchers if v.is_valid(now)])
         used_count = len([v for v in vouchers if v.status == VoucherStatus.USED])
         disabled_count = len([v for v in vouchers if v.status == VoucherStatus.DISABLED])
-        expired_count = len([v for v in vouchers if v.is_expired()])
+        expired_count = len([v for v in vouchers if v.is_expired(now)])
         
         # 按券名称分组统计
         name_stats = {}
@@ -364,7 +439,7 @@ class VoucherService:
                 name_stats[name] = {'total': 0, 'valid': 0, 'used': 0, 'disabled': 0}
             
             name_stats[name]['total'] += 1
-            if voucher.is_valid():
+            if voucher.is_valid(now):
                 name_stats[name]['valid'] += 1
             elif voucher.status == VoucherStatus.USED:
                 name_stats[name]['used'] += 1
@@ -448,22 +448,13 @@ class WomeiFilmService:
             }
 
     def _save_seat_debug_data(self, cinema_id: str, hall_id: str, schedule_id: str, api_response: dict, hall_data: dict):
-        """保存座位图调试数据到JSON文件"""
-        try:
-            import os
-            import json
-            from datetime import datetime
-
-            # 确保data目录存在
-            os.makedirs('data', exist_ok=True)
+        """采集座位图调试数据（按采样比例在后台线程压缩写入，不阻塞座位加载）"""
+        from datetime import datetime
+        from utils.debug_capture import get_debug_capture
 
-            # 构建调试数据
-            debug_data = {
+        def build_debug_data():
+            return {
                 "session_info": {
-                    "cinema_name": "沃美影院",  # 默认名称，后续可以从其他地方获取
-                    "movie_name": "未知影片",   # 默认名称，后续可以从其他地方获取
-                    "show_date": "未知日期",   # 默认值，后续可以从其他地方获取
-                    "show_time": "未知时间",   # 默认值，后续可以从其他地方获取
                     "cinema_id": cinema_id,
                     "hall_id": hall_id,
                     "hall_name": hall_data.get('hall_name', f'{hall_id}号厅'),
@@ -473,26 +464,15 @@ class WomeiFilmService:
                 "api_response": api_response,
                 "processed_hall_data": hall_data,
                 "debug_notes": {
-                    "purpose": "座位图API调试数据（每次覆盖保存）",
+                    "purpose": "座位图API调试数据",
                     "area_no_usage": "区域ID应该使用area_no字段，不是固定的1",
                     "seat_no_format": "seat_no应该是类似11051771#09#06的格式",
                     "coordinate_mapping": "row/col是逻辑位置，x/y是物理位置",
-                    "status_meaning": "0=可选，1=已售，2=锁定",
-                    "file_location": "data/座位调试数据.json（固定文件名）"
+                    "status_meaning": "0=可选，1=已售，2=锁定"
                 }
             }
 
-            # 🔧 修改：固定文件名，每次覆盖
-            filename = "data/座位调试数据.json"
-
-            # 保存到文件
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(debug_data, f, ensure_ascii=False, indent=2)
-
-        except Exception as e:
-            print(f"[沃美电影服务] ❌ 保存座位调试数据失败: {e}")
-            import traceback
-            traceback.print_exc()
+        get_debug_capture().capture('seat_api', build_debug_data)
     
     def get_hall_saleable(self, cinema_id: str, schedule_id: str) -> Dict[str, Any]:
         """获取可售座位信息"""
@@ -604,37 +584,7 @@ class WomeiFilmService:
         """创建订单"""
         try:
             response = self.api.create_order(cinema_id, seatlable, schedule_id)
-
-
-            # 🔧 修复：检查API调用是否成功
-            if response.get('ret') != 0:
-                return {
-                    "success": False,
-                    "error": response.get('msg', '创建订单失败'),
-                    "order_info": response
-                }
-
-            # 🔧 修复：即使ret=0，也要检查业务逻辑是否成功
-            msg = response.get('msg', '')
-            order_data = response.get('data', {})
-
-            # 检查是否有业务错误（如锁座失败）
-            if '失败' in msg or '错误' in msg or not order_data:
-                print(f"[沃美电影服务] 业务逻辑失败: {msg}")
-                return {
-                    "success": False,
-                    "error": msg or '订单创建失败',
-                    "order_info": response
-                }
-
-            # 真正成功的情况
-            print(f"[沃美电影服务] 订单创建成功: {order_data}")
-            return {
-                "success": True,
-                "order_id": order_data.get('order_id'),
-                "server_time": order_data.get('server_time'),
-                "order_info": order_data
-            }
+            return self.parse_create_order_response(response)
 
         except Exception as e:
             print(f"[沃美电影服务] 创建订单异常: {e}")
@@ -644,6 +594,39 @@ class WomeiFilmService:
                 "order_info": {}
             }
 
+    @staticmethod
+    def parse_create_order_response(response: Dict[str, Any]) -> Dict[str, Any]:
+        """解析创建订单接口的原始响应"""
+        # 🔧 修复：检查API调用是否成功
+        if response.get('ret') != 0:
+            return {
+                "success": False,
+                "error": response.get('msg', '创建订单失败'),
+                "order_info": response
+            }
+
+        # 🔧 修复：即使ret=0，也要检查业务逻辑是否成功
+        msg = response.get('msg', '')
+        order_data = response.get('data', {})
+
+        # 检查是否有业务错误（如锁座失败）
+        if '失败' in msg or '错误' in msg or not order_data:
+            print(f"[沃美电影服务] 业务逻辑失败: {msg}")
+            return {
+                "success": False,
+                "error": msg or '订单创建失败',
+                "order_info": response
+            }
+
+        # 真正成功的情况
+        print(f"[沃美电影服务] 订单创建成功: {order_data}")
+        return {
+            "success": True,
+            "order_id": order_data.get('order_id'),
+            "server_time": order_data.get('server_time'),
+            "order_info": order_data
+        }
+
 # 全局实例
 _womei_film_service = None
 
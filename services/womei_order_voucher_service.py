@@ -7,17 +7,27 @@
 
 import requests
 import json
+import threading
+import time
 import urllib3
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
+from performance.tracer import traced
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class WomeiOrderVoucherService:
     """沃美订单券绑定服务"""
+
+    # 🆕 券价格询价结果有效期（秒），订单变更后失效（绑定券码除外）
+    QUOTE_TTL = 30
     
     def __init__(self):
         self.base_url = "https://ct.womovie.cn"
+
+        # 🆕 询价缓存：(影院ID, 订单ID, 券码, 券类型) -> (询价时间, 价格计算结果)
+        self._quote_cache: Dict[Tuple[str, str, str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._quote_lock = threading.Lock()
         
         # 标准请求头模板
         self.headers_template = {
@@ -70,6 +80,7 @@ class WomeiOrderVoucherService:
 
 
 
+    @traced('voucher_price', kind='network', key_arg='order_id')
     def calculate_voucher_price(self, cinema_id: str, token: str, order_id: str,
                               voucher_code: str, voucher_type: str = 'VGC_T') -> Dict[str, Any]:
         """
@@ -161,6 +172,47 @@ class WomeiOrderVoucherService:
                 'error': 'exception'
             }
 
+    def get_voucher_price_quote(self, cinema_id: str, token: str, order_id: str,
+                                voucher_code: str, voucher_type: str = 'VGC_T') -> Dict[str, Any]:
+        """
+        🆕 获取券价格（优先使用未过期的询价结果）
+
+        参数与返回值同 calculate_voucher_price，命中缓存时结果中 cached 为 True；
+        只缓存计算成功的结果；绑定其他券不会使结果失效，其他订单变更（如支付方式初始化）后失效
+        """
+        cached = self.peek_voucher_price_quote(cinema_id, order_id, voucher_code, voucher_type)
+        if cached is not None:
+            print(f"[沃美券价格] ♻️ 复用询价结果: 订单{order_id} 券{voucher_code}")
+            return cached
+
+        price_result = self.calculate_voucher_price(cinema_id, token, order_id, voucher_code, voucher_type)
+        if price_result.get('success', False) and price_result.get('ret') == 0:
+            with self._quote_lock:
+                self._quote_cache[(str(cinema_id), order_id, voucher_code, voucher_type)] = (time.time(), price_result)
+        return dict(price_result, cached=False)
+
+    def peek_voucher_price_quote(self, cinema_id: str, order_id: str, voucher_code: str,
+                                 voucher_type: str = 'VGC_T') -> Optional[Dict[str, Any]]:
+        """🆕 查看未过期的询价结果（不发起请求），没有时返回None"""
+        key = (str(cinema_id), order_id, voucher_code, voucher_type)
+        with self._quote_lock:
+            cached = self._quote_cache.get(key)
+            if cached is None:
+                return None
+            quoted_at, price_result = cached
+            if time.time() - quoted_at > self.QUOTE_TTL:
+                del self._quote_cache[key]
+                return None
+        return dict(price_result, cached=True)
+
+    def invalidate_price_quotes(self, order_id: Optional[str] = None) -> int:
+        """🆕 使询价缓存失效，order_id为空时清空全部，返回失效数量"""
+        with self._quote_lock:
+            keys = [key for key in self._quote_cache if order_id is None or key[1] == order_id]
+            for key in keys:
+                del self._quote_cache[key]
+        return len(keys)
+
     def change_order_payment_method(self, order_id: str, cinema_id: str, token: str,
                                    pay_type: str = 'WECHAT', discount_type: str = 'MARKETING',
                                    card_id: str = '', voucher_code: str = '', voucher_code_type: str = '') -> Dict[str, Any]:
@@ -231,6 +283,8 @@ class WomeiOrderVoucherService:
 
 
                     if ret == 0:
+                        # 🆕 订单已变更，之前的询价结果作废
+                        self.invalidate_price_quotes(order_id)
                         return {
                             'success': True,
                             'ret': ret,
@@ -280,7 +334,7 @@ class WomeiOrderVoucherService:
     def _change_order_internal(self, order_id: str, cinema_id: str, token: str,
                               pay_type: str, discount_type: str,
                               voucher_code: str = '', voucher_code_type: str = '',
-                              card_id: str = '', **kwargs) -> Dict[str, Any]:
+                              card_id: str = '', keep_quotes: bool = False, **kwargs) -> Dict[str, Any]:
         """
         🔧 通用订单变更方法 - 内部实现
         统一处理所有订单变更操作的API调用逻辑
@@ -294,6 +348,7 @@ class WomeiOrderVoucherService:
             voucher_code: 券码（可选）
             voucher_code_type: 券码类型（可选）
             card_id: 卡ID（可选）
+            keep_quotes: 变更成功后保留该订单的询价结果（仅绑定券码时使用，券的询价基于订单原价）
             **kwargs: 其他扩展参数
 
         Returns:
@@ -362,6 +417,9 @@ class WomeiOrderVoucherService:
 
 
                     if ret == 0:
+                        # 🆕 订单已变更，之前的询价结果作废（绑定券码不影响其他券的询价）
+                        if not keep_quotes:
+                            self.invalidate_price_quotes(order_id)
                         return {
                             'success': True,
                             'ret': ret,
@@ -436,6 +494,7 @@ class WomeiOrderVoucherService:
             discount_type='MARKETING'
         )
 
+    @traced('voucher_bind', kind='network', key_arg='order_id')
     def bind_voucher_to_order(self, cinema_id: str, token: str, order_id: str,
                              voucher_code: str, voucher_type: str = 'VGC_T') -> Dict[str, Any]:
         """
@@ -460,11 +519,16 @@ class WomeiOrderVoucherService:
             pay_type='WECHAT',
             discount_type='TP_VOUCHER',
             voucher_code=voucher_code,
-            voucher_code_type=voucher_type
+            voucher_code_type=voucher_type,
+            keep_quotes=True
         )
 
         # 🔧 增强券绑定结果处理
         if result.get('success', False):
+            # 🆕 券已用于订单，使券库存缓存失效
+            from services.voucher_inventory import invalidate_voucher_inventory
+            invalidate_voucher_inventory(token, cinema_id)
+
             data_section = result.get('data', {})
 
             # 检查数据完整性
@@ -542,7 +606,7 @@ class WomeiOrderVoucherService:
                                 voucher_code: str, voucher_type: str = 'VGC_T') -> Dict[str, Any]:
         """
         🔄 完整的两步式券使用工作流程
-        1. 先调用价格计算接口获取价格信息
+        1. 先获取价格信息（有未过期的询价结果时直接复用，不再请求）
         2. 再调用券绑定接口完成券使用
 
         Args:
@@ -569,7 +633,7 @@ class WomeiOrderVoucherService:
 
             # 步骤1: 计算券价格
             print(f"[沃美券流程] 1️⃣ 第一步：计算券价格...")
-            price_result = self.calculate_voucher_price(cinema_id, token, order_id, voucher_code, voucher_type)
+            price_result = self.get_voucher_price_quote(cinema_id, token, order_id, voucher_code, voucher_type)
             workflow_result['steps']['price_calculation'] = price_result
             workflow_result['price_calculation'] = price_result
 
@@ -7,7 +7,6 @@
 
 import requests
 import json
-import re
 from typing import Dict, Optional, Tuple, List
 
 
@@ -62,34 +61,25 @@ class WomeiVoucherService:
         
         支持格式：
         - 卡号：GZJY01002948416827;密码：2034
-        - 卡号：GZJY01002948425042;密码：3594
+        - GZJY01002948416827<Tab或逗号>2034（从表格粘贴）
+        - GZJY01002948416827（只有券码）
         
         Args:
             input_text: 用户输入的文本
             
         Returns:
-            List[Tuple[str, str]]: [(voucher_code, voucher_password), ...]
+            List[Tuple[str, str]]: [(voucher_code, voucher_password), ...]，已去重
         """
-        vouchers = []
-        lines = input_text.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # 使用正则表达式解析格式：卡号：xxx;密码：xxx
-            pattern = r'卡号[：:]\s*([^;；]+)[;；]\s*密码[：:]\s*(.+)'
-            match = re.match(pattern, line)
-            
-            if match:
-                voucher_code = match.group(1).strip()
-                voucher_password = match.group(2).strip()
-                vouchers.append((voucher_code, voucher_password))
-            else:
-                print(f"[沃美绑券] ⚠️ 无法解析行: {line}")
-        
-        return vouchers
+        from services.voucher_input_parser import parse_voucher_lines
+
+        entries, unparsed = parse_voucher_lines(input_text)
+        for line_no, line, reason in unparsed:
+            print(f"[沃美绑券] ⚠️ 第{line_no}行{reason}: {line}")
+
+        vouchers = {}
+        for voucher_code, voucher_password, _ in entries:
+            vouchers.setdefault(voucher_code, voucher_password)
+        return list(vouchers.items())
     
     def bind_voucher(self, cinema_id: str, token: str, voucher_code: str, voucher_password: str) -> Dict:
         """
@@ -128,6 +118,10 @@ class WomeiVoucherService:
             decoded_data = self.decode_unicode_message(response.text)
             
             if decoded_data:
+                # 🆕 绑券成功后券库存已变化，使缓存失效
+                if decoded_data.get('ret') == 0:
+                    from services.voucher_inventory import invalidate_voucher_inventory
+                    invalidate_voucher_inventory(token, cinema_id)
                 return decoded_data
             else:
                 return {
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""订单流程链路追踪 - 网络/本地耗时拆分"""
+
+import threading
+
+from performance.tracer import OrderTracer, Span, Trace
+
+
+def _span(name, kind, start, end, depth=0, thread_id=1):
+    span = Span(name, kind, start, thread_id, depth, {})
+    span.end = end
+    return span
+
+
+def test_network_span_nested_in_cpu_span_counts_as_network():
+    trace = Trace(1, 'order_flow')
+    trace.start = 100.0
+    trace.end = 101.0
+    # submit_order(cpu, 0~1s) 内嵌 create_order(network, 0.2~0.7s)
+    trace.spans = [
+        _span('create_order', 'network', 100.2, 100.7, depth=1),
+        _span('submit_order', 'cpu', 100.0, 101.0),
+    ]
+
+    summary = trace.summary()
+
+    assert summary['total_ms'] == 1000.0
+    assert summary['network_ms'] == 500.0
+    assert summary['cpu_ms'] == 500.0
+
+
+def test_concurrent_network_spans_are_not_double_counted():
+    trace = Trace(1, 'order_flow')
+    trace.start = 100.0
+    trace.end = 101.0
+    # 两个工作线程上重叠的请求：0.1~0.5s 与 0.3~0.6s，并集 0.5s
+    trace.spans = [
+        _span('seat_info', 'network', 100.1, 100.5, thread_id=1),
+        _span('voucher_list', 'network', 100.3, 100.6, thread_id=2),
+    ]
+
+    summary = trace.summary()
+
+    assert summary['network_ms'] == 500.0
+    assert summary['cpu_ms'] == 500.0
+
+
+def test_unkeyed_span_only_records_on_thread_that_opened_the_trace():
+    tracer = OrderTracer()
+    opened = threading.Event()
+    release = threading.Event()
+    traces = {}
+
+    def account_flow(name):
+        traces[name] = tracer.start_trace(name)
+        opened.set()
+        release.wait(5)
+        with tracer.span('pay', kind='network'):
+            pass
+
+    # 账号A开始链路后，账号B在另一线程开始链路（B是最后开始的）
+    thread_a = threading.Thread(target=account_flow, args=('a',))
+    thread_a.start()
+    opened.wait(5)
+    opened.clear()
+    thread_b = threading.Thread(target=account_flow, args=('b',))
+    thread_b.start()
+    opened.wait(5)
+    release.set()
+    thread_a.join(5)
+    thread_b.join(5)
+
+    # 没有开始链路的线程不记录
+    with tracer.span('generate_qrcode', kind='network'):
+        pass
+
+    assert [span.name for span in traces['a'].spans] == ['pay']
+    assert [span.name for span in traces['b'].spans] == ['pay']
+    assert not traces['a'].end
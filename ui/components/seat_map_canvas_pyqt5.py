@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+座位面板 - 自绘版本
+整个座位图由单个控件绘制，适用于座位数很多的大厅：
+不再为每个座位创建QPushButton，点击通过网格坐标计算命中，状态变化只重绘对应座位区域
+"""
+
+from typing import Dict, List, Optional, Tuple
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import Qt, QPoint, QRect, QRectF
+from PyQt5.QtGui import QPainter, QColor, QPen, QFont, QMouseEvent
+
+from ui.components.seat_map_panel_pyqt5 import SeatMapPanelPyQt5
+
+# 网格尺寸（与按钮版本保持一致：普通座位36x36，情侣座位40x36，间距2）
+SEAT_WIDTH = 36
+COUPLE_SEAT_WIDTH = 40
+SEAT_HEIGHT = 36
+PITCH_X = COUPLE_SEAT_WIDTH + 2
+PITCH_Y = SEAT_HEIGHT + 2
+ROW_LABEL_WIDTH = 28
+CANVAS_MARGIN = 10
+DRAG_THRESHOLD = 5
+
+# 自动模式下超过该座位数的影厅使用自绘版本
+LARGE_HALL_SEAT_COUNT = 300
+
+
+class SeatCell:
+    """轻量座位单元 - 替代QPushButton保存座位的位置信息和显示状态"""
+
+    __slots__ = (
+        'seat_data', 'logical_row', 'logical_col', 'physical_x', 'physical_y',
+        'array_row', 'array_col', 'area_name', 'area_price', 'seat_type',
+        'rect', '_text', 'status'
+    )
+
+    def __init__(self, seat: dict, logical_row: int, logical_col: int, physical_x: int, physical_y: int,
+                 array_row: int, array_col: int):
+        self.seat_data = seat
+        self.logical_row = logical_row
+        self.logical_col = logical_col
+        self.physical_x = physical_x
+        self.physical_y = physical_y
+        self.array_row = array_row
+        self.array_col = array_col
+        self.area_name = seat.get('area_name', '')
+        self.area_price = seat.get('area_price', 0)
+        self.seat_type = seat.get('type', 0)
+        self.status = seat.get('status', 'available')
+        self._text = seat.get('num', str(logical_col))
+
+        width = COUPLE_SEAT_WIDTH if self.seat_type in [1, 2] else SEAT_WIDTH
+        left = ROW_LABEL_WIDTH + (physical_x - 1) * PITCH_X + (PITCH_X - width) // 2
+        top = (physical_y - 1) * PITCH_Y
+        self.rect = QRect(left, top, width, SEAT_HEIGHT)
+
+    def text(self) -> str:
+        return self._text
+
+    def setText(self, text: str):
+        self._text = text
+
+
+class SeatMapCanvas(QWidget):
+    """座位图画布 - 单控件绘制全部座位"""
+
+    def __init__(self, panel: 'PaintedSeatMapPanel'):
+        super().__init__()
+        self.panel = panel
+
+        # 网格索引：(网格行, 网格列) -> 座位单元，用于命中计算
+        self.grid: Dict[Tuple[int, int], SeatCell] = {}
+        # 按网格行分组，重绘时只遍历脏区域覆盖的行
+        self.rows: Dict[int, List[SeatCell]] = {}
+        self.row_labels: Dict[int, str] = {}
+        self.content_size = (0, 0)
+        self.empty_text = ""
+
+        # 样式缓存：样式键 -> (背景色, 边框笔, 文字颜色, 字体)
+        self._style_cache: Dict[tuple, tuple] = {}
+        self._row_label_font = QFont("Microsoft YaHei", 10, QFont.Bold)
+
+        # 鼠标状态
+        self._press_global_pos: Optional[QPoint] = None
+        self._last_global_pos = QPoint()
+        self._pressed_cell: Optional[SeatCell] = None
+        self._dragging = False
+
+        self.setMouseTracking(True)
+
+    def set_cells(self, cells: List[SeatCell], row_labels: Dict[int, str]):
+        """设置座位单元并重新计算画布尺寸"""
+        self.grid.clear()
+        self.rows.clear()
+        self.row_labels = row_labels
+        self.empty_text = ""
+
+        max_right = ROW_LABEL_WIDTH
+        max_bottom = 0
+        for cell in cells:
+            grid_row = cell.physical_y - 1
+            self.grid[(grid_row, cell.physical_x)] = cell
+            self.rows.setdefault(grid_row, []).append(cell)
+            max_right = max(max_right, cell.rect.right() + 1)
+            max_bottom = max(max_bottom, cell.rect.bottom() + 1)
+
+        self.content_size = (max_right, max_bottom)
+        self.setMinimumSize(max_right + CANVAS_MARGIN * 2, max_bottom + CANVAS_MARGIN * 2)
+        self.update()
+
+    def set_empty_text(self, text: str):
+        """显示空状态文字"""
+        self.grid.clear()
+        self.rows.clear()
+        self.row_labels = {}
+        self.content_size = (0, 0)
+        self.empty_text = text
+        self.setMinimumSize(0, 0)
+        self.update()
+
+    def update_cell(self, cell: SeatCell):
+        """只重绘单个座位所在的矩形区域"""
+        ox, oy = self._origin()
+        self.update(cell.rect.translated(ox, oy).adjusted(-2, -2, 2, 2))
+
+    def _origin(self) -> Tuple[int, int]:
+        """座位图内容的左上角位置（水平居中）"""
+        content_width, content_height = self.content_size
+        ox = max(CANVAS_MARGIN, (self.width() - content_width) // 2)
+        oy = max(CANVAS_MARGIN, (self.height() - content_height) // 2)
+        return ox, oy
+
+    def cell_at(self, pos: QPoint) -> Optional[SeatCell]:
+        """根据网格坐标计算命中的座位"""
+        ox, oy = self._origin()
+        x = pos.x() - ox
+        y = pos.y() - oy
+        if x < ROW_LABEL_WIDTH or y < 0:
+            return None
+
+        grid_col = (x - ROW_LABEL_WIDTH) // PITCH_X + 1
+        grid_row = y // PITCH_Y
+        cell = self.grid.get((grid_row, grid_col))
+        if cell and cell.rect.contains(x, y):
+            return cell
+        return None
+
+    # ===== 绘制 =====
+
+    def paintEvent(self, event):
+        """只绘制与脏区域相交的行号和座位"""
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.fillRect(event.rect(), QColor('#ffffff'))
+
+        if self.empty_text:
+            painter.setPen(QColor('#6c757d'))
+            painter.setFont(QFont("Microsoft YaHei", 11))
+            painter.drawText(self.rect(), Qt.AlignCenter, self.empty_text)
+            return
+
+        ox, oy = self._origin()
+        painter.translate(ox, oy)
+        dirty = event.rect().translated(-ox, -oy)
+
+        first_row = max(0, dirty.top() // PITCH_Y)
+        last_row = dirty.bottom() // PITCH_Y
+
+        # 行号
+        painter.setFont(self._row_label_font)
+        painter.setPen(QColor('#6c757d'))
+        for grid_row in range(first_row, last_row + 1):
+            label = self.row_labels.get(grid_row)
+            if label is None:
+                continue
+            label_rect = QRect(0, grid_row * PITCH_Y, ROW_LABEL_WIDTH, SEAT_HEIGHT)
+            if label_rect.intersects(dirty):
+                painter.drawText(label_rect, Qt.AlignCenter, label)
+
+        # 座位
+        for grid_row in range(first_row, last_row + 1):
+            for cell in self.rows.get(grid_row, ()):
+                if cell.rect.intersects(dirty):
+                    self._paint_cell(painter, cell)
+
+    def _paint_cell(self, painter: QPainter, cell: SeatCell):
+        """绘制单个座位"""
+        background, border_pen, text_color, font = self._get_style(cell)
+        half_pen = border_pen.width() / 2.0
+        rect = QRectF(cell.rect).adjusted(half_pen, half_pen, -half_pen, -half_pen)
+        radius = 4 if cell.seat_type in [1, 2] else 6
+
+        painter.setPen(border_pen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, radius, radius)
+
+        painter.setPen(text_color)
+        painter.setFont(font)
+        painter.drawText(cell.rect, Qt.AlignCenter, cell.text())
+
+    def _get_style(self, cell: SeatCell) -> tuple:
+        """获取座位绘制样式（与按钮版本的样式表保持一致，按样式键缓存）"""
+        is_couple = cell.seat_type in [1, 2]
+        area_color = self.panel._get_area_border_color(cell.area_name)
+        key = (cell.status, is_couple, area_color)
+
+        style = self._style_cache.get(key)
+        if style is None:
+            style = self._build_style(cell.status, is_couple, area_color)
+            self._style_cache[key] = style
+        return style
+
+    @staticmethod
+    def _build_style(status: str, is_couple: bool, area_color: str) -> tuple:
+        """构建座位样式：(背景色, 边框笔, 文字颜色, 字体)"""
+        bold_font = QFont("Microsoft YaHei")
+        bold_font.setPixelSize(9 if is_couple else 10)
+        bold_font.setBold(True)
+
+        if status == "available":
+            if is_couple:
+                colors = ('#fce4ec', '#e91e63', '#ad1457', 2)
+            else:
+                colors = ('#e3f2fd', area_color, '#1976d2', 2)
+        elif status == "sold":
+            colors = ('#f44336', '#d32f2f', '#ffffff', 2)
+        elif status == "unavailable":
+            colors = ('#e0e0e0', '#bdbdbd', '#757575', 2)
+        elif status == "selected":
+            if is_couple:
+                colors = ('#e91e63', '#ad1457', '#ffffff', 3)
+            else:
+                colors = ('#4caf50', area_color, '#ffffff', 2)
+        else:
+            colors = ('#fafafa', area_color, '#bdbdbd', 2)
+            bold_font.setBold(False)
+
+        background, border, text, border_width = colors
+        return QColor(background), QPen(QColor(border), border_width), QColor(text), bold_font
+
+    # ===== 鼠标事件：点击选座 + 拖拽滚动 =====
+
+    def mousePressEvent(self, event: QMouseEvent):
+        if event.button() == Qt.LeftButton:
+            self._press_global_pos = event.globalPos()
+            self._last_global_pos = event.globalPos()
+            self._pressed_cell = self.cell_at(event.pos())
+            self._dragging = False
+
+    def mouseMoveEvent(self, event: QMouseEvent):
+        if self._press_global_pos is not None and event.buttons() & Qt.LeftButton:
+            move_distance = (event.globalPos() - self._press_global_pos).manhattanLength()
+            if move_distance > DRAG_THRESHOLD and not self._dragging:
+                self._dragging = True
+                self.setCursor(Qt.ClosedHandCursor)
+
+            if self._dragging:
+                delta = event.globalPos() - self._last_global_pos
+                self.panel._scroll_by(delta.x(), delta.y())
+                self._last_global_pos = event.globalPos()
+            return
+
+        # 悬停时根据座位状态切换光标
+        cell = self.cell_at(event.pos())
+        if cell is None:
+            self.setCursor(Qt.ArrowCursor)
+        elif cell.status in ("available", "selected"):
+            self.setCursor(Qt.PointingHandCursor)
+        elif cell.status == "unavailable":
+            self.setCursor(Qt.ForbiddenCursor)
+        else:
+            self.setCursor(Qt.ArrowCursor)
+
+    def mouseReleaseEvent(self, event: QMouseEvent):
+        if event.button() != Qt.LeftButton or self._press_global_pos is None:
+            return
+
+        if self._dragging:
+            self._dragging = False
+            self.setCursor(Qt.ArrowCursor)
+        else:
+            cell = self.cell_at(event.pos())
+            if cell is not None and cell is self._pressed_cell:
+                self.panel.toggle_seat(cell.array_row, cell.array_col)
+
+        self._press_global_pos = None
+        self._pressed_cell = None
+
+
+class PaintedSeatMapPanel(SeatMapPanelPyQt5):
+    """座位面板 - 自绘版本，接口与SeatMapPanelPyQt5一致"""
+
+    def _init_ui(self):
+        """初始化用户界面 - 用自绘画布替换座位按钮网格"""
+        super()._init_ui()
+
+        self.seat_canvas = SeatMapCanvas(self)
+        self.scroll_area.setWidget(self.seat_canvas)
+        self.seat_widget = self.seat_canvas
+        self.seat_layout = None
+
+    def _draw_seats(self):
+        """构建座位单元并交给画布绘制"""
+        self.seat_buttons.clear()
+
+        if not self.seat_data:
+            self.seat_canvas.set_empty_text("暂无座位数据")
+            return
+
+        cells = []
+        row_labels = {}
+        for row_index, row in enumerate(self.seat_data):
+            for col_index, seat in enumerate(row):
+                if not seat:
+                    continue
+
+                status = seat.get('status', 'available')
+                if status == 'empty':
+                    continue
+
+                cell = SeatCell(
+                    seat,
+                    logical_row=seat.get('row', row_index + 1),
+                    logical_col=seat.get('col', col_index + 1),
+                    physical_x=seat.get('x', col_index + 1),
+                    physical_y=seat.get('y', row_index + 1),
+                    array_row=row_index,
+                    array_col=col_index
+                )
+                self._apply_cell_style(cell, status)
+                cells.append(cell)
+                row_labels.setdefault(cell.physical_y - 1, f"{cell.logical_row}")
+
+                self.seat_buttons[(row_index, col_index)] = cell
+
+        self.seat_canvas.set_cells(cells, row_labels)
+
+        # 更新区域信息显示
+        self._update_area_info_display()
+
+        # 初始化按钮文字
+        self._update_submit_button_text()
+
+    def _apply_cell_style(self, cell: SeatCell, status: str):
+        """设置座位单元的显示状态和文字（与按钮版本的文字规则一致）"""
+        cell.status = status
+        if status == "unavailable":
+            cell.setText("/")
+        elif status in ("available", "selected") and cell.seat_type in [1, 2]:
+            if not cell.text().startswith('💕'):
+                cell.setText(f"💕{cell.text()}")
+
+    def _update_seat_button_style(self, button: SeatCell, status: str, area_name: str = '', seat_type: int = 0):
+        """更新座位显示状态 - 只重绘该座位所在区域"""
+        self._apply_cell_style(button, status)
+        self.seat_canvas.update_cell(button)
+
+    def _bind_seat_button_events(self, seat_btn: SeatCell, status: str, r: int, c: int):
+        """自绘版本由画布统一处理鼠标事件，点击时按座位状态判断是否可选"""
+        pass
+
+    def _scroll_by(self, dx: int, dy: int):
+        """按鼠标移动距离拖拽滚动（内容跟随鼠标移动）"""
+        h_scrollbar = self.scroll_area.horizontalScrollBar()
+        v_scrollbar = self.scroll_area.verticalScrollBar()
+        h_scrollbar.setValue(max(h_scrollbar.minimum(), min(h_scrollbar.maximum(), h_scrollbar.value() - dx)))
+        v_scrollbar.setValue(max(v_scrollbar.minimum(), min(v_scrollbar.maximum(), v_scrollbar.value() - dy)))
+
+
+def get_seat_map_panel_class(seat_count: int, renderer: str = 'auto') -> type:
+    """
+    根据影厅座位数选择座位面板类型
+
+    Args:
+        seat_count: 影厅座位数
+        renderer: 'widget' 按钮版本, 'painted' 自绘版本, 'auto' 按座位数自动选择
+
+    Returns:
+        座位面板类
+    """
+    if renderer == 'painted' or (renderer == 'auto' and seat_count >= LARGE_HALL_SEAT_COUNT):
+        return PaintedSeatMapPanel
+    return SeatMapPanelPyQt5
+
+
+def create_seat_map_panel(seat_count: int, renderer: str = 'auto') -> SeatMapPanelPyQt5:
+    """根据影厅座位数创建座位面板"""
+    return get_seat_map_panel_class(seat_count, renderer)()
@@ -8,7 +8,7 @@
 from typing import Callable, Optional, Dict, List, Set, Tuple
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
-    QScrollArea, QFrame, QGridLayout
+    QScrollArea, QFrame, QGridLayout, QCheckBox, QSpinBox
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QPoint
 from PyQt5.QtGui import QFont, QPalette, QMouseEvent
@@ -18,6 +18,10 @@ class SeatMapPanelPyQt5(QWidget):
 
     # 信号定义
     seat_selected = pyqtSignal(list)  # 选座变化信号
+    auto_refresh_toggled = pyqtSignal(bool)  # 实时刷新座位状态开关信号
+
+    # 座位样式表缓存（所有面板共享）：(状态, 区域边框颜色, 座位类型) -> 样式表
+    _seat_stylesheet_cache: Dict[Tuple[str, str, int], str] = {}
 
     def __init__(self, parent=None, seat_data=None):
         super().__init__(parent)
@@ -37,6 +41,14 @@ class SeatMapPanelPyQt5(QWidget):
         # UI组件
         self.seat_buttons: Dict[Tuple[int, int], QPushButton] = {}
 
+        # 🆕 连座推荐器（座位状态变化后失效，下次推荐时重建）
+        self._seat_recommender = None
+
+        # 🆕 座位按钮/行号标签对象池：重绘时复用已有控件，只为新增的座位数创建控件
+        self._seat_button_pool: List[QPushButton] = []
+        self._row_label_pool: List[QLabel] = []
+        self._row_labels: List[QLabel] = []
+
         # 🆕 拖拽滚动相关属性
         self.is_dragging = False
         self.last_mouse_pos = QPoint()
@@ -141,11 +153,44 @@ class SeatMapPanelPyQt5(QWidget):
         # 提交订单按钮 - 集成选座信息，居中显示
         button_layout = QHBoxLayout()
         button_layout.addStretch()  # 左侧弹性空间
+
+        # 🆕 一键推荐连座：数量 + 按钮
+        self.recommend_count_spin = QSpinBox()
+        self.recommend_count_spin.setRange(1, 8)
+        self.recommend_count_spin.setValue(2)
+        self.recommend_count_spin.setSuffix("座")
+        self.recommend_count_spin.setFixedWidth(60)
+        button_layout.addWidget(self.recommend_count_spin)
+
+        self.recommend_btn = QPushButton("推荐连座")
+        self.recommend_btn.setToolTip("自动选择离银幕中心最近的连续空座")
+        self.recommend_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #ffffff;
+                color: #007bff;
+                font: bold 11px "Microsoft YaHei";
+                border: 1px solid #007bff;
+                padding: 5px 10px;
+                border-radius: 4px;
+            }
+            QPushButton:pressed {
+                background-color: #e3f2fd;
+            }
+        """)
+        self.recommend_btn.clicked.connect(self._on_recommend_click)
+        button_layout.addWidget(self.recommend_btn)
         self.submit_btn = QPushButton("提交订单")
         self.submit_btn.setFont(QFont("Microsoft YaHei", 11, QFont.Bold))
         self.submit_btn.clicked.connect(self._on_submit_order_click)
         self._setup_submit_button_style(self.submit_btn)
         button_layout.addWidget(self.submit_btn)
+
+        # 🆕 实时刷新座位状态开关
+        self.auto_refresh_checkbox = QCheckBox("实时座位")
+        self.auto_refresh_checkbox.setToolTip("定时刷新可售座位，已被他人锁定的座位会自动置灰")
+        self.auto_refresh_checkbox.setStyleSheet("QCheckBox { color: #555; font: 11px 'Microsoft YaHei'; }")
+        self.auto_refresh_checkbox.toggled.connect(self.auto_refresh_toggled.emit)
+        button_layout.addWidget(self.auto_refresh_checkbox)
         button_layout.addStretch()  # 右侧弹性空间
         bottom_layout.addLayout(button_layout)
         
@@ -187,13 +232,74 @@ class SeatMapPanelPyQt5(QWidget):
     
     def _draw_seats(self):
         """绘制所有座位 - 使用物理位置(x,y)确定显示位置，保存逻辑位置(row,col)用于订单"""
-        # 清空现有布局
+        # 暂停重绘，批量更新完成后统一刷新
+        self.seat_widget.setUpdatesEnabled(False)
+        try:
+            self._layout_seats()
+        finally:
+            self.seat_widget.setUpdatesEnabled(True)
+
+        # 🆕 更新区域信息显示
+        self._update_area_info_display()
+
+        # 初始化按钮文字
+        self._update_submit_button_text()
+
+    def _recycle_seat_widgets(self):
+        """把布局中的座位按钮和行号标签放回对象池，其他控件直接删除"""
         for i in reversed(range(self.seat_layout.count())):
-            child = self.seat_layout.itemAt(i)
-            if child.widget():
-                child.widget().deleteLater()
+            item = self.seat_layout.takeAt(i)
+            widget = item.widget() if item else None
+            if widget is None:
+                continue
+
+            widget.hide()
+            pool_kind = getattr(widget, 'pool_kind', None)
+            if pool_kind == 'seat':
+                self._seat_button_pool.append(widget)
+            elif pool_kind == 'row':
+                self._row_label_pool.append(widget)
+            else:
+                widget.deleteLater()
 
         self.seat_buttons.clear()
+        self._row_labels.clear()
+
+    def _acquire_seat_button(self) -> QPushButton:
+        """从对象池获取座位按钮，池空时才新建"""
+        if self._seat_button_pool:
+            return self._seat_button_pool.pop()
+
+        seat_btn = QPushButton(self.seat_widget)
+        seat_btn.pool_kind = 'seat'
+        return seat_btn
+
+    def _acquire_row_label(self) -> QLabel:
+        """从对象池获取行号标签，池空时才新建"""
+        if self._row_label_pool:
+            return self._row_label_pool.pop()
+
+        row_label = QLabel(self.seat_widget)
+        row_label.pool_kind = 'row'
+        row_label.setAlignment(Qt.AlignCenter)
+        row_label.setFont(QFont("Microsoft YaHei", 10, QFont.Bold))
+        row_label.setStyleSheet("""
+            QLabel {
+                color: #6c757d;
+                background-color: transparent;
+                border: none;
+                padding: 2px;
+                min-width: 24px;
+                min-height: 32px;
+                font-weight: bold;
+            }
+        """)
+        return row_label
+
+    def _layout_seats(self):
+        """把座位数据绑定到（复用的）座位按钮并放入网格"""
+        # 回收现有控件
+        self._recycle_seat_widgets()
 
         if not self.seat_data:
             # 显示空状态
@@ -247,23 +353,13 @@ class SeatMapPanelPyQt5(QWidget):
             if physical_y not in displayed_rows:
                 displayed_rows.add(physical_y)
 
-                # 创建行号标签（显示逻辑行号）
-                row_label = QLabel(f"{logical_row}")
-                row_label.setAlignment(Qt.AlignCenter)
-                row_label.setFont(QFont("Microsoft YaHei", 10, QFont.Bold))
-                row_label.setStyleSheet("""
-                    QLabel {
-                        color: #6c757d;
-                        background-color: transparent;
-                        border: none;
-                        padding: 2px;
-                        min-width: 24px;
-                        min-height: 32px;
-                        font-weight: bold;
-                    }
-                """)
+                # 行号标签（显示逻辑行号）
+                row_label = self._acquire_row_label()
+                row_label.setText(f"{logical_row}")
                 # 使用物理Y坐标作为网格行，第0列放置行号标签
                 self.seat_layout.addWidget(row_label, physical_y - 1, 0)
+                row_label.show()
+                self._row_labels.append(row_label)
 
         # 🔧 绘制座位按钮（使用物理位置确定网格位置）
         for seat_info in all_seats:
@@ -285,19 +381,17 @@ class SeatMapPanelPyQt5(QWidget):
             if status == 'empty':
                 continue
 
-            # 🔧 创建座位按钮 - 使用物理位置显示，保存逻辑位置信息
-            seat_btn = QPushButton()
+            # 🔧 获取座位按钮（优先复用对象池） - 使用物理位置显示，保存逻辑位置信息
+            seat_btn = self._acquire_seat_button()
 
             # 🆕 检查是否为情侣座位
             seat_type = seat.get('type', 0)
             is_couple_seat = seat_type in [1, 2]
 
-            if is_couple_seat:
-                # 情侣座位使用更宽的尺寸
-                seat_btn.setFixedSize(40, 36)
-            else:
-                # 普通座位
-                seat_btn.setFixedSize(36, 36)
+            # 情侣座位使用更宽的尺寸，尺寸不变时跳过设置
+            seat_width = 40 if is_couple_seat else 36
+            if seat_btn.width() != seat_width or seat_btn.height() != 36:
+                seat_btn.setFixedSize(seat_width, 36)
 
             # 🔧 显示逻辑座位号（用于用户识别）
             display_seat_num = seat.get('num', str(logical_col))
@@ -322,25 +416,11 @@ class SeatMapPanelPyQt5(QWidget):
             seat_btn.array_col = array_col          # 数组列索引
 
             # 🔧 设置点击事件（使用数组索引作为键）
-            if status == "available":
-                # 使用数组索引作为参数，保持与现有代码的兼容性
-                seat_btn.clicked.connect(lambda checked, r=array_row, c=array_col: self._seat_button_clicked(r, c))
-                seat_btn.setCursor(Qt.PointingHandCursor)
-
-                # 为座位按钮添加鼠标事件处理
-                seat_btn.mousePressEvent = lambda event, r=array_row, c=array_col: self._seat_button_mouse_press(event, r, c)
-                seat_btn.mouseMoveEvent = lambda event, r=array_row, c=array_col: self._seat_button_mouse_move(event, r, c)
-                seat_btn.mouseReleaseEvent = lambda event, r=array_row, c=array_col: self._seat_button_mouse_release(event, r, c)
-            elif status == "unavailable":
-                # 🆕 不可选择座位 - 完全禁用，无法点击
-                seat_btn.setEnabled(False)
-                seat_btn.setCursor(Qt.ForbiddenCursor)
-            else:
-                # 其他状态（已售、锁定等）- 禁用但保持可见
-                seat_btn.setEnabled(False)
+            self._bind_seat_button_events(seat_btn, status, array_row, array_col)
 
             # 🔧 添加到布局 - 使用物理位置确定网格位置
             self.seat_layout.addWidget(seat_btn, grid_row, grid_col)
+            seat_btn.show()
 
             # 🔧 保存引用（使用数组索引作为键）
             self.seat_buttons[(array_row, array_col)] = seat_btn
@@ -348,41 +428,114 @@ class SeatMapPanelPyQt5(QWidget):
             # print(f"[座位面板] 座位 {logical_row}排{logical_col}座 -> 网格位置({grid_row},{grid_col}), 物理位置({physical_x},{physical_y})")
         
         # print(f"[座位面板] 座位图绘制完成，共{len(self.seat_buttons)}个座位")
+    
+    def _bind_seat_button_events(self, seat_btn: QPushButton, status: str, r: int, c: int):
+        """根据座位状态设置按钮的可用性和鼠标事件（使用数组索引作为键）"""
+        if status in ("available", "selected"):
+            seat_btn.setEnabled(True)
+            seat_btn.setCursor(Qt.PointingHandCursor)
+
+            # 为座位按钮添加鼠标事件处理（重复绑定是幂等的）
+            seat_btn.mousePressEvent = lambda event, r=r, c=c: self._seat_button_mouse_press(event, r, c)
+            seat_btn.mouseMoveEvent = lambda event, r=r, c=c: self._seat_button_mouse_move(event, r, c)
+            seat_btn.mouseReleaseEvent = lambda event, r=r, c=c: self._seat_button_mouse_release(event, r, c)
+        elif status == "unavailable":
+            # 🆕 不可选择座位 - 完全禁用，无法点击
+            seat_btn.setEnabled(False)
+            seat_btn.setCursor(Qt.ForbiddenCursor)
+        else:
+            # 其他状态（已售、锁定等）- 禁用但保持可见
+            seat_btn.setEnabled(False)
+            seat_btn.setCursor(Qt.ArrowCursor)
+
+    def apply_seat_status_updates(self, updates: Dict[Tuple[int, int], str]) -> int:
+        """
+        增量更新座位状态 - 只重绘状态变化的座位按钮，不重建网格、不影响当前选择
+
+        Args:
+            updates: {(数组行索引, 数组列索引): 新状态}
+
+        Returns:
+            实际重绘的座位数量
+        """
+        changed = 0
+        for key, new_status in updates.items():
+            # 已选中的座位保持选择状态，由用户自行取消
+            if key in self.selected_seats:
+                continue
 
-        # 🆕 更新区域信息显示
-        self._update_area_info_display()
+            seat_btn = self.seat_buttons.get(key)
+            if seat_btn is None:
+                continue
+
+            r, c = key
+            seat = self.seat_data[r][c]
+            if seat.get('status') == new_status:
+                continue
+
+            seat['status'] = new_status
+
+            # 恢复座位号文字，样式方法会按状态追加图标
+            logical_col = getattr(seat_btn, 'logical_col', seat.get('col', c + 1))
+            seat_btn.setText(seat.get('num', str(logical_col)))
+            self._update_seat_button_style(seat_btn, new_status, seat.get('area_name', ''), seat.get('type', 0))
+            self._bind_seat_button_events(seat_btn, new_status, r, c)
+            changed += 1
+
+        if changed:
+            self._seat_recommender = None
+
+        return changed
 
-        # 初始化按钮文字
-        self._update_submit_button_text()
-    
     def _update_seat_button_style(self, button: QPushButton, status: str, area_name: str = '', seat_type: int = 0):
-        """更新座位按钮样式 - 现代化设计，支持区域边框和情侣座位"""
+        """更新座位按钮样式 - 现代化设计，支持区域边框和情侣座位（样式表按状态缓存，未变化时不重复设置）"""
         # 🆕 获取区域边框颜色
         area_border_color = self._get_area_border_color(area_name)
 
+        # 🆕 检查是否为情侣座位
+        is_couple_seat = seat_type in [1, 2]
+
+        style_key = (status, area_border_color, seat_type if is_couple_seat else 0)
+        stylesheet = self._seat_stylesheet_cache.get(style_key)
+        if stylesheet is None:
+            stylesheet = self._build_seat_stylesheet(status, area_border_color, seat_type)
+            self._seat_stylesheet_cache[style_key] = stylesheet
+
+        if getattr(button, 'style_key', None) != style_key:
+            button.setStyleSheet(stylesheet)
+            button.style_key = style_key
+
+        if status == "unavailable":
+            # 设置简洁的斜杠符号标识不可选择状态
+            button.setText("/")
+        elif status in ("available", "selected") and is_couple_seat:
+            # 为情侣座位添加爱心图标
+            current_text = button.text()
+            if not current_text.startswith('💕'):
+                button.setText(f"💕{current_text}")
+
+    @staticmethod
+    def _build_seat_stylesheet(status: str, area_border_color: str, seat_type: int) -> str:
+        """构建座位按钮样式表"""
         # 🆕 检查是否为情侣座位
         is_couple_seat = seat_type in [1, 2]
         couple_left = seat_type == 1
-        couple_right = seat_type == 2
 
         # 🆕 情侣座位的特殊边框样式
         if is_couple_seat:
             if couple_left:
                 # 情侣座位左座 - 右边圆角较小，与右座连接
                 border_radius = "6px 2px 2px 6px"
-                couple_indicator = "💕"  # 爱心符号
             else:  # couple_right
                 # 情侣座位右座 - 左边圆角较小，与左座连接
                 border_radius = "2px 6px 6px 2px"
-                couple_indicator = "💕"  # 爱心符号
         else:
             border_radius = "6px"
-            couple_indicator = ""
 
         if status == "available":
             if is_couple_seat:
-                # 情侣座位可选 - 特殊的粉色系，添加爱心图标
-                button.setStyleSheet(f"""
+                # 情侣座位可选 - 特殊的粉色系
+                return f"""
                     QPushButton {{
                         background-color: #fce4ec;
                         border: 2px solid #e91e63;
@@ -395,30 +548,25 @@ class SeatMapPanelPyQt5(QWidget):
                         background-color: #f48fb1;
                         border: 2px solid #e91e63;
                     }}
-                """)
-                # 为可选的情侣座位添加爱心图标
-                current_text = button.text()
-                if not current_text.startswith('💕'):
-                    button.setText(f"💕{current_text}")
-            else:
-                # 普通座位可选 - 清新的蓝色，外边框显示区域颜色
-                button.setStyleSheet(f"""
-                    QPushButton {{
-                        background-color: #e3f2fd;
-                        border: 2px solid {area_border_color};
-                        color: #1976d2;
-                        font: bold 10px "Microsoft YaHei";
-                        border-radius: {border_radius};
-                    }}
+                """
+            # 普通座位可选 - 清新的蓝色，外边框显示区域颜色
+            return f"""
+                QPushButton {{
+                    background-color: #e3f2fd;
+                    border: 2px solid {area_border_color};
+                    color: #1976d2;
+                    font: bold 10px "Microsoft YaHei";
+                    border-radius: {border_radius};
+                }}
 
-                    QPushButton:pressed {{
-                        background-color: #90caf9;
-                        border: 2px solid {area_border_color};
-                    }}
-                """)
+                QPushButton:pressed {{
+                    background-color: #90caf9;
+                    border: 2px solid {area_border_color};
+                }}
+            """
         elif status == "sold":
             # 已售座位 - 明显的红色，让用户一眼看出不可选择
-            button.setStyleSheet(f"""
+            return f"""
                 QPushButton {{
                     background-color: #f44336;
                     border: 2px solid #d32f2f;
@@ -426,10 +574,10 @@ class SeatMapPanelPyQt5(QWidget):
                     font: bold 10px "Microsoft YaHei";
                     border-radius: {border_radius};
                 }}
-            """)
+            """
         elif status == "unavailable":
             # 🆕 不可选择座位 - 柔和的浅灰色，清晰但不突兀
-            button.setStyleSheet(f"""
+            return f"""
                 QPushButton {{
                     background-color: #e0e0e0;
                     border: 2px solid #bdbdbd;
@@ -437,13 +585,11 @@ class SeatMapPanelPyQt5(QWidget):
                     font: bold 10px "Microsoft YaHei";
                     border-radius: {border_radius};
                 }}
-            """)
-            # 设置简洁的斜杠符号标识不可选择状态
-            button.setText("/")
+            """
         elif status == "selected":
             if is_couple_seat:
-                # 情侣座位选中 - 特殊的深粉色，添加爱心图标
-                button.setStyleSheet(f"""
+                # 情侣座位选中 - 特殊的深粉色
+                return f"""
                     QPushButton {{
                         background-color: #e91e63;
                         border: 3px solid #ad1457;
@@ -451,33 +597,27 @@ class SeatMapPanelPyQt5(QWidget):
                         font: bold 9px "Microsoft YaHei";
                         border-radius: {border_radius};
                     }}
-                """)
-                # 为情侣座位添加爱心图标
-                current_text = button.text()
-                if not current_text.startswith('💕'):
-                    button.setText(f"💕{current_text}")
-            else:
-                # 普通座位选中 - 鲜明的绿色，外边框显示区域颜色
-                button.setStyleSheet(f"""
-                    QPushButton {{
-                        background-color: #4caf50;
-                        border: 2px solid {area_border_color};
-                        color: #fff;
-                        font: bold 10px "Microsoft YaHei";
-                        border-radius: {border_radius};
-                    }}
-                """)
-        else:
-            # 其他状态 - 默认样式，外边框显示区域颜色
-            button.setStyleSheet(f"""
+                """
+            # 普通座位选中 - 鲜明的绿色，外边框显示区域颜色
+            return f"""
                 QPushButton {{
-                    background-color: #fafafa;
+                    background-color: #4caf50;
                     border: 2px solid {area_border_color};
-                    color: #bdbdbd;
-                    font: 10px "Microsoft YaHei";
+                    color: #fff;
+                    font: bold 10px "Microsoft YaHei";
                     border-radius: {border_radius};
                 }}
-            """)
+            """
+        # 其他状态 - 默认样式，外边框显示区域颜色
+        return f"""
+            QPushButton {{
+                background-color: #fafafa;
+                border: 2px solid {area_border_color};
+                color: #bdbdbd;
+                font: 10px "Microsoft YaHei";
+                border-radius: {border_radius};
+            }}
+        """
     
     def toggle_seat(self, r: int, c: int):
         """切换座位选中状态 - 支持逻辑位置和物理位置的区分，支持情侣座自动连选"""
@@ -510,6 +650,8 @@ class SeatMapPanelPyQt5(QWidget):
             # 普通座位处理
             self._handle_normal_seat_selection(r, c, seat, key, logical_row, logical_col, area_name, seat_type)
 
+        self._seat_recommender = None
+
         # 触发选座回调
         if self.on_seat_selected:
             selected = [self.seat_data[r][c] for (r, c) in self.selected_seats]
@@ -675,6 +817,7 @@ class SeatMapPanelPyQt5(QWidget):
         """更新座位数据并重绘"""
         self.seat_data = seat_data or []
         self.selected_seats.clear()
+        self._seat_recommender = None
         self._draw_seats()
         # 座位数据已更新
 
@@ -683,6 +826,7 @@ class SeatMapPanelPyQt5(QWidget):
         self.seat_data = seat_data or []
         self.area_data = area_data or []
         self.selected_seats.clear()
+        self._seat_recommender = None
 
         # 🆕 如果提供了区域数据，确保座位数据包含区域信息
         if self.area_data:
@@ -896,11 +1040,58 @@ class SeatMapPanelPyQt5(QWidget):
                 self._update_seat_button_style(seat_btn, seat['status'], area_name, seat_type)
         
         self.selected_seats.clear()
+        self._seat_recommender = None
         # 座位状态已重置
 
         # 更新提交按钮文字
         self._update_submit_button_text()
     
+    def get_seat_recommender(self):
+        """获取连座推荐器（按当前座位状态惰性构建）"""
+        if self._seat_recommender is None:
+            from services.seat_recommender import SeatRecommender
+            self._seat_recommender = SeatRecommender(self.seat_data)
+        return self._seat_recommender
+
+    def recommend_seat_blocks(self, count: int, top_k: int = 5, area_name: str = None) -> list:
+        """推荐N连座，返回按得分排序的SeatBlock列表"""
+        return self.get_seat_recommender().recommend(count, top_k, area_name)
+
+    def select_seat_block(self, block) -> bool:
+        """选中推荐的连座组合（替换当前选择）"""
+        if not block or not block.keys:
+            return False
+
+        self.clear_selection()
+        for key in block.keys:
+            # 情侣座在选中左座时会自动连选右座
+            if key not in self.selected_seats:
+                self.toggle_seat(*key)
+
+        return all(key in self.selected_seats for key in block.keys)
+
+    def _on_recommend_click(self):
+        """一键推荐连座按钮点击事件"""
+        from PyQt5.QtWidgets import QMessageBox
+
+        count = self.recommend_count_spin.value()
+
+        # 重新推荐时先释放当前选择，让已选座位也参与推荐
+        self.clear_selection()
+        block = self.get_seat_recommender().best_block(count)
+        if not block:
+            QMessageBox.information(self, "推荐连座", f"没有找到{count}个相邻的空座位")
+            return
+
+        if not self.select_seat_block(block):
+            QMessageBox.warning(self, "推荐连座", f"{block.describe()} 选择失败，请手动选座")
+
+    def set_auto_refresh_checked(self, checked: bool):
+        """设置实时刷新开关状态（不触发信号）"""
+        self.auto_refresh_checkbox.blockSignals(True)
+        self.auto_refresh_checkbox.setChecked(checked)
+        self.auto_refresh_checkbox.blockSignals(False)
+
     def set_enabled(self, enabled: bool):
         """设置是否可用"""
         self.scroll_area.setEnabled(enabled)
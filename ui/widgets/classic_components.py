@@ -7,7 +7,7 @@
 
 from PyQt5.QtWidgets import (
     QGroupBox, QPushButton, QLineEdit, QComboBox, QTableWidget, 
-    QTabWidget, QTextEdit, QLabel, QListWidget, QTableWidgetItem
+    QTabWidget, QTextEdit, QLabel, QListWidget, QTableWidgetItem, QTableView, QHeaderView
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QColor
@@ -358,6 +358,53 @@ class ClassicTableWidget(QTableWidget):
             pass
 
 
+class ClassicTableView(QTableView):
+    """🆕 经典风格表格视图（配合Model使用，只绘制可见行）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._setup_style()
+        self._setup_properties()
+
+    def _setup_style(self):
+        """设置表格样式（与ClassicTableWidget一致）"""
+        self.setStyleSheet("""
+            QTableView {
+                border: 1px solid #cccccc;
+                background-color: #ffffff;
+                alternate-background-color: #f9f9f9;
+                gridline-color: #e0e0e0;
+                font: 11px "Microsoft YaHei";
+            }
+            QTableView::item {
+                padding: 6px;
+                border: none;
+            }
+            QTableView::item:selected {
+                background-color: #0078d4;
+                color: white;
+            }
+
+            QHeaderView::section {
+                background-color: #f0f0f0;
+                border: 1px solid #cccccc;
+                padding: 6px;
+                font: bold 11px "Microsoft YaHei";
+                color: #333333;
+            }
+        """)
+
+    def _setup_properties(self):
+        """设置表格属性"""
+        self.setAlternatingRowColors(True)
+        self.setSelectionBehavior(QTableView.SelectRows)
+        self.setEditTriggers(QTableView.NoEditTriggers)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.verticalHeader().setVisible(False)
+        # 固定行高，避免按内容逐行计算高度
+        self.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+
+
 class ClassicTabWidget(QTabWidget):
     """经典风格Tab页"""
     
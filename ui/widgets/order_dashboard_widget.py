@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨账号订单看板
+一次查看所有账号的订单，未支付且即将超时的订单高亮并排在最前
+"""
+
+from typing import Dict, List, Optional
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QAbstractItemView
+from PyQt5.QtCore import pyqtSignal, Qt, QTimer, QThread
+from PyQt5.QtGui import QColor
+
+from ui.widgets.classic_components import ClassicButton, ClassicLineEdit, ClassicTableWidget, ClassicLabel
+from services.order_dashboard_service import get_order_dashboard_service
+
+
+class OrderDashboardRefreshThread(QThread):
+    """看板同步线程 - 并发同步所有账号订单"""
+
+    # 定义信号
+    account_synced = pyqtSignal(str, dict)  # 单个账号同步完成 (账号标识, 同步结果)
+    refresh_finished = pyqtSignal(dict)     # 全部账号同步完成
+
+    def __init__(self, accounts: List[Dict]):
+        super().__init__()
+        self.accounts = accounts
+
+    def run(self):
+        """执行同步"""
+        try:
+            summary = get_order_dashboard_service().refresh(self.accounts, self.account_synced.emit)
+        except Exception as e:
+            summary = {'success': False, 'error': str(e), 'changed_accounts': [], 'failed': {}}
+        self.refresh_finished.emit(summary)
+
+
+class OrderDashboardDialog(QDialog):
+    """跨账号订单看板"""
+
+    COLUMNS = ["账号", "影片", "影院", "状态", "剩余支付时间", "订单号"]
+    # 自动同步间隔（毫秒）
+    AUTO_REFRESH_INTERVAL = 60 * 1000
+    # 剩余时间刷新间隔（毫秒）
+    COUNTDOWN_INTERVAL = 15 * 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("全部账号订单")
+        self.resize(900, 560)
+
+        self.service = get_order_dashboard_service()
+        self.accounts = self.service.load_accounts()
+        self.refresh_thread: Optional[OrderDashboardRefreshThread] = None
+        self._render_pending = False
+
+        self._init_ui()
+
+        # 自动同步和剩余时间刷新
+        self.auto_refresh_timer = QTimer(self)
+        self.auto_refresh_timer.timeout.connect(self.refresh)
+        self.countdown_timer = QTimer(self)
+        self.countdown_timer.timeout.connect(self._render)
+
+        # 先显示本地订单，显示窗口时再后台同步
+        self._render()
+
+    def _init_ui(self):
+        """初始化界面"""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(8)
+
+        toolbar = QHBoxLayout()
+        self.refresh_btn = ClassicButton("同步", "primary")
+        self.refresh_btn.setMaximumWidth(80)
+        self.refresh_btn.clicked.connect(self.refresh)
+        toolbar.addWidget(self.refresh_btn)
+
+        self.unpaid_only_checkbox = QCheckBox("只看未支付")
+        self.unpaid_only_checkbox.toggled.connect(self._render)
+        toolbar.addWidget(self.unpaid_only_checkbox)
+
+        self.search_input = ClassicLineEdit("搜索影片/影院/状态/订单号")
+        self.search_input.setMaximumWidth(240)
+        self.search_input.textChanged.connect(self._render)
+        toolbar.addWidget(self.search_input)
+
+        toolbar.addStretch()
+        self.status_label = ClassicLabel(f"共 {len(self.accounts)} 个账号")
+        toolbar.addWidget(self.status_label)
+        layout.addLayout(toolbar)
+
+        self.table = ClassicTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setDefaultSectionSize(32)
+        header = self.table.horizontalHeader()
+        header.resizeSection(0, 110)
+        header.resizeSection(1, 160)
+        header.resizeSection(2, 180)
+        header.resizeSection(3, 90)
+        header.resizeSection(4, 100)
+        layout.addWidget(self.table)
+
+    def showEvent(self, event):
+        """显示时立即同步一次并开启定时器"""
+        super().showEvent(event)
+        self.refresh()
+        self.auto_refresh_timer.start(self.AUTO_REFRESH_INTERVAL)
+        self.countdown_timer.start(self.COUNTDOWN_INTERVAL)
+
+    def hideEvent(self, event):
+        """隐藏时停止定时器"""
+        super().hideEvent(event)
+        self.auto_refresh_timer.stop()
+        self.countdown_timer.stop()
+
+    def refresh(self):
+        """后台并发同步所有账号订单"""
+        if self.refresh_thread is not None and self.refresh_thread.isRunning():
+            return
+        if not self.accounts:
+            self.status_label.setText("没有可用账号")
+            return
+
+        self.refresh_btn.setEnabled(False)
+        self.refresh_btn.setText("同步中...")
+        self._synced_count = 0
+
+        self.refresh_thread = OrderDashboardRefreshThread(self.accounts)
+        self.refresh_thread.account_synced.connect(self._on_account_synced)
+        self.refresh_thread.refresh_finished.connect(self._on_refresh_finished)
+        self.refresh_thread.start()
+
+    def _on_account_synced(self, account_key: str, result: dict):
+        """单个账号同步完成 - 有变化时合并重绘（同一轮事件循环内只重绘一次）"""
+        self._synced_count += 1
+        self.status_label.setText(f"同步中 {self._synced_count}/{len(self.accounts)}")
+
+        if result.get('success') and (result.get('new') or result.get('changed')):
+            self._schedule_render()
+
+    def _on_refresh_finished(self, summary: dict):
+        """全部账号同步完成"""
+        self.refresh_btn.setEnabled(True)
+        self.refresh_btn.setText("同步")
+
+        failed = summary.get('failed', {})
+        text = f"共 {len(self.accounts)} 个账号，{len(summary.get('changed_accounts', []))} 个有更新"
+        if failed:
+            text += f"，{len(failed)} 个失败"
+            for account_key, error in failed.items():
+                print(f"[订单看板] ⚠️ 账号 {account_key} 同步失败: {error}")
+        self.status_label.setText(text)
+
+    def _schedule_render(self):
+        """合并多次重绘请求"""
+        if not self._render_pending:
+            self._render_pending = True
+            QTimer.singleShot(0, self._render)
+
+    def _render(self):
+        """从本地订单存储合并并显示订单"""
+        self._render_pending = False
+        orders = self.service.collect_orders(
+            self.accounts,
+            only_unpaid=self.unpaid_only_checkbox.isChecked(),
+            keyword=self.search_input.text()
+        )
+
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table.setRowCount(len(orders))
+            for row, order in enumerate(orders):
+                self._set_row(row, order)
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def _set_row(self, row: int, order: Dict):
+        """填充一行"""
+        remaining = order.get('remaining_seconds')
+        if remaining is None:
+            remaining_text = "-" if not order['is_unpaid'] else "未知"
+        else:
+            remaining_text = f"{remaining // 60:02d}:{remaining % 60:02d}"
+
+        values = [
+            order.get('account', ''),
+            order.get('movie_name', ''),
+            order.get('cinema_name', ''),
+            order.get('status_desc', ''),
+            remaining_text,
+            order.get('order_id', '')
+        ]
+
+        if order.get('near_expiry'):
+            color = "#f44336"
+        elif order['is_unpaid']:
+            color = "#ff9800"
+        else:
+            color = None
+
+        for col, value in enumerate(values):
+            item = self.table.item(row, col)
+            if item is None:
+                self.table.add_colored_item(row, col, str(value), color or "#333333")
+                item = self.table.item(row, col)
+            else:
+                item.setText(str(value))
+                item.setForeground(QColor(color or "#333333"))
+
+            if order.get('near_expiry'):
+                item.setBackground(QColor("#ffebee"))
+            else:
+                item.setBackground(QColor(0, 0, 0, 0))
+
+        self.table.item(row, 0).setData(Qt.UserRole, order.get('order_id', ''))
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订单表格Model
+订单列表以 QAbstractTableModel 提供给表格视图，刷新时按订单号计算差异，
+只插入/更新/删除发生变化的行；排序和搜索通过代理Model完成，视图只请求可见行的数据
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PyQt5.QtGui import QColor
+
+# 行格式化函数：订单 -> (影片, 影院, 状态, 订单号)
+RowFormatter = Callable[[Dict[str, Any]], Tuple[str, str, str, str]]
+
+
+def format_womei_order_row(order: Dict[str, Any]) -> Tuple[str, str, str, str]:
+    """沃美订单格式（WomeiOrderService.format_single_order）"""
+    return (
+        str(order.get('movie_name', '未知影片')),
+        str(order.get('cinema_name', '未知影院')),
+        str(order.get('status_desc', '未知状态')),
+        str(order.get('order_id', '未知订单号'))
+    )
+
+
+def status_color(status: str) -> Optional[str]:
+    """根据状态文本返回显示颜色"""
+    if '待支付' in status or '待付款' in status or '待使用' in status:
+        return "#ff9800"
+    if '已支付' in status or '已完成' in status or '已付款' in status or '已放映' in status:
+        return "#4caf50"
+    if '已取票' in status:
+        return "#2196f3"
+    if '已取消' in status or '已退款' in status:
+        return "#f44336"
+    return None
+
+
+class OrderTableModel(QAbstractTableModel):
+    """订单表格Model"""
+
+    COLUMNS = ["影片", "影院", "状态", "订单号"]
+    STATUS_COLUMN = 2
+    # 订单对象角色（data(index, ORDER_ROLE) 返回原始订单字典）
+    ORDER_ROLE = Qt.UserRole
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._orders: List[Dict[str, Any]] = []
+        self._keys: List[str] = []
+        # 行显示文本按需生成（只有视图请求的行才格式化）
+        self._display_cache: Dict[int, Tuple[str, str, str, str]] = {}
+        self._formatter: RowFormatter = format_womei_order_row
+
+    # ===== Qt接口 =====
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._orders)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.COLUMNS):
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._orders):
+            return None
+
+        row = index.row()
+        if role == self.ORDER_ROLE:
+            return self._orders[row]
+
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self._row_values(row)[index.column()]
+
+        if role == Qt.ForegroundRole and index.column() == self.STATUS_COLUMN:
+            color = status_color(self._row_values(row)[self.STATUS_COLUMN])
+            return QColor(color) if color else None
+
+        return None
+
+    # ===== 数据更新 =====
+
+    def order_at(self, row: int) -> Optional[Dict[str, Any]]:
+        """获取某行的订单"""
+        return self._orders[row] if 0 <= row < len(self._orders) else None
+
+    def orders(self) -> List[Dict[str, Any]]:
+        """当前全部订单（Model顺序）"""
+        return list(self._orders)
+
+    def set_orders(self, orders: List[Dict[str, Any]], formatter: Optional[RowFormatter] = None) -> Dict[str, int]:
+        """
+        用新的订单列表更新Model，按订单号只变更差异行
+
+        Args:
+            orders: 新的订单列表
+            formatter: 行格式化函数，为空时使用沃美订单格式；与上次不同时整表重置
+
+        Returns:
+            {'inserted': 插入行数, 'updated': 更新行数, 'removed': 删除行数, 'reset': 是否整表重置}
+        """
+        formatter = formatter or format_womei_order_row
+        new_keys = [self._order_key(order, formatter) for order in orders]
+        stats = {'inserted': 0, 'updated': 0, 'removed': 0, 'reset': 0}
+
+        # 格式变化或订单号重复时无法按行对应，整表重置
+        if formatter != self._formatter or len(set(new_keys)) != len(new_keys):
+            self._reset(orders, new_keys, formatter)
+            stats['reset'] = 1
+            return stats
+
+        # 1. 删除不再存在的行（从后往前，连续的行合并删除）
+        new_key_set = set(new_keys)
+        row = len(self._keys) - 1
+        while row >= 0:
+            if self._keys[row] in new_key_set:
+                row -= 1
+                continue
+            last = row
+            while row - 1 >= 0 and self._keys[row - 1] not in new_key_set:
+                row -= 1
+            self._remove_rows(row, last)
+            stats['removed'] += last - row + 1
+            row -= 1
+
+        # 2. 按新顺序逐行对齐：相同订单更新，新订单插入；出现顺序调整时整表重置
+        current_key_set = set(self._keys)
+        for position, (key, order) in enumerate(zip(new_keys, orders)):
+            if position < len(self._keys) and self._keys[position] == key:
+                if self._orders[position] != order:
+                    self._orders[position] = order
+                    self._display_cache.pop(position, None)
+                    self.dataChanged.emit(self.index(position, 0), self.index(position, len(self.COLUMNS) - 1))
+                    stats['updated'] += 1
+                continue
+
+            if key in current_key_set:
+                self._reset(orders, new_keys, formatter)
+                return {'inserted': 0, 'updated': 0, 'removed': 0, 'reset': 1}
+
+            # 连续的新订单一次插入
+            end = position
+            while end + 1 < len(new_keys) and new_keys[end + 1] not in current_key_set:
+                end += 1
+            self._insert_rows(position, orders[position:end + 1], new_keys[position:end + 1])
+            stats['inserted'] += end - position + 1
+            # 已插入的行在后续循环中会按“相同订单”处理
+            current_key_set.update(new_keys[position:end + 1])
+
+        return stats
+
+    # ===== 内部方法 =====
+
+    @staticmethod
+    def _order_key(order: Dict[str, Any], formatter: RowFormatter) -> str:
+        return formatter(order)[3]
+
+    def _row_values(self, row: int) -> Tuple[str, str, str, str]:
+        values = self._display_cache.get(row)
+        if values is None:
+            values = self._formatter(self._orders[row])
+            self._display_cache[row] = values
+        return values
+
+    def _reset(self, orders: List[Dict[str, Any]], keys: List[str], formatter: RowFormatter):
+        self.beginResetModel()
+        self._orders = list(orders)
+        self._keys = list(keys)
+        self._formatter = formatter
+        self._display_cache.clear()
+        self.endResetModel()
+
+    def _remove_rows(self, first: int, last: int):
+        self.beginRemoveRows(QModelIndex(), first, last)
+        del self._orders[first:last + 1]
+        del self._keys[first:last + 1]
+        self._display_cache.clear()
+        self.endRemoveRows()
+
+    def _insert_rows(self, position: int, orders: List[Dict[str, Any]], keys: List[str]):
+        self.beginInsertRows(QModelIndex(), position, position + len(orders) - 1)
+        self._orders[position:position] = orders
+        self._keys[position:position] = keys
+        self._display_cache.clear()
+        self.endInsertRows()
+
+
+class OrderFilterProxyModel(QSortFilterProxyModel):
+    """订单表格代理Model - 按所有列搜索（不区分大小写），支持点击表头排序"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setFilterKeyColumn(-1)
+        self.setSortCaseSensitivity(Qt.CaseInsensitive)
+        # 数据变化时保持当前排序和过滤
+        self.setDynamicSortFilter(True)
+
+    def order_at(self, proxy_index) -> Optional[Dict[str, Any]]:
+        """获取代理索引对应的订单"""
+        if not proxy_index.isValid():
+            return None
+        source_index = self.mapToSource(proxy_index)
+        return self.sourceModel().order_at(source_index.row())
@@ -11,14 +11,16 @@ from typing import Dict, List, Optional, Any
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QMessageBox, QDialog, QDialogButtonBox, QMenu, QFrame, QScrollArea
 )
-from PyQt5.QtCore import pyqtSignal, Qt, QTimer
+from PyQt5.QtCore import pyqtSignal, Qt, QTimer, QThread
 from PyQt5.QtGui import QColor, QFont
 
 # 导入自定义组件
 from ui.widgets.classic_components import (
     ClassicTabWidget, ClassicGroupBox, ClassicButton, ClassicLineEdit, 
-    ClassicComboBox, ClassicTableWidget, ClassicTextEdit, ClassicLabel, ClassicListWidget
+    ClassicComboBox, ClassicTableWidget, ClassicTableView, ClassicTextEdit, ClassicLabel
 )
+from ui.widgets.order_table_model import OrderTableModel, OrderFilterProxyModel
+from ui.widgets.voucher_table_model import OrderCouponTableModel, VoucherFilterProxyModel, bind_message_span
 from ui.interfaces.plugin_interface import IWidgetInterface, event_bus
 
 # 导入消息管理器
@@ -55,6 +57,71 @@ def filtered_print(message):
         print(message)  # 其他信息去重打印
 
 
+class OrderSyncThread(QThread):
+    """订单增量同步线程 - 拉取新订单写入本地订单存储"""
+
+    # 定义信号
+    sync_finished = pyqtSignal(str, dict)  # 同步完成信号 (账号标识, 同步结果)
+
+    def __init__(self, account_key: str, token: str):
+        super().__init__()
+        self.account_key = account_key
+        self.token = token
+
+    def run(self):
+        """执行订单同步"""
+        try:
+            from services.order_store import get_order_store, sync_account_orders
+            result = sync_account_orders(get_order_store(), self.account_key, self.token)
+        except Exception as e:
+            result = {'success': False, 'error': f"订单同步异常: {str(e)}"}
+        self.sync_finished.emit(self.account_key, result)
+
+
+class VoucherBindThread(QThread):
+    """批量绑券线程 - 在后台执行绑券任务，逐张推送结果"""
+
+    # 定义信号
+    item_bound = pyqtSignal(dict)  # 单张券结果
+    bind_finished = pyqtSignal(dict)  # 任务结束（完成、取消或Token失效）
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def run(self):
+        """执行绑券任务"""
+        try:
+            summary = self.job.run(on_result=self.item_bound.emit)
+        except Exception as e:
+            summary = self.job.summary()
+            summary['error'] = f"批量绑券异常: {str(e)}"
+        self.bind_finished.emit(summary)
+
+
+class UnpaidOrderCancelThread(QThread):
+    """取消未付款订单线程 - 在后台并发取消，逐个推送订单结果"""
+
+    # 定义信号
+    order_cancelled = pyqtSignal(dict)  # 单个订单取消结果
+    cancel_finished = pyqtSignal(dict)  # 全部完成（汇总结果）
+
+    def __init__(self, account: dict, cinemaid: str):
+        super().__init__()
+        self.account = account
+        self.cinemaid = cinemaid
+
+    def run(self):
+        """执行批量取消（回调在线程池工作线程中触发，信号跨线程排队送达UI）"""
+        try:
+            from services.order_api import cancel_all_unpaid_orders
+            result = cancel_all_unpaid_orders(self.account, self.cinemaid,
+                                              on_result=self.order_cancelled.emit)
+        except Exception as e:
+            result = {'resultCode': '-1', 'resultDesc': f"取消未付款订单异常: {str(e)}"}
+        self.cancel_finished.emit(result)
+
+
 class TabManagerWidget(QWidget):
     """Tab页面管理组件"""
     
@@ -66,6 +133,7 @@ class TabManagerWidget(QWidget):
     session_selected = pyqtSignal(dict)  # 🆕 场次选择信号，用于触发座位图加载
     seat_load_requested = pyqtSignal(dict)  # 🆕 座位图加载请求信号
     token_expired = pyqtSignal(str)  # 🔧 Token失效信号
+    best_coupon_requested = pyqtSignal()  # 🆕 一键使用最优券信号
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -324,11 +392,25 @@ class TabManagerWidget(QWidget):
         layout.setContentsMargins(10, 20, 10, 10)
         layout.setSpacing(8)
         
-        # 券列表 - 初始为空白状态
-        self.coupon_list = ClassicListWidget()
-        # 不添加任何初始项目，保持空白
+        # 🔧 券列表 - Model/View，切换订单时单元格按需格式化，点击表头排序；初始为空白状态
+        self.coupon_model = OrderCouponTableModel(self)
+        self.coupon_proxy_model = VoucherFilterProxyModel(self)
+        self.coupon_proxy_model.setSourceModel(self.coupon_model)
+
+        self.coupon_list = ClassicTableView()
+        self.coupon_list.setModel(self.coupon_proxy_model)
+        bind_message_span(self.coupon_list, self.coupon_model)
+        self.coupon_list.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.coupon_list.setSortingEnabled(True)
+        self.coupon_list.horizontalHeader().resizeSection(0, 90)   # 类型
+        self.coupon_list.horizontalHeader().resizeSection(1, 150)  # 有效期至
 
         layout.addWidget(self.coupon_list)
+
+        # 🆕 一键最优券：并发询价后自动选中支付价格最低的券
+        self.best_coupon_btn = ClassicButton("一键最优券", "default")
+        self.best_coupon_btn.clicked.connect(self.best_coupon_requested.emit)
+        layout.addWidget(self.best_coupon_btn)
     
     def _build_bind_coupon_tab(self):
         """构建绑券Tab页面 - 直接从第二部分文档复制并适配PyQt5"""
@@ -372,6 +454,22 @@ class TabManagerWidget(QWidget):
         """)
         bind_btn.clicked.connect(self.on_bind_coupons)
         input_layout.addWidget(bind_btn)
+
+        # 🆕 绑券任务控制：暂停/继续（含Token失效后继续剩余）/取消
+        control_layout = QHBoxLayout()
+        self.bind_pause_btn = ClassicButton("暂停", "default")
+        self.bind_pause_btn.clicked.connect(self.on_pause_bind)
+        self.bind_resume_btn = ClassicButton("继续", "default")
+        self.bind_resume_btn.clicked.connect(self.on_resume_bind)
+        self.bind_cancel_btn = ClassicButton("取消", "default")
+        self.bind_cancel_btn.clicked.connect(self.on_cancel_bind)
+        for btn in (self.bind_pause_btn, self.bind_resume_btn, self.bind_cancel_btn):
+            btn.setEnabled(False)
+            control_layout.addWidget(btn)
+        input_layout.addLayout(control_layout)
+
+        self.bind_job = None
+        self.bind_thread = None
         
         main_layout.addWidget(input_frame)
         
@@ -424,98 +522,148 @@ class TabManagerWidget(QWidget):
             MessageManager.show_error(self, "无输入内容", "请输入券码和密码！", auto_close=False)
             return
 
-        # 🆕 使用沃美绑券服务解析输入
-        from services.womei_voucher_service import get_womei_voucher_service
-        voucher_service = get_womei_voucher_service()
-
-        # 尝试解析沃美格式
-        vouchers = voucher_service.parse_voucher_input(input_text)
+        # 🆕 批量预处理：多格式解析、去重、券码格式校验、跳过已知已绑定的券（不发起网络请求）
+        from services.voucher_input_parser import prepare_bind_batch
+        batch = prepare_bind_batch(input_text, cinema_id, account.get('token', ''), account.get('phone', ''))
+        vouchers = batch['vouchers']
 
-        # 如果没有解析到沃美格式，尝试传统格式
-        if not vouchers:
-            lines = input_text.split('\n')
-            lines = [line.strip() for line in lines if line.strip()]
-            if lines:
-                MessageManager.show_warning(self, "格式提示",
-                    "未检测到沃美格式（卡号：xxx;密码：xxx）\n"
-                    "将使用传统格式处理，但可能无法绑定成功。\n"
-                    "建议使用沃美格式输入。")
-                # 传统格式作为券码，密码为空
-                vouchers = [(line, '') for line in lines]
+        skipped_lines = []
+        if batch['duplicates']:
+            skipped_lines.append(f"重复券码{len(batch['duplicates'])}张：{', '.join(batch['duplicates'])}")
+        if batch['already_bound']:
+            skipped_lines.append(f"已绑定{len(batch['already_bound'])}张：{', '.join(batch['already_bound'])}")
+        for line_no, content, reason in batch['invalid']:
+            skipped_lines.append(f"第{line_no}行{reason}：{content}")
 
         if not vouchers:
-            MessageManager.show_error(self, "解析失败", "无法解析输入的券码信息！", auto_close=False)
+            detail = "\n".join(skipped_lines[:10])
+            MessageManager.show_error(self, "没有需要绑定的券", f"没有需要绑定的券码！\n{detail}", auto_close=False)
             return
 
-        print(f"[沃美绑券] 解析到 {len(vouchers)} 张券")
-
-        # 🆕 执行沃美绑券
-        self.perform_womei_batch_bind(account, cinema_id, vouchers)
-
-    def perform_womei_batch_bind(self, account, cinema_id, vouchers):
-        """🆕 执行沃美批量绑券"""
-        log_lines = []
-        success, fail = 0, 0
-        fail_codes = []
-
-        # 导入沃美绑券服务
-        from services.womei_voucher_service import get_womei_voucher_service
-        from PyQt5.QtWidgets import QApplication
-
-        voucher_service = get_womei_voucher_service()
-        token = account.get('token', '')
-
-        log_lines.append(f"=== 开始沃美绑券 ===")
-        log_lines.append(f"影院ID: {cinema_id}")
-        log_lines.append(f"账号: {account.get('phone', 'N/A')}")
-        log_lines.append(f"券数量: {len(vouchers)}")
-        log_lines.append("")
+        missing_password = [code for code, password in vouchers if not password]
+        if missing_password:
+            MessageManager.show_warning(self, "格式提示",
+                f"{len(missing_password)}张券未检测到券密码（卡号：xxx;密码：xxx 或 券码<Tab>密码）\n"
+                f"{', '.join(missing_password[:5])}{' 等' if len(missing_password) > 5 else ''}\n"
+                "将只提交券码，可能无法绑定成功。\n"
+                "建议使用沃美格式输入。")
 
-        for i, (voucher_code, voucher_password) in enumerate(vouchers, 1):
-            print(f"[沃美绑券] 正在绑定第{i}/{len(vouchers)}张券: {voucher_code}")
+        print(f"[沃美绑券] 解析到 {batch['parsed_count']} 张券，需绑定 {len(vouchers)} 张，跳过 {len(skipped_lines)} 项")
 
-            try:
-                # 调用沃美绑券接口
-                result = voucher_service.bind_voucher(cinema_id, token, voucher_code, voucher_password)
+        # 🆕 执行沃美绑券
+        self.perform_womei_batch_bind(account, cinema_id, vouchers, skipped_lines)
 
-                # 格式化结果
-                is_success, message = voucher_service.format_bind_result(result)
-                log_lines.append(f"[{i}/{len(vouchers)}] {message}")
+    def perform_womei_batch_bind(self, account, cinema_id, vouchers, skipped_lines=None):
+        """🆕 执行沃美批量绑券（后台线程有界并发，结果逐张写入日志）"""
+        if self.bind_thread is not None and self.bind_thread.isRunning():
+            MessageManager.show_warning(self, "绑券进行中", "当前还有绑券任务在执行，请等待完成或取消后再试。")
+            return
 
-                if is_success:
-                    success += 1
-                else:
-                    fail += 1
-                    fail_codes.append(voucher_code)
+        from services.voucher_bind_runner import BatchBindJob
+
+        self.bind_job = BatchBindJob(cinema_id, account.get('token', ''), account.get('phone', ''), vouchers)
+
+        self.bind_log_text.clear()
+        self.bind_log_text.append(f"=== 开始沃美绑券 ===")
+        self.bind_log_text.append(f"影院ID: {cinema_id}")
+        self.bind_log_text.append(f"账号: {account.get('phone', 'N/A')}")
+        self.bind_log_text.append(f"券数量: {len(vouchers)}")
+        for line in skipped_lines or []:
+            self.bind_log_text.append(f"跳过 {line}")
+        self.bind_log_text.append("")
+
+        self._start_bind_thread()
+
+    def _start_bind_thread(self):
+        """启动（或继续）绑券线程"""
+        self.bind_thread = VoucherBindThread(self.bind_job)
+        self.bind_thread.item_bound.connect(self._on_voucher_bound)
+        self.bind_thread.bind_finished.connect(self._on_bind_finished)
+        self.bind_thread.start()
+
+        self.bind_pause_btn.setEnabled(True)
+        self.bind_resume_btn.setEnabled(False)
+        self.bind_cancel_btn.setEnabled(True)
+
+    def _on_voucher_bound(self, item):
+        """单张券绑定结果"""
+        total = self.bind_job.total if self.bind_job else 0
+        self.bind_log_text.append(f"[{item['index']}/{total}] {item['message']}")
+
+        if not item['success']:
+            message = item['message']
+            if '已被绑定' in message:
+                self.bind_log_text.append(f"  -> 该券已绑定，无需重复操作")
+
+    def _on_bind_finished(self, summary):
+        """绑券任务结束"""
+        self.bind_pause_btn.setEnabled(False)
+        self.bind_pause_btn.setText("暂停")
+        self.bind_resume_btn.setEnabled(self.bind_job.can_resume)
+        self.bind_cancel_btn.setEnabled(False)
+
+        if summary.get('error'):
+            self.bind_log_text.append(summary['error'])
+
+        status = summary['status']
+        if status == self.bind_job.STATUS_TOKEN_EXPIRED:
+            self.bind_log_text.append("")
+            self.bind_log_text.append(f"⚠️ Token已失效，已停止绑定，剩余{summary['remaining']}张券未绑定")
+            self.bind_log_text.append("请重新登录该账号后点击“继续”绑定剩余券")
+            return
+        if status == self.bind_job.STATUS_CANCELLED:
+            self.bind_log_text.append("")
+            self.bind_log_text.append(f"⏹️ 已取消，剩余{summary['remaining']}张券未绑定（点击“继续”可绑定剩余券）")
+            return
 
-                    # 特殊错误处理
-                    if 'token' in message.lower() or 'TOKEN_INVALID' in message:
-                        log_lines.append(f"  -> Token可能已失效，建议重新登录账号")
-                    elif '已被绑定' in message:
-                        log_lines.append(f"  -> 该券已绑定，无需重复操作")
+        self.update_womei_bind_log(summary)
 
-            except Exception as e:
-                error_msg = f"券 {voucher_code} 绑定异常: {str(e)}"
-                log_lines.append(f"[{i}/{len(vouchers)}] {error_msg}")
-                fail += 1
-                fail_codes.append(voucher_code)
-                print(f"[沃美绑券] {error_msg}")
+    def on_pause_bind(self):
+        """暂停/恢复当前绑券任务"""
+        if not self.bind_job or self.bind_thread is None or not self.bind_thread.isRunning():
+            return
 
-            # 添加0.3秒延迟（除了最后一张券）
-            if i < len(vouchers):
-                print(f"[沃美绑券] 等待0.3秒后绑定下一张券...")
-                QApplication.processEvents()  # 处理界面事件
-                import time
-                time.sleep(0.3)
+        if self.bind_job.status == self.bind_job.STATUS_PAUSED:
+            self.bind_job.resume()
+            self.bind_pause_btn.setText("暂停")
+            self.bind_log_text.append("▶️ 继续绑定")
+        else:
+            self.bind_job.pause()
+            self.bind_pause_btn.setText("恢复")
+            self.bind_log_text.append("⏸️ 已暂停（正在进行的请求完成后停止）")
+
+    def on_resume_bind(self):
+        """Token失效或取消后，继续绑定剩余券（使用当前账号的最新token）"""
+        job = self.bind_job
+        if not job or not job.can_resume or (self.bind_thread is not None and self.bind_thread.isRunning()):
+            return
 
-        # 更新UI并显示总结
-        self.update_womei_bind_log(log_lines, success, fail, fail_codes, len(vouchers))
+        account = getattr(self, 'current_account', None) or {}
+        if account.get('phone', '') != job.account:
+            MessageManager.show_error(self, "账号不一致", f"剩余券属于账号 {job.account}，请先切换回该账号！", auto_close=False)
+            return
 
-    def update_womei_bind_log(self, log_lines, success, fail, fail_codes, total):
-        """🆕 更新沃美绑定日志显示"""
-        log_lines.append("")
+        job.resume(token=account.get('token', ''))
+        self.bind_log_text.append("")
+        self.bind_log_text.append(f"▶️ 继续绑定剩余{len(job.remaining())}张券")
+        self._start_bind_thread()
+
+    def on_cancel_bind(self):
+        """取消当前绑券任务"""
+        if self.bind_job and self.bind_thread is not None and self.bind_thread.isRunning():
+            self.bind_job.cancel()
+            self.bind_cancel_btn.setEnabled(False)
+            self.bind_pause_btn.setEnabled(False)
+
+    def update_womei_bind_log(self, summary):
+        """🆕 追加沃美绑券总结到日志"""
+        success, fail, total = summary['success'], summary['fail'], summary['total']
+        fail_codes = summary['fail_codes']
+        log_lines = [""]
         log_lines.append(f"=== 沃美绑券完成 ===")
         log_lines.append(f"共{total}张券，绑定成功{success}，失败{fail}")
+        if summary['skipped']:
+            log_lines.append(f"已绑定过跳过{summary['skipped']}张")
         if fail_codes:
             log_lines.append(f"失败券号：{', '.join(fail_codes)}")
 
@@ -524,7 +672,7 @@ class TabManagerWidget(QWidget):
         log_lines.append(f"成功率：{success_rate:.1f}%")
 
         # 如果全部失败，给出建议
-        if fail == total:
+        if total > 0 and fail == total:
             log_lines.append("")
             log_lines.append("*** 绑券建议 ***")
             log_lines.append("所有券都绑定失败，请检查：")
@@ -536,7 +684,7 @@ class TabManagerWidget(QWidget):
             log_lines.append("")
             log_lines.append("🎉 部分或全部券绑定成功！")
 
-        self.bind_log_text.setPlainText("\n".join(log_lines))
+        self.bind_log_text.append("\n".join(log_lines))
 
         # 控制台记录
         print(f"[沃美绑券] 绑定完成：成功{success}张券，失败{fail}张券，成功率{success_rate:.1f}%")
@@ -751,8 +899,8 @@ class TabManagerWidget(QWidget):
         """重置所有券列表为空白状态"""
         try:
             # 重置可用券列表
-            if hasattr(self, 'coupon_list'):
-                self.coupon_list.clear()
+            if hasattr(self, 'coupon_model'):
+                self.coupon_model.set_message('')
                 filtered_print(f"[券列表重置] 可用券列表已清空")
 
             # 重置兑换券表格
@@ -789,20 +937,39 @@ class TabManagerWidget(QWidget):
         self.order_refresh_btn = ClassicButton("刷新", "default")
         self.order_refresh_btn.setMaximumWidth(80)
         button_layout.addWidget(self.order_refresh_btn)
+
+        # 🆕 本地订单搜索（从本地订单存储中查询，不重新请求接口）
+        self.order_search_input = ClassicLineEdit("搜索影片/影院/状态/订单号")
+        self.order_search_input.setMaximumWidth(240)
+        self.order_search_input.textChanged.connect(self._on_order_search_changed)
+        button_layout.addWidget(self.order_search_input)
+
+        # 🆕 跨账号订单看板
+        self.order_dashboard_btn = ClassicButton("全部账号", "default")
+        self.order_dashboard_btn.setMaximumWidth(90)
+        self.order_dashboard_btn.clicked.connect(self._on_open_order_dashboard)
+        button_layout.addWidget(self.order_dashboard_btn)
+
+        # 🆕 一键取消当前影院的所有未付款订单（逐个显示进度）
+        # 使用MiniTicket订单接口，只对带userid/openid的旧系统账号显示，沃美账号隐藏
+        self.order_cancel_unpaid_btn = ClassicButton("取消未付款", "default")
+        self.order_cancel_unpaid_btn.setMaximumWidth(110)
+        self.order_cancel_unpaid_btn.clicked.connect(self._on_cancel_unpaid_orders)
+        self.order_cancel_unpaid_btn.setVisible(False)
+        button_layout.addWidget(self.order_cancel_unpaid_btn)
         button_layout.addStretch()
         layout.addLayout(button_layout)
         
-        # 订单表格
-        self.order_table = ClassicTableWidget()
-        self.order_table.setColumnCount(4)
-        self.order_table.setHorizontalHeaderLabels(["影片", "影院", "状态", "订单号"])
+        # 🔧 订单表格：Model/View，刷新时只变更差异行，搜索和排序通过代理Model完成
+        self.order_model = OrderTableModel(self)
+        self.order_proxy_model = OrderFilterProxyModel(self)
+        self.order_proxy_model.setSourceModel(self.order_model)
 
-        # 🔧 修复：设置表格为只读模式，防止双击编辑
-        from PyQt5.QtWidgets import QAbstractItemView
-        self.order_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
-
-        # 设置选择模式为整行选择
-        self.order_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.order_table = ClassicTableView()
+        self.order_table.setModel(self.order_proxy_model)
+        # 默认保持订单原有顺序（新订单在前），点击表头后再排序
+        self.order_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.order_table.setSortingEnabled(True)
 
         # 设置列宽
         header = self.order_table.horizontalHeader()
@@ -1306,7 +1473,7 @@ class TabManagerWidget(QWidget):
                 self.order_refresh_btn.clicked.connect(self._on_refresh_orders)
             if hasattr(self, 'order_table'):
                 self.order_table.customContextMenuRequested.connect(self._show_order_context_menu)
-                self.order_table.itemDoubleClicked.connect(self._on_order_double_click)
+                self.order_table.doubleClicked.connect(self._on_order_double_click)
 
 
         except Exception as e:
@@ -1376,9 +1543,8 @@ class TabManagerWidget(QWidget):
             # 🔧 Token失效时不修改选座按钮状态（选座按钮状态应该只由场次选择决定）
 
             # 🔧 清空券列表
-            if hasattr(self, 'coupon_list'):
-                self.coupon_list.clear()
-                self.coupon_list.addItem("Token已失效，无法加载券列表")
+            if hasattr(self, 'coupon_model'):
+                self.coupon_model.set_message("Token已失效，无法加载券列表")
 
 
         except Exception as e:
@@ -1484,6 +1650,10 @@ class TabManagerWidget(QWidget):
             # 🆕 更新券管理组件的账号信息
             self.update_voucher_account_info()
 
+            # 🆕 批量取消未付款订单只支持旧系统账号
+            if hasattr(self, 'order_cancel_unpaid_btn'):
+                self.order_cancel_unpaid_btn.setVisible(self._supports_unpaid_cancel(account_data))
+
             # 沃美系统不需要积分信息
             self.current_points = 0
 
@@ -2445,7 +2615,7 @@ class TabManagerWidget(QWidget):
             traceback.print_exc()
     
     def _on_refresh_orders(self):
-        """刷新订单列表 - 🆕 使用新的沃美订单接口"""
+        """刷新订单列表 - 🆕 先显示本地订单，再后台增量同步"""
         try:
             account = getattr(self, 'current_account', None)
             if not account:
@@ -2458,80 +2628,106 @@ class TabManagerWidget(QWidget):
                 MessageManager.show_error(self, "账号信息不完整", "账号缺少token信息！", auto_close=False)
                 return
 
+            # 🆕 立即显示本地已保存的订单
+            account_key = self._get_order_account_key(account)
+            self._show_stored_orders(account_key)
+
+            # 上一次同步尚未完成时不重复发起
+            sync_thread = getattr(self, 'order_sync_thread', None)
+            if sync_thread is not None and sync_thread.isRunning():
+                return
+
             # 显示加载状态
-            self.order_refresh_btn.setText("刷新中...")
+            self.order_refresh_btn.setText("同步中...")
             self.order_refresh_btn.setEnabled(False)
 
+            self.order_sync_thread = OrderSyncThread(account_key, token)
+            self.order_sync_thread.sync_finished.connect(self._on_orders_synced)
+            self.order_sync_thread.start()
+
+        except Exception as e:
+            print(f"[沃美订单刷新] ❌ 异常: {e}")
+            import traceback
+            traceback.print_exc()
+            MessageManager.show_error(self, "刷新失败", f"刷新订单列表时出错：{str(e)}", auto_close=False)
+            self.order_refresh_btn.setText("刷新")
+            self.order_refresh_btn.setEnabled(True)
 
-            # 🆕 使用新的沃美订单服务
-            from services.womei_order_service import get_user_orders
+    def _get_order_account_key(self, account: dict) -> str:
+        """🆕 本地订单存储中的账号标识（优先使用手机号）"""
+        return str(account.get('phone') or account.get('userid') or account.get('token', ''))
 
-            result = get_user_orders(token, offset=0)
+    def _show_stored_orders(self, account_key: str):
+        """🆕 从本地订单存储读取订单并显示（搜索由表格代理Model过滤）"""
+        from services.order_store import get_order_store
 
+        orders = get_order_store().get_orders(account_key)
+        self.update_womei_order_table(orders)
+        return orders
 
-            if result.get('success'):
-                orders = result.get('orders', [])
+    def _on_orders_synced(self, account_key: str, result: dict):
+        """🆕 订单同步完成"""
+        try:
+            self.order_refresh_btn.setText("刷新")
+            self.order_refresh_btn.setEnabled(True)
 
-                # 🆕 使用新的订单数据格式更新表格
-                self.update_womei_order_table(orders)
+            # 同步期间已切换账号时不覆盖当前表格
+            account = getattr(self, 'current_account', None) or {}
+            if self._get_order_account_key(account) != account_key:
+                return
+
+            if result.get('success'):
+                if result.get('new') or result.get('changed'):
+                    self._show_stored_orders(account_key)
 
                 # 不显示成功弹窗，只在控制台记录
-                print(f"[沃美订单刷新] 订单列表刷新成功，共 {len(orders)} 个订单")
+                print(f"[沃美订单刷新] 订单同步完成: 新增 {result.get('new', 0)}，"
+                      f"更新 {result.get('changed', 0)}，请求 {result.get('pages', 0)} 页，"
+                      f"历史{'已完整' if result.get('history_complete') else '未完整'}")
             else:
                 error_msg = result.get('error', '获取订单列表失败')
                 print(f"[沃美订单刷新] ❌ 获取失败: {error_msg}")
-                MessageManager.show_error(self, "获取失败", error_msg, auto_close=False)
 
-                # 清空表格
-                self.order_table.setRowCount(0)
+                # 本地没有订单可显示时才弹窗提示
+                from services.order_store import get_order_store
+                if get_order_store().count_orders(account_key) == 0:
+                    MessageManager.show_error(self, "获取失败", error_msg, auto_close=False)
 
         except Exception as e:
-            print(f"[沃美订单刷新] ❌ 异常: {e}")
-            import traceback
-            traceback.print_exc()
-            MessageManager.show_error(self, "刷新失败", f"刷新订单列表时出错：{str(e)}", auto_close=False)
+            print(f"[沃美订单刷新] ❌ 同步结果处理异常: {e}")
 
-        finally:
-            # 恢复按钮状态
-            self.order_refresh_btn.setText("刷新")
-            self.order_refresh_btn.setEnabled(True)
-
-    def update_womei_order_table(self, orders):
-        """🆕 更新沃美订单表格显示 - 基于新的数据格式"""
+    def _on_open_order_dashboard(self):
+        """🆕 打开跨账号订单看板"""
         try:
-            pass
-
-            self.order_table.setRowCount(len(orders))
-            self.order_data_cache = orders
+            from ui.widgets.order_dashboard_widget import OrderDashboardDialog
 
-            for row, order in enumerate(orders):
-                pass
+            dashboard = getattr(self, 'order_dashboard', None)
+            if dashboard is None:
+                dashboard = OrderDashboardDialog(self)
+                self.order_dashboard = dashboard
 
-                # 🆕 使用新的数据格式 - 4个关键字段
-                movie_name = order.get('movie_name', '未知影片')
-                cinema_name = order.get('cinema_name', '未知影院')
-                status_desc = order.get('status_desc', '未知状态')
-                order_id = order.get('order_id', '未知订单号')
-
-
-                # 设置表格数据
-                self.order_table.setItem(row, 0, self.order_table.__class__.createItem(movie_name))
-                self.order_table.setItem(row, 1, self.order_table.__class__.createItem(cinema_name))
-
-                # 🆕 根据状态设置颜色
-                if '待支付' in status_desc or '待付款' in status_desc or '待使用' in status_desc:
-                    self.order_table.add_colored_item(row, 2, status_desc, "#ff9800")
-                elif '已支付' in status_desc or '已完成' in status_desc or '已付款' in status_desc or '已放映' in status_desc:
-                    self.order_table.add_colored_item(row, 2, status_desc, "#4caf50")
-                elif '已取票' in status_desc:
-                    self.order_table.add_colored_item(row, 2, status_desc, "#2196f3")
-                elif '已取消' in status_desc or '已退款' in status_desc:
-                    self.order_table.add_colored_item(row, 2, status_desc, "#f44336")
-                else:
-                    self.order_table.setItem(row, 2, self.order_table.__class__.createItem(status_desc))
+            dashboard.show()
+            dashboard.raise_()
+            dashboard.activateWindow()
+        except Exception as e:
+            print(f"[订单看板] ❌ 打开失败: {e}")
+            MessageManager.show_error(self, "打开失败", f"打开订单看板失败：{str(e)}", auto_close=False)
 
-                self.order_table.setItem(row, 3, self.order_table.__class__.createItem(order_id))
+    def _on_order_search_changed(self, text: str):
+        """🆕 订单搜索 - 在表格代理Model中按所有列过滤，不重新读取订单"""
+        try:
+            self.order_proxy_model.setFilterFixedString(text.strip())
+        except Exception as e:
+            print(f"[订单搜索] ❌ 搜索失败: {e}")
 
+    def update_womei_order_table(self, orders):
+        """🆕 更新沃美订单表格显示 - 基于新的数据格式，只变更差异行"""
+        try:
+            self.order_data_cache = orders
+            stats = self.order_model.set_orders(orders)
+            if stats['reset'] or stats['inserted'] or stats['updated'] or stats['removed']:
+                print(f"[沃美订单表格] 共 {len(orders)} 个订单: 新增 {stats['inserted']}，"
+                      f"更新 {stats['updated']}，移除 {stats['removed']}{'，整表刷新' if stats['reset'] else ''}")
 
         except Exception as e:
             print(f"[沃美订单表格] ❌ 更新订单表格错误: {e}")
@@ -2539,85 +2735,10 @@ class TabManagerWidget(QWidget):
             traceback.print_exc()
 
     def update_order_table(self, orders):
-        """更新订单表格显示"""
+        """更新订单表格显示（旧订单接口格式）"""
         try:
-            self.order_table.setRowCount(len(orders))
             self.order_data_cache = orders
-
-            for row, order in enumerate(orders):
-                print(f"[订单表格] 处理订单 {row}")
-
-                # 🔧 修复：影片名称 - 根据实际API数据调整
-                movie_name = (order.get('orderName') or      # ✅ 实际字段名
-                             order.get('movieName') or
-                             order.get('movie') or
-                             order.get('filmName') or
-                             order.get('film_name') or
-                             order.get('movieN') or
-                             order.get('filmN') or
-                             order.get('fn') or
-                             order.get('name') or
-                             '未知影片')
-                print(f"[订单表格] 订单 {row} 影片名称: {movie_name}")
-                self.order_table.setItem(row, 0, self.order_table.__class__.createItem(movie_name))
-
-                # 🔧 修复：影院名称 - 从当前选择的影院获取
-                # 由于API数据中没有影院名称，从当前选择的影院获取
-                if hasattr(self, 'current_cinema_data') and self.current_cinema_data:
-                    cinema_name = self.current_cinema_data.get('cinemaShortName', '当前影院')
-                elif hasattr(self, 'cinema_combo') and self.cinema_combo.currentText():
-                    cinema_name = self.cinema_combo.currentText()
-                else:
-                    cinema_name = '未知影院'
-                print(f"[订单表格] 订单 {row} 影院名称: {cinema_name}")
-                self.order_table.setItem(row, 1, self.order_table.__class__.createItem(cinema_name))
-
-                # 🔧 修复：订单状态 - 根据实际API数据调整
-                status_text = (order.get('orderS') or        # ✅ 实际字段名
-                              order.get('status') or
-                              order.get('state') or
-                              order.get('orderState'))
-
-                # 也检查状态码
-                status_code = order.get('orderStatus') or order.get('orderState')
-
-                print(f"[订单表格] 订单 {row} 状态信息: status_code={status_code}, status_text={status_text}")
-
-                if status_text:
-                    # 直接使用状态文本
-                    status = status_text
-                elif status_code is not None:
-                    # 使用状态码转换
-                    status = self.get_order_status_text(status_code)
-                else:
-                    status = '未知状态'
-
-                print(f"[订单表格] 订单 {row} 最终状态: {status}")
-
-                # 根据状态设置颜色 - 适配实际状态文本
-                if '待支付' in status or '待付款' in status or '待使用' in status:
-                    self.order_table.add_colored_item(row, 2, status, "#ff9800")
-                elif '已支付' in status or '已完成' in status or '已付款' in status:
-                    self.order_table.add_colored_item(row, 2, status, "#4caf50")
-                elif '已取票' in status:
-                    self.order_table.add_colored_item(row, 2, status, "#2196f3")
-                elif '已取消' in status:
-                    self.order_table.add_colored_item(row, 2, status, "#f44336")
-                else:
-                    self.order_table.setItem(row, 2, self.order_table.__class__.createItem(status))
-
-                # 🔧 修复：订单号 - 根据实际API数据调整
-                order_no = (order.get('orderno') or          # ✅ 实际字段名
-                           order.get('orderNo') or
-                           order.get('order_id') or
-                           order.get('orderid') or
-                           order.get('orderN') or
-                           order.get('on') or
-                           order.get('id') or
-                           '无订单号')
-                print(f"[订单表格] 订单 {row} 订单号: {order_no}")
-                self.order_table.setItem(row, 3, self.order_table.__class__.createItem(order_no))
-
+            self.order_model.set_orders(orders, self._format_legacy_order_row)
             print(f"[订单表格] 成功更新 {len(orders)} 个订单到表格")
 
         except Exception as e:
@@ -2625,6 +2746,59 @@ class TabManagerWidget(QWidget):
             import traceback
             traceback.print_exc()
 
+    def _format_legacy_order_row(self, order: dict) -> tuple:
+        """旧订单接口格式 -> (影片, 影院, 状态, 订单号)，由表格Model按需调用"""
+        # 🔧 修复：影片名称 - 根据实际API数据调整
+        movie_name = (order.get('orderName') or      # ✅ 实际字段名
+                     order.get('movieName') or
+                     order.get('movie') or
+                     order.get('filmName') or
+                     order.get('film_name') or
+                     order.get('movieN') or
+                     order.get('filmN') or
+                     order.get('fn') or
+                     order.get('name') or
+                     '未知影片')
+
+        # 🔧 修复：影院名称 - 从当前选择的影院获取
+        # 由于API数据中没有影院名称，从当前选择的影院获取
+        if hasattr(self, 'current_cinema_data') and self.current_cinema_data:
+            cinema_name = self.current_cinema_data.get('cinemaShortName', '当前影院')
+        elif hasattr(self, 'cinema_combo') and self.cinema_combo.currentText():
+            cinema_name = self.cinema_combo.currentText()
+        else:
+            cinema_name = '未知影院'
+
+        # 🔧 修复：订单状态 - 根据实际API数据调整
+        status_text = (order.get('orderS') or        # ✅ 实际字段名
+                      order.get('status') or
+                      order.get('state') or
+                      order.get('orderState'))
+
+        # 也检查状态码
+        status_code = order.get('orderStatus') or order.get('orderState')
+
+        if status_text:
+            # 直接使用状态文本
+            status = status_text
+        elif status_code is not None:
+            # 使用状态码转换
+            status = self.get_order_status_text(status_code)
+        else:
+            status = '未知状态'
+
+        # 🔧 修复：订单号 - 根据实际API数据调整
+        order_no = (order.get('orderno') or          # ✅ 实际字段名
+                   order.get('orderNo') or
+                   order.get('order_id') or
+                   order.get('orderid') or
+                   order.get('orderN') or
+                   order.get('on') or
+                   order.get('id') or
+                   '无订单号')
+
+        return str(movie_name), str(cinema_name), str(status), str(order_no)
+
     def get_order_status_text(self, status_code):
         """转换订单状态码为中文"""
         status_map = {
@@ -2637,17 +2811,13 @@ class TabManagerWidget(QWidget):
         }
         return status_map.get(status_code, "未知状态")
 
-    def _on_order_double_click(self, item):
+    def _on_order_double_click(self, index):
         """订单双击事件 - 查看订单二维码 - 🆕 兼容新的沃美订单格式"""
         try:
-            if not item:
-                return
-
-            row = item.row()
-            if not hasattr(self, 'order_data_cache') or row >= len(self.order_data_cache):
+            # 🔧 表格经过代理Model排序/过滤，通过代理索引取订单
+            order = self.order_proxy_model.order_at(index)
+            if not order:
                 return
-
-            order = self.order_data_cache[row]
             print(f"[沃美订单二维码] 双击查看订单二维码")
 
             # 🆕 检测订单数据格式
@@ -3167,15 +3337,9 @@ class TabManagerWidget(QWidget):
     def _show_order_context_menu(self, position):
         """显示订单右键菜单"""
         try:
-            item = self.order_table.itemAt(position)
-            if not item:
+            order = self.order_proxy_model.order_at(self.order_table.indexAt(position))
+            if not order:
                 return
-
-            row = item.row()
-            if not hasattr(self, 'order_data_cache') or row >= len(self.order_data_cache):
-                return
-
-            order = self.order_data_cache[row]
             status = order.get('orderStatus', -1)
 
             # 创建右键菜单
@@ -3262,6 +3426,84 @@ class TabManagerWidget(QWidget):
             traceback.print_exc()
             MessageManager.show_error(self, "错误", f"获取订单详情时出错：{str(e)}", auto_close=False)
 
+    @staticmethod
+    def _supports_unpaid_cancel(account: Optional[dict]) -> bool:
+        """🆕 账号是否可用MiniTicket接口批量取消未付款订单（沃美账号只有phone和token）"""
+        return bool(account and account.get('userid') and account.get('openid'))
+
+    def _on_cancel_unpaid_orders(self):
+        """🆕 取消当前账号在所选影院的所有未付款订单"""
+        try:
+            account = getattr(self, 'current_account', None)
+            if not account:
+                MessageManager.show_error(self, "未选择账号", "请先选择账号！", auto_close=False)
+                return
+
+            if not self._supports_unpaid_cancel(account):
+                MessageManager.show_error(self, "不支持", "沃美账号暂不支持批量取消未付款订单", auto_close=False)
+                return
+
+            cinemaid = self.get_selected_cinemaid()
+            if not cinemaid:
+                MessageManager.show_error(self, "错误", "缺少影院信息", auto_close=False)
+                return
+
+            cancel_thread = getattr(self, 'unpaid_cancel_thread', None)
+            if cancel_thread is not None and cancel_thread.isRunning():
+                return
+
+            reply = QMessageBox.question(self, "确认取消",
+                                       "确定要取消当前影院的所有未付款订单吗？",
+                                       QMessageBox.Yes | QMessageBox.No,
+                                       QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                return
+
+            self._unpaid_cancel_done = 0
+            self.order_cancel_unpaid_btn.setText("取消中...")
+            self.order_cancel_unpaid_btn.setEnabled(False)
+
+            self.unpaid_cancel_thread = UnpaidOrderCancelThread(dict(account), cinemaid)
+            self.unpaid_cancel_thread.order_cancelled.connect(self._on_unpaid_order_cancelled)
+            self.unpaid_cancel_thread.cancel_finished.connect(self._on_unpaid_cancel_finished)
+            self.unpaid_cancel_thread.start()
+
+        except Exception as e:
+            print(f"[取消未付款订单] ❌ 异常: {e}")
+            MessageManager.show_error(self, "错误", f"取消未付款订单时出错：{str(e)}", auto_close=False)
+            self.order_cancel_unpaid_btn.setText("取消未付款")
+            self.order_cancel_unpaid_btn.setEnabled(True)
+
+    def _on_unpaid_order_cancelled(self, result: dict):
+        """🆕 单个未付款订单取消完成 - 更新进度"""
+        self._unpaid_cancel_done = getattr(self, '_unpaid_cancel_done', 0) + 1
+        self.order_cancel_unpaid_btn.setText(f"已处理 {self._unpaid_cancel_done}...")
+        status = "成功" if result.get('success') else f"失败: {result.get('resultDesc', '')}"
+        print(f"[取消未付款订单] 订单 {result.get('orderno')} 取消{status}")
+
+    def _on_unpaid_cancel_finished(self, result: dict):
+        """🆕 未付款订单全部处理完成 - 显示汇总并刷新订单列表"""
+        self.order_cancel_unpaid_btn.setText("取消未付款")
+        self.order_cancel_unpaid_btn.setEnabled(True)
+
+        if result.get('resultCode') != '0':
+            MessageManager.show_error(self, "取消失败", result.get('resultDesc', '取消未付款订单失败'), auto_close=False)
+            return
+
+        cancelled = result.get('cancelledCount', 0)
+        failed = result.get('failedCount', 0)
+        if result.get('partial'):
+            # 部分订单列表页没有读到，可能还有未付款订单没有取消
+            pages = '、'.join(str(page) for page in result.get('failedPages', []))
+            MessageManager.show_warning(self, "订单列表获取不完整",
+                                        f"第{pages}页订单列表获取失败，可能仍有未付款订单未取消；"
+                                        f"已成功取消 {cancelled} 个订单，{failed} 个失败")
+        elif failed:
+            MessageManager.show_warning(self, "部分取消失败", f"成功取消 {cancelled} 个订单，{failed} 个失败")
+        else:
+            MessageManager.show_success(self, "取消完成", f"成功取消 {cancelled} 个未付款订单", auto_close=True)
+        self._on_refresh_orders()
+
     def _cancel_order(self, order):
         """取消订单"""
         try:
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+券表格Model
+券列表以 QAbstractTableModel 提供给表格视图，单元格文本在 data() 中按需格式化，
+格式化结果按 (券号, 行版本) 缓存：券内容变化时版本加一，切换订单或账号后再切回时
+未变化的券直接复用缓存；排序（有效期按过期时间）和搜索通过代理Model完成
+"""
+
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+from PyQt5.QtGui import QColor
+
+from utils.voucher_utils import VoucherDataProcessor
+
+# 行格式化函数：券 -> 各列显示文本
+RowFormatter = Callable[[Dict[str, Any]], Tuple[str, ...]]
+
+
+def voucher_code_of(voucher: Dict[str, Any]) -> str:
+    """券号（兼容券管理接口和订单可用券转换后的字段）"""
+    return str(voucher.get('voucher_code') or voucher.get('couponcode') or voucher.get('voucherCode') or
+               voucher.get('code') or '')
+
+
+def format_voucher_row(voucher: Dict[str, Any]) -> Tuple[str, str, str]:
+    """券管理格式（VoucherInfo.to_dict）：券名称、券号掩码、有效期"""
+    return (
+        str(voucher.get('voucher_name', '未知券')),
+        str(voucher.get('voucher_code_mask', '无券号')),
+        str(voucher.get('expire_time_string', '未知'))
+    )
+
+
+def format_order_coupon_row(voucher: Dict[str, Any]) -> Tuple[str, str, str]:
+    """订单可用券格式（主窗口转换后的券字典）：类型、有效期、券号"""
+    coupon_name = voucher.get('couponname') or voucher.get('voucherName') or voucher.get('name') or ''
+    expire_date = voucher.get('expireddate') or voucher.get('expiredDate') or voucher.get('expireDate') or '未知'
+    coupon_type = voucher.get('voucherType') or voucher.get('coupontype') or '优惠券'
+
+    # 如果券类型为空或者是数字，尝试从券名称推断
+    if not coupon_type or (isinstance(coupon_type, str) and coupon_type.isdigit()):
+        if '延时' in str(coupon_name):
+            coupon_type = '延时券'
+        elif '折' in str(coupon_name):
+            coupon_type = '折扣券'
+        elif '送' in str(coupon_name):
+            coupon_type = '赠送券'
+        else:
+            coupon_type = '优惠券'
+
+    return str(coupon_type), str(expire_date), voucher_code_of(voucher)
+
+
+def expire_time_of(voucher: Dict[str, Any]) -> Optional[int]:
+    """过期时间戳（订单可用券从原始沃美数据中取）"""
+    expire_time = voucher.get('expire_time')
+    if expire_time is None:
+        expire_time = (voucher.get('_womei_original') or {}).get('expire_time')
+    try:
+        return int(expire_time) if expire_time else None
+    except (TypeError, ValueError):
+        return None
+
+
+class VoucherTableModel(QAbstractTableModel):
+    """券表格Model"""
+
+    COLUMNS = ["券名称", "券号", "有效期"]
+    EXPIRE_COLUMN = 2
+    # 券对象角色（data(index, VOUCHER_ROLE) 返回原始券字典）
+    VOUCHER_ROLE = Qt.UserRole
+    # 排序角色：有效期列按过期时间戳排序，其余列按显示文本
+    SORT_ROLE = Qt.UserRole + 1
+    # 缓存的券数量上限（超过时只保留当前列表的版本和格式化缓存）
+    MAX_CACHED_ROWS = 20000
+
+    def __init__(self, parent=None, formatter: RowFormatter = format_voucher_row):
+        super().__init__(parent)
+        self._formatter = formatter
+        self._vouchers: List[Dict[str, Any]] = []
+        self._keys: List[str] = []
+        self._key_rows: Dict[str, int] = {}
+        # 券号 -> (最近一次的券内容, 版本)；格式化缓存 (券号, 版本) -> (显示文本, 前景色, 提示)
+        self._versions: Dict[str, Tuple[Dict[str, Any], int]] = {}
+        self._display_cache: Dict[Tuple[str, int], Tuple[Tuple[str, ...], Optional[QColor], str]] = {}
+        # 没有券时显示的提示行（空状态、加载中、错误）
+        self._message = ''
+        self._message_color: Optional[str] = None
+
+    # ===== Qt接口 =====
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._vouchers) or (1 if self._message else 0)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < len(self.COLUMNS):
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row, column = index.row(), index.column()
+        if not self._vouchers:
+            if row == 0 and column == 0 and self._message:
+                if role == Qt.DisplayRole:
+                    return self._message
+                if role == Qt.BackgroundRole and self._message_color:
+                    return QColor(self._message_color)
+            return None
+
+        if not 0 <= row < len(self._vouchers):
+            return None
+
+        if role == self.VOUCHER_ROLE:
+            return self._vouchers[row]
+
+        if role == self.SORT_ROLE:
+            if column == self.EXPIRE_COLUMN:
+                expire_time = expire_time_of(self._vouchers[row])
+                if expire_time is not None:
+                    return expire_time
+            return self._row_display(row)[0][column]
+
+        if role == Qt.DisplayRole:
+            return self._row_display(row)[0][column]
+
+        if role == Qt.ForegroundRole and column == self.EXPIRE_COLUMN:
+            return self._row_display(row)[1]
+
+        if role == Qt.ToolTipRole:
+            texts, _, status_text = self._row_display(row)
+            return status_text if column == self.EXPIRE_COLUMN and status_text else texts[column]
+
+        return None
+
+    # ===== 数据更新 =====
+
+    def has_message(self) -> bool:
+        """当前是否显示提示行"""
+        return not self._vouchers and bool(self._message)
+
+    def set_message(self, message: str, color: Optional[str] = None):
+        """清空券列表并显示一行提示（message为空时表格为空）"""
+        self.beginResetModel()
+        self._set_rows([])
+        self._message = message
+        self._message_color = color
+        self.endResetModel()
+
+    def voucher_at(self, row: int) -> Optional[Dict[str, Any]]:
+        """获取某行的券"""
+        return self._vouchers[row] if 0 <= row < len(self._vouchers) else None
+
+    def vouchers(self) -> List[Dict[str, Any]]:
+        """当前全部券（Model顺序）"""
+        return list(self._vouchers)
+
+    def find_row(self, voucher_code: str) -> int:
+        """按券号查找行，找不到时返回-1"""
+        return self._key_rows.get(voucher_code, -1)
+
+    def set_vouchers(self, vouchers: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        用新的券列表更新Model
+
+        券号和顺序都不变时只通知内容变化的行；否则整表重置（单元格按需格式化，
+        未变化的券复用格式化缓存，重置的开销与券数量无关）
+
+        Returns:
+            {'updated': 内容变化的行数, 'reset': 是否整表重置}
+        """
+        keys = self._make_keys(vouchers)
+
+        if keys == self._keys and not self.has_message():
+            changed = [row for row, voucher in enumerate(vouchers) if self._vouchers[row] != voucher]
+            self._vouchers = list(vouchers)
+            for row in changed:
+                self._bump_version(keys[row], vouchers[row])
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUMNS) - 1))
+            return {'updated': len(changed), 'reset': 0}
+
+        self.beginResetModel()
+        self._message = ''
+        self._set_rows(vouchers, keys)
+        self.endResetModel()
+        return {'updated': 0, 'reset': 1}
+
+    def append_vouchers(self, vouchers: List[Dict[str, Any]]):
+        """在末尾追加券（分页加载时逐页追加）"""
+        if not vouchers:
+            return
+        if self.has_message():
+            self.set_vouchers(vouchers)
+            return
+
+        start = len(self._vouchers)
+        keys = self._make_keys(vouchers, dict.fromkeys(self._keys))
+        self.beginInsertRows(QModelIndex(), start, start + len(vouchers) - 1)
+        self._vouchers.extend(vouchers)
+        self._keys.extend(keys)
+        for offset, (key, voucher) in enumerate(zip(keys, vouchers)):
+            self._key_rows.setdefault(key, start + offset)
+            self._track_version(key, voucher)
+        self.endInsertRows()
+
+    # ===== 内部方法 =====
+
+    def _set_rows(self, vouchers: List[Dict[str, Any]], keys: Optional[List[str]] = None):
+        keys = self._make_keys(vouchers) if keys is None else keys
+        self._vouchers = list(vouchers)
+        self._keys = keys
+        self._key_rows = {}
+        for row, (key, voucher) in enumerate(zip(keys, vouchers)):
+            self._key_rows.setdefault(key, row)
+            self._track_version(key, voucher)
+
+        if len(self._versions) > self.MAX_CACHED_ROWS:
+            current = {(key, self._versions[key][1]) for key in keys}
+            self._display_cache = {cache_key: value for cache_key, value in self._display_cache.items()
+                                   if cache_key in current}
+            self._versions = {key: self._versions[key] for key in keys}
+
+    def _make_keys(self, vouchers: List[Dict[str, Any]], seen: Optional[Dict[str, None]] = None) -> List[str]:
+        """每行的键：券号（重复或缺失时加序号区分）"""
+        seen = {} if seen is None else seen
+        keys = []
+        for row, voucher in enumerate(vouchers):
+            key = voucher_code_of(voucher) if isinstance(voucher, dict) else ''
+            if not key or key in seen:
+                key = f"{key}#{len(seen) + row}"
+            seen[key] = None
+            keys.append(key)
+        return keys
+
+    def _track_version(self, key: str, voucher: Dict[str, Any]):
+        known = self._versions.get(key)
+        if known is None:
+            self._versions[key] = (voucher, 0)
+        elif known[0] != voucher:
+            self._bump_version(key, voucher)
+
+    def _bump_version(self, key: str, voucher: Dict[str, Any]):
+        _, version = self._versions.get(key, (None, -1))
+        self._display_cache.pop((key, version), None)
+        self._versions[key] = (voucher, version + 1)
+
+    def _row_display(self, row: int) -> Tuple[Tuple[str, ...], Optional[QColor], str]:
+        key = self._keys[row]
+        cache_key = (key, self._versions[key][1])
+        values = self._display_cache.get(cache_key)
+        if values is None:
+            values = self._format_row(self._vouchers[row])
+            self._display_cache[cache_key] = values
+        return values
+
+    def _format_row(self, voucher: Any) -> Tuple[Tuple[str, ...], Optional[QColor], str]:
+        if not isinstance(voucher, dict):
+            return ("数据格式错误",) + ('',) * (len(self.COLUMNS) - 1), None, ''
+
+        texts = self._formatter(voucher)
+        expire_time = expire_time_of(voucher)
+        if expire_time is None:
+            return texts, None, ''
+
+        status_text, color = VoucherDataProcessor.get_expire_status_text(expire_time, int(time.time()))
+        return texts, QColor(color), status_text
+
+
+class OrderCouponTableModel(VoucherTableModel):
+    """订单可用券表格Model（主窗口券列表）"""
+
+    COLUMNS = ["类型", "有效期至", "券号"]
+    EXPIRE_COLUMN = 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent, format_order_coupon_row)
+
+
+class VoucherFilterProxyModel(QSortFilterProxyModel):
+    """券表格代理Model - 按所有列搜索（不区分大小写），点击表头排序（有效期按过期时间）"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setFilterKeyColumn(-1)
+        self.setSortCaseSensitivity(Qt.CaseInsensitive)
+        self.setSortRole(VoucherTableModel.SORT_ROLE)
+        # 数据变化时保持当前排序和过滤
+        self.setDynamicSortFilter(True)
+
+    def filterAcceptsRow(self, source_row: int, source_parent: QModelIndex) -> bool:
+        # 提示行始终显示
+        if self.sourceModel().has_message():
+            return True
+        return super().filterAcceptsRow(source_row, source_parent)
+
+    def voucher_at(self, proxy_index) -> Optional[Dict[str, Any]]:
+        """获取代理索引对应的券"""
+        if not proxy_index.isValid():
+            return None
+        source_index = self.mapToSource(proxy_index)
+        return self.sourceModel().voucher_at(source_index.row())
+
+
+def bind_message_span(view, model: VoucherTableModel):
+    """提示行横跨所有列：Model重置或插入行后同步视图的单元格合并"""
+    def sync_span(*_):
+        view.clearSpans()
+        if model.has_message():
+            view.setSpan(0, 0, 1, model.columnCount())
+
+    model.modelReset.connect(sync_span)
+    model.rowsInserted.connect(sync_span)
+    sync_span()
@@ -8,15 +8,15 @@
 import time
 from typing import Dict, List, Optional, Any
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QMessageBox, QApplication, QTableWidgetItem
+    QWidget, QVBoxLayout, QHBoxLayout, QMessageBox, QApplication
 )
 from PyQt5.QtCore import pyqtSignal, Qt, QTimer, QThread, pyqtSlot
-from PyQt5.QtGui import QColor
 
 # 导入自定义组件
 from ui.widgets.classic_components import (
-    ClassicGroupBox, ClassicButton, ClassicTableWidget, ClassicLabel
+    ClassicGroupBox, ClassicButton, ClassicTableView, ClassicLabel, ClassicLineEdit
 )
+from ui.widgets.voucher_table_model import VoucherTableModel, VoucherFilterProxyModel, bind_message_span
 
 # 导入券管理API
 from api.voucher_api import get_voucher_api
@@ -30,12 +30,14 @@ class VoucherLoadThread(QThread):
     data_loaded = pyqtSignal(dict)  # 数据加载完成信号
     error_occurred = pyqtSignal(str)  # 错误发生信号
     progress_updated = pyqtSignal(str)  # 进度更新信号
+    page_loaded = pyqtSignal(list)  # 🆕 分页数据信号（按页码顺序，券字典列表）
     
-    def __init__(self, cinema_id: str, token: str, only_valid: bool = True):
+    def __init__(self, cinema_id: str, token: str, only_valid: bool = True, force_refresh: bool = False):
         super().__init__()
         self.cinema_id = cinema_id
         self.token = token
         self.only_valid = only_valid
+        self.force_refresh = force_refresh  # 🆕 为True时忽略券库存缓存（仅手动刷新）
         self.voucher_api = get_voucher_api()
     
     def run(self):
@@ -47,17 +49,26 @@ class VoucherLoadThread(QThread):
             print(f"[券加载线程] Token: {self.token[:20]}...")
             print(f"[券加载线程] 只显示有效券: {self.only_valid}")
 
+            # 🆕 每获取到一页就推送给界面，表格边加载边显示
+            def on_page(page_index, vouchers, page_info):
+                self.page_loaded.emit([voucher.to_dict() for voucher in vouchers])
+                self.progress_updated.emit(f"正在获取券列表... 第{page_index}/{page_info.get('total_page', 1)}页")
+
             # 调用券管理API - 使用正确的方法
             if self.only_valid:
                 from api.voucher_api import get_valid_vouchers
                 print(f"[券加载线程] 调用get_valid_vouchers")
-                result = get_valid_vouchers(self.cinema_id, self.token)
+                # 手动刷新时忽略券库存缓存，并用最新数据更新缓存；否则优先使用缓存
+                result = get_valid_vouchers(self.cinema_id, self.token, on_page=on_page,
+                                            force_refresh=self.force_refresh)
             else:
                 print(f"[券加载线程] 调用get_user_vouchers")
                 result = self.voucher_api.get_user_vouchers(
                     self.cinema_id,
                     self.token,
-                    only_valid=self.only_valid
+                    only_valid=self.only_valid,
+                    on_page=on_page,
+                    force_refresh=self.force_refresh
                 )
 
             print(f"[券加载线程] 结果成功: {result.get('success', False)}")
@@ -73,10 +84,6 @@ class VoucherLoadThread(QThread):
                 print(f"[券加载线程] 准备发送数据信号...")
                 self.data_loaded.emit(result['data'])
                 print(f"[券加载线程] 数据信号已发送")
-
-                # 🔧 强制处理事件队列，确保信号被处理
-                from PyQt5.QtWidgets import QApplication
-                QApplication.processEvents()
             else:
                 error_msg = result.get('message', '未知错误')
                 print(f"[券加载线程] API调用失败: {error_msg}")
@@ -112,6 +119,7 @@ class VoucherWidget(QWidget):
         
         # 加载线程
         self.load_thread = None
+        self._streamed_count = 0  # 🆕 已通过分页推送显示的券数量
         
         # 初始化UI
         self._setup_ui()
@@ -137,10 +145,16 @@ class VoucherWidget(QWidget):
         # 刷新按钮
         self.refresh_btn = ClassicButton("刷新券列表", "primary")
         self.refresh_btn.setMaximumWidth(120)
-        self.refresh_btn.clicked.connect(self.refresh_vouchers)
+        self.refresh_btn.clicked.connect(self._on_refresh_clicked)
         control_layout.addWidget(self.refresh_btn)
         
         # 移除"只显示有效券"开关，默认只显示有效券
+
+        # 🆕 本地券搜索（在表格代理Model中过滤，不重新请求接口）
+        self.search_input = ClassicLineEdit("搜索券名称/券号/有效期")
+        self.search_input.setMaximumWidth(200)
+        self.search_input.textChanged.connect(self._on_search_changed)
+        control_layout.addWidget(self.search_input)
         
         # 状态标签
         self.status_label = ClassicLabel("请选择账号和影院")
@@ -157,12 +171,17 @@ class VoucherWidget(QWidget):
         table_group = ClassicGroupBox("券列表")
         table_layout = QVBoxLayout(table_group)
         
-        # 创建表格（简化为3列）
-        self.voucher_table = ClassicTableWidget()
-        self.voucher_table.setColumnCount(3)
-        self.voucher_table.setHorizontalHeaderLabels([
-            "券名称", "券号", "有效期"
-        ])
+        # 🔧 券表格：Model/View，单元格按需格式化，搜索和排序通过代理Model完成（简化为3列）
+        self.voucher_model = VoucherTableModel(self)
+        self.voucher_proxy_model = VoucherFilterProxyModel(self)
+        self.voucher_proxy_model.setSourceModel(self.voucher_model)
+
+        self.voucher_table = ClassicTableView()
+        self.voucher_table.setModel(self.voucher_proxy_model)
+        bind_message_span(self.voucher_table, self.voucher_model)
+        # 默认保持接口返回的顺序（有效券按过期时间升序），点击表头后再排序
+        self.voucher_table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.voucher_table.setSortingEnabled(True)
 
         # 设置列宽（调整为3列布局）
         header = self.voucher_table.horizontalHeader()
@@ -174,36 +193,37 @@ class VoucherWidget(QWidget):
         from PyQt5.QtWidgets import QAbstractItemView
         self.voucher_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.voucher_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.voucher_table.verticalHeader().setDefaultSectionSize(36)
 
         # 🎨 优化表格显示：设置统一的背景颜色，提高可见性
         self.voucher_table.setAlternatingRowColors(False)  # 关闭交替行颜色
 
         # 设置表格样式：所有行都使用清晰的背景色
         table_style = """
-            QTableWidget {
+            QTableView {
                 background-color: #f8f9fa;
                 gridline-color: #dee2e6;
                 selection-background-color: #e3f2fd;
                 selection-color: #1976d2;
             }
-            QTableWidget::item {
+            QTableView::item {
                 background-color: #ffffff;
                 color: #212529;
                 padding: 8px;
                 border-bottom: 1px solid #dee2e6;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #e3f2fd;
                 color: #1976d2;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background-color: #e3f2fd;
             }
         """
         self.voucher_table.setStyleSheet(table_style)
         
         # 连接选择信号
-        self.voucher_table.itemSelectionChanged.connect(self._on_voucher_selected)
+        self.voucher_table.selectionModel().selectionChanged.connect(self._on_voucher_selected)
         
         table_layout.addWidget(self.voucher_table)
         parent_layout.addWidget(table_group)
@@ -217,26 +237,18 @@ class VoucherWidget(QWidget):
     
     def _show_empty_state(self):
         """显示空状态"""
-        self.voucher_table.setRowCount(1)
-
         # 根据是否已设置账号和影院显示不同提示
         if self.current_account and self.current_cinema_id:
             empty_text = f"当前影院（{self.current_cinema_id}）没有有效券\n提示：券可能绑定到其他影院，请尝试切换影院"
         else:
             empty_text = "请先选择账号和影院，然后点击刷新券列表"
 
-        empty_item = QTableWidgetItem(empty_text)
-        empty_item.setBackground(QColor('#f8f9fa'))
-        self.voucher_table.setItem(0, 0, empty_item)
-        self.voucher_table.setSpan(0, 0, 1, 3)  # 调整为3列
+        # 提示行横跨3列（bind_message_span）
+        self.voucher_model.set_message(empty_text, '#f8f9fa')
     
     def _show_loading_state(self):
         """显示加载状态"""
-        self.voucher_table.setRowCount(1)
-        loading_item = QTableWidgetItem("正在加载券数据，请稍候...")
-        loading_item.setBackground(QColor('#e3f2fd'))
-        self.voucher_table.setItem(0, 0, loading_item)
-        self.voucher_table.setSpan(0, 0, 1, 3)  # 调整为3列
+        self.voucher_model.set_message("正在加载券数据，请稍候...", '#e3f2fd')
         
         # 更新状态
         self.status_label.setText("正在加载...")
@@ -245,13 +257,7 @@ class VoucherWidget(QWidget):
     
     def _show_error_state(self, error_msg: str):
         """显示错误状态"""
-        self.voucher_table.setRowCount(1)
-        self.voucher_table.clearSpans()
-
-        error_item = QTableWidgetItem(f"加载失败: {error_msg}")
-        error_item.setBackground(QColor('#f8d7da'))
-        self.voucher_table.setItem(0, 0, error_item)
-        self.voucher_table.setSpan(0, 0, 1, 3)  # 调整为3列
+        self.voucher_model.set_message(f"加载失败: {error_msg}", '#f8d7da')
         
         # 更新状态
         self.status_label.setText(f"错误: {error_msg}")
@@ -261,7 +267,6 @@ class VoucherWidget(QWidget):
         """恢复UI状态"""
         self.refresh_btn.setText("刷新券列表")
         self.refresh_btn.setEnabled(True)
-        self.voucher_table.clearSpans()
     
     def set_account_info(self, account: Dict[str, Any], cinema_id: str):
         """设置账号和影院信息"""
@@ -277,8 +282,17 @@ class VoucherWidget(QWidget):
             self.status_label.setText("请选择账号和影院")
             self.status_label.setStyleSheet("color: #666; font-size: 12px; margin-left: 10px;")
     
-    def refresh_vouchers(self):
-        """刷新券列表"""
+    def _on_refresh_clicked(self):
+        """🆕 点击刷新券列表按钮：忽略券库存缓存重新获取"""
+        self.refresh_vouchers(force_refresh=True)
+
+    def refresh_vouchers(self, force_refresh: bool = False):
+        """
+        加载券列表
+
+        Args:
+            force_refresh: 忽略券库存缓存重新获取（仅手动刷新时使用，打开Tab、切换账号/影院时复用缓存）
+        """
         if not self.current_account or not self.current_cinema_id:
             MessageManager.show_error(self, "参数缺失", "请先选择账号和影院！")
             return
@@ -295,31 +309,30 @@ class VoucherWidget(QWidget):
         # 显示加载状态
         self._show_loading_state()
 
-        # ⚡ 性能优化：直接同步加载，减少延时
-        try:
-            import time
-            start_time = time.time()
-
-            from api.voucher_api import get_valid_vouchers
-            result = get_valid_vouchers(self.current_cinema_id, token)
+        # 🔧 后台线程加载：第1页返回后其余页并发获取，每页到达即追加到表格
+        self.vouchers_data = []
+        self._streamed_count = 0
+        self._load_start_time = time.time()
+
+        self.load_thread = VoucherLoadThread(self.current_cinema_id, token, only_valid=True,
+                                             force_refresh=force_refresh)
+        self.load_thread.page_loaded.connect(self._on_page_loaded)
+        self.load_thread.data_loaded.connect(self._on_data_loaded)
+        self.load_thread.error_occurred.connect(self._on_error_occurred)
+        self.load_thread.progress_updated.connect(self._on_progress_updated)
+        self.load_thread.start()
+
+    @pyqtSlot(list)
+    def _on_page_loaded(self, vouchers: List[Dict[str, Any]]):
+        """🆕 处理一页券数据 - 追加到表格末尾（第一页到达时替换加载提示）"""
+        if not vouchers:
+            return
 
-            load_time = time.time() - start_time
-            print(f"[券组件] API调用耗时: {load_time:.2f}秒")
+        self.vouchers_data.extend(vouchers)
+        self._streamed_count = len(self.vouchers_data)
+        self.voucher_model.append_vouchers(vouchers)
 
-            if result['success']:
-                print(f"[券组件] 同步加载成功，直接处理数据...")
-                self._on_data_loaded(result['data'])
-            else:
-                error_msg = result.get('message', '未知错误')
-                print(f"[券组件] 同步加载失败: {error_msg}")
-                self._on_error_occurred(error_msg)
-
-        except Exception as e:
-            error_msg = f"加载券数据失败: {str(e)}"
-            print(f"[券组件] 同步加载异常: {error_msg}")
-            import traceback
-            traceback.print_exc()
-            self._on_error_occurred(error_msg)
+        self.status_label.setText(f"正在加载... 已加载 {self._streamed_count} 张有效券")
     
     @pyqtSlot(dict)
     def _on_data_loaded(self, data: Dict[str, Any]):
@@ -359,17 +372,32 @@ class VoucherWidget(QWidget):
                         continue
 
             print(f"[券组件] 最终券数据数量: {len(self.vouchers_data)}")
+            if getattr(self, '_load_start_time', None):
+                print(f"[券组件] 券列表加载耗时: {time.time() - self._load_start_time:.2f}秒")
 
-            # 更新UI显示
+            # 更新UI显示（分页推送的行与最终数据一致时Model不重置；
+            # 最终数据按过期时间排序，顺序不同时重置一次，单元格按需格式化）
             self._update_voucher_table()
+            self._streamed_count = 0
 
             # 恢复UI状态
             self._restore_ui_state()
 
             # 更新状态
             count = len(self.vouchers_data)
-            self.status_label.setText(f"加载完成，共 {count} 张有效券")
-            self.status_label.setStyleSheet("color: #4CAF50; font-size: 12px; margin-left: 10px;")
+            status_text = f"加载完成，共 {count} 张有效券"
+            expiring_soon = data.get('expiring_soon_count', 0)
+            if expiring_soon:
+                status_text += f"，{expiring_soon} 张7天内过期"
+            # 🔧 部分页获取失败时提示列表不完整
+            if data.get('partial'):
+                failed_text = '、'.join(str(page) for page in data.get('failed_pages', []))
+                status_text += f"（第{failed_text}页获取失败，列表不完整，请刷新）"
+                self.status_label.setText(status_text)
+                self.status_label.setStyleSheet("color: #FF9800; font-size: 12px; margin-left: 10px;")
+            else:
+                self.status_label.setText(status_text)
+                self.status_label.setStyleSheet("color: #4CAF50; font-size: 12px; margin-left: 10px;")
 
 
         except Exception as e:
@@ -402,85 +430,36 @@ class VoucherWidget(QWidget):
     # 移除切换功能，始终只显示有效券
     
     def _update_voucher_table(self):
-        """更新券列表表格"""
+        """更新券列表表格（Model按券号比对，只通知变化的行）"""
 
         if not self.vouchers_data:
             print(f"[券组件-表格更新] 券数据为空，显示空状态")
             self._show_empty_state()
             return
 
-        print(f"[券组件-表格更新] 清空表格并设置行数: {len(self.vouchers_data)}")
-
-        # 清空表格
-        self.voucher_table.setRowCount(0)
-        self.voucher_table.clearSpans()
+        stats = self.voucher_model.set_vouchers(self.vouchers_data)
+        change_text = "整表刷新" if stats['reset'] else f"更新 {stats['updated']} 行"
+        print(f"[券组件-表格更新] 共 {len(self.vouchers_data)} 张券: {change_text}")
 
-        # 设置行数
-        self.voucher_table.setRowCount(len(self.vouchers_data))
-        print(f"[券组件-表格更新] 表格行数已设置为: {self.voucher_table.rowCount()}")
-        print(f"[券组件-表格更新] 表格列数: {self.voucher_table.columnCount()}")
+    def _on_search_changed(self, text: str):
+        """🆕 券搜索 - 在表格代理Model中按所有列过滤"""
+        self.voucher_proxy_model.setFilterFixedString(text.strip())
 
-        # ⚡ 性能优化：快速填充数据，减少调试输出
-        for row, voucher in enumerate(self.vouchers_data):
-            try:
-                if isinstance(voucher, dict):
-                    # 券名称
-                    name = voucher.get('voucher_name', '未知券')
-                    name_item = QTableWidgetItem(str(name))
-                    # 🎨 设置清晰的文字样式
-                    name_item.setBackground(QColor('#ffffff'))
-                    name_item.setForeground(QColor('#212529'))
-                    self.voucher_table.setItem(row, 0, name_item)
-
-                    # 券号（掩码）
-                    code_mask = voucher.get('voucher_code_mask', '无券号')
-                    code_item = QTableWidgetItem(str(code_mask))
-                    # 🎨 设置清晰的文字样式
-                    code_item.setBackground(QColor('#ffffff'))
-                    code_item.setForeground(QColor('#212529'))
-                    self.voucher_table.setItem(row, 1, code_item)
-
-                    # 有效期
-                    expire_str = voucher.get('expire_time_string', '未知')
-                    expire_item = QTableWidgetItem(str(expire_str))
-                    # 🎨 设置清晰的文字样式
-                    expire_item.setBackground(QColor('#ffffff'))
-                    expire_item.setForeground(QColor('#212529'))
-                    self.voucher_table.setItem(row, 2, expire_item)
-                else:
-                    # 如果不是字典，显示错误信息
-                    error_item = QTableWidgetItem("数据格式错误")
-                    error_item.setBackground(QColor('#f8d7da'))  # 红色
-                    self.voucher_table.setItem(row, 0, error_item)
-                    self.voucher_table.setSpan(row, 0, 1, 3)  # 调整为3列
-
-            except Exception:
-                # ⚡ 性能优化：简化错误处理，减少调试输出
-                error_item = QTableWidgetItem(f"第{row+1}行数据错误")
-                error_item.setBackground(QColor('#f8d7da'))
-                self.voucher_table.setItem(row, 0, error_item)
-                self.voucher_table.setSpan(row, 0, 1, 3)  # 调整为3列
-
-    
-    def _on_voucher_selected(self):
+    def _on_voucher_selected(self, *_):
         """处理券选择"""
-        current_row = self.voucher_table.currentRow()
-        if 0 <= current_row < len(self.vouchers_data):
-            selected_voucher = self.vouchers_data[current_row]
+        selected_voucher = self.get_selected_voucher()
+        if selected_voucher is not None:
             self.voucher_selected.emit(selected_voucher)
     
     def get_selected_voucher(self) -> Optional[Dict[str, Any]]:
         """获取当前选中的券"""
         try:
-            current_row = self.voucher_table.currentRow()
-            if 0 <= current_row < len(self.vouchers_data):
-                voucher = self.vouchers_data[current_row]
-                if isinstance(voucher, dict):
-                    return voucher
-                else:
-                    print(f"[券组件] 选中的券数据不是字典格式: {type(voucher)}")
-                    return None
-            return None
+            rows = self.voucher_table.selectionModel().selectedRows()
+            voucher = self.voucher_proxy_model.voucher_at(rows[0]) if rows else None
+            if voucher is not None and not isinstance(voucher, dict):
+                print(f"[券组件] 选中的券数据不是字典格式: {type(voucher)}")
+                return None
+            return voucher
         except Exception as e:
             print(f"[券组件] 获取选中券失败: {e}")
             return None
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+调试数据采集器
+调试数据默认关闭或按比例采样，在后台线程压缩写入固定数量的循环文件，
+调用方只做一次入队操作，不会阻塞在磁盘写入上
+"""
+
+import gzip
+import json
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Union
+
+Payload = Union[Dict[str, Any], Callable[[], Dict[str, Any]]]
+
+
+class DebugCapture:
+    """调试数据采集器"""
+
+    def __init__(self, capture_dir: str = 'data/debug_captures', max_files: int = 20,
+                 sample_rate: float = 0.0, queue_size: int = 16):
+        """
+        初始化调试数据采集器
+
+        Args:
+            capture_dir: 采集文件目录
+            max_files: 每个类别最多保留的文件数（循环覆盖最旧的）
+            sample_rate: 采样比例，0为关闭，1为全部采集
+            queue_size: 待写入队列长度，队列满时丢弃新数据
+        """
+        self.capture_dir = capture_dir
+        self.max_files = max_files
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._sequence = 0
+
+        # 统计信息
+        self.captured_count = 0
+        self.dropped_count = 0
+        self.written_count = 0
+
+    # ===== 运行时开关 =====
+
+    @property
+    def enabled(self) -> bool:
+        """是否开启采集"""
+        return self.sample_rate > 0
+
+    def set_enabled(self, enabled: bool):
+        """开启（全部采集）或关闭采集"""
+        self.sample_rate = 1.0 if enabled else 0.0
+        print(f"[调试采集] {'已开启' if enabled else '已关闭'}")
+
+    def set_sample_rate(self, sample_rate: float):
+        """设置采样比例（0~1）"""
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+
+    def toggle(self) -> bool:
+        """切换开关状态，返回切换后的状态"""
+        self.set_enabled(not self.enabled)
+        return self.enabled
+
+    # ===== 采集 =====
+
+    def capture(self, category: str, payload: Payload) -> bool:
+        """
+        采集一条调试数据
+
+        Args:
+            category: 数据类别（用作文件名前缀），如 'seat'
+            payload: 调试数据字典，或返回字典的函数（未被采样时不会调用，避免无谓的构建开销）
+
+        Returns:
+            是否已加入写入队列
+        """
+        sample_rate = self.sample_rate
+        if sample_rate <= 0 or (sample_rate < 1 and random.random() >= sample_rate):
+            return False
+
+        try:
+            data = payload() if callable(payload) else payload
+        except Exception as e:
+            print(f"[调试采集] ❌ 构建调试数据失败: {e}")
+            return False
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((category, time.time(), data))
+            self.captured_count += 1
+            return True
+        except queue.Full:
+            self.dropped_count += 1
+            return False
+
+    def _ensure_worker(self):
+        """按需启动后台写入线程"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._worker_loop, name='DebugCaptureWriter', daemon=True)
+                self._worker.start()
+
+    def _worker_loop(self):
+        """后台线程：序列化、压缩并写入循环文件"""
+        while True:
+            category, timestamp, data = self._queue.get()
+            try:
+                self._write_capture(category, timestamp, data)
+                self.written_count += 1
+            except Exception as e:
+                print(f"[调试采集] ❌ 写入调试数据失败: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write_capture(self, category: str, timestamp: float, data: Dict[str, Any]):
+        """写入一条压缩的调试数据，并删除超出数量的旧文件"""
+        os.makedirs(self.capture_dir, exist_ok=True)
+
+        self._sequence += 1
+        time_text = datetime.fromtimestamp(timestamp).strftime('%Y%m%d_%H%M%S')
+        filename = os.path.join(self.capture_dir, f"{category}_{time_text}_{self._sequence:04d}.json.gz")
+
+        raw = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        with gzip.open(filename, 'wb', compresslevel=5) as f:
+            f.write(raw)
+
+        self._rotate(category)
+
+    def _rotate(self, category: str):
+        """每个类别只保留最新的 max_files 个文件"""
+        prefix = f"{category}_"
+        files = sorted(
+            name for name in os.listdir(self.capture_dir)
+            if name.startswith(prefix) and name.endswith('.json.gz')
+        )
+        for name in files[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.capture_dir, name))
+            except OSError:
+                pass
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """等待队列中的数据写完（用于退出前或调试），返回是否在超时前写完"""
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取采集统计信息"""
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'captured': self.captured_count,
+            'written': self.written_count,
+            'dropped': self.dropped_count,
+            'pending': self._queue.qsize()
+        }
+
+
+# 全局实例
+_debug_capture = None
+
+
+def get_debug_capture() -> DebugCapture:
+    """获取调试数据采集器实例（单例模式），采样比例读取 SEAT_DEBUG_CAPTURE 配置"""
+    global _debug_capture
+
+    if _debug_capture is None:
+        from config import config
+        _debug_capture = DebugCapture(sample_rate=config.SEAT_DEBUG_CAPTURE)
+
+    return _debug_capture
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求速率限制工具
+多个线程共享同一个限流器时，相邻两次请求的发起间隔不小于设定值
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """请求速率限制 - 相邻两次请求的发起间隔不小于 min_interval 秒（线程安全）"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_time = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """等待到下一个可用的请求时刻"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_time)
+            self._next_time = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
@@ -13,6 +13,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 券号格式：2-6位大写字母 + 8-16位数字
+_VOUCHER_CODE_PATTERN = re.compile(r'^[A-Z]{2,6}\d{8,16}$')
+
 class VoucherDataProcessor:
     """券数据处理器"""
     
@@ -55,32 +58,34 @@ class VoucherDataProcessor:
             return '其他券'
     
     @staticmethod
-    def calculate_expire_days(expire_time: int) -> int:
+    def calculate_expire_days(expire_time: int, now: Optional[int] = None) -> int:
         """
         计算券距离过期的天数
         
         Args:
             expire_time: 过期时间戳
+            now: 当前时间戳，批量计算时传入同一个值，默认 time.time()
             
         Returns:
             剩余天数（负数表示已过期）
         """
-        current_time = int(time.time())
+        current_time = int(time.time()) if now is None else now
         days_diff = (expire_time - current_time) // (24 * 3600)
         return days_diff
     
     @staticmethod
-    def get_expire_status_text(expire_time: int) -> Tuple[str, str]:
+    def get_expire_status_text(expire_time: int, now: Optional[int] = None) -> Tuple[str, str]:
         """
         获取过期状态文本和颜色
         
         Args:
             expire_time: 过期时间戳
+            now: 当前时间戳，默认 time.time()
             
         Returns:
             (状态文本, 颜色代码)
         """
-        days_left = VoucherDataProcessor.calculate_expire_days(expire_time)
+        days_left = VoucherDataProcessor.calculate_expire_days(expire_time, now)
         
         if days_left < 0:
             return "已过期", "#ff4444"
@@ -124,9 +129,13 @@ class VoucherDataProcessor:
         Returns:
             排序后的券列表
         """
+        # 🔧 整个列表使用同一个当前时间；已进入券库存索引的券可直接用
+        # VoucherIndex.search(sort_by_expiry=True) 按过期时间有序表读取，无需排序
+        now = int(time.time())
+
         def sort_key(voucher):
             # 优先级：有效性 > 过期时间 > 绑定时间
-            is_valid = voucher.is_valid()
+            is_valid = voucher.is_valid(now)
             expire_time = voucher.expire_time
             bind_time = voucher.bind_time
             
@@ -167,8 +176,7 @@ class VoucherDataProcessor:
             是否为有效格式
         """
         # 基本格式验证：字母开头，包含数字
-        pattern = r'^[A-Z]{2,6}\d{8,16}$'
-        return bool(re.match(pattern, voucher_code))
+        return bool(_VOUCHER_CODE_PATTERN.match(voucher_code))
     
     @staticmethod
     def extract_voucher_summary(vouchers: List[Any]) -> Dict[str, Any]:
@@ -197,18 +205,19 @@ class VoucherDataProcessor:
         expiring_soon_count = 0
         type_counts = {}
         expire_times = []
+        now = int(time.time())
         
         for voucher in vouchers:
             # 统计状态
-            if voucher.is_valid():
+            if voucher.is_valid(now):
                 valid_count += 1
                 expire_times.append(voucher.expire_time)
                 
                 # 检查是否即将过期（7天内）
-                days_left = VoucherDataProcessor.calculate_expire_days(voucher.expire_time)
+                days_left = VoucherDataProcessor.calculate_expire_days(voucher.expire_time, now)
                 if 0 <= days_left <= 7:
                     expiring_soon_count += 1
-            elif voucher.is_expired():
+            elif voucher.is_expired(now):
                 expired_count += 1
             
             # 统计类型
@@ -264,10 +273,12 @@ class VoucherDisplayFormatter:
         Returns:
             格式化的列表项文本
         """
-        status_icon = "✅" if voucher.is_valid() else "❌"
-        days_left = VoucherDataProcessor.calculate_expire_days(voucher.expire_time)
+        now = int(time.time())
+        is_valid = voucher.is_valid(now)
+        status_icon = "✅" if is_valid else "❌"
+        days_left = VoucherDataProcessor.calculate_expire_days(voucher.expire_time, now)
         
-        if voucher.is_valid():
+        if is_valid:
             if days_left <= 7:
                 urgency = "🔥"
             elif days_left <= 30: